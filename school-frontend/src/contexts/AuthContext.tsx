@@ -1,5 +1,26 @@
 /* eslint-disable react-refresh/only-export-components */
+/* eslint-disable @typescript-eslint/no-explicit-any */
 import { createContext, useContext, useEffect, useState, type ReactNode } from "react"
+import axios from "axios"
+
+const API = "http://localhost:5001/api/v1/auth"
+
+// 🔄 Access tokens are short-lived: trade the refresh token for a new pair.
+// Concurrent 401s share one refresh, since a refresh token can only be used once.
+let refreshing: Promise<string | null> | null = null
+
+const refreshAccessToken = async (): Promise<string | null> => {
+  const refreshToken = localStorage.getItem("refresh_token")
+  if (!refreshToken) return null
+  try {
+    const res = await axios.post(`${API}/refresh`, { refresh_token: refreshToken })
+    localStorage.setItem("token", res.data.token)
+    localStorage.setItem("refresh_token", res.data.refresh_token)
+    return res.data.token
+  } catch {
+    return null
+  }
+}
 
 interface User {
   user_id: number
@@ -32,14 +53,48 @@ export const AuthProvider = ({ children }: { children: ReactNode }) => {
     }
   }, [])
 
+  // 🔁 Retry a request once with a fresh access token when the current one is rejected
+  useEffect(() => {
+    const interceptor = axios.interceptors.response.use(undefined, async (error) => {
+      const config: any = error.config
+      if (error.response?.status !== 401 || !config || config._retried || config.url?.startsWith(API)) {
+        return Promise.reject(error)
+      }
+
+      refreshing = refreshing ?? refreshAccessToken().finally(() => { refreshing = null })
+      const token = await refreshing
+      if (!token) return Promise.reject(error)
+
+      setUser((current) => {
+        if (!current) return current
+        const updated = { ...current, token }
+        localStorage.setItem("user", JSON.stringify(updated))
+        return updated
+      })
+      config._retried = true
+      config.headers.Authorization = `Bearer ${token}`
+      return axios(config)
+    })
+    return () => axios.interceptors.response.eject(interceptor)
+  }, [])
+
   const login = (userData: User) => {
     setUser(userData)
     localStorage.setItem("user", JSON.stringify(userData))
   }
 
   const logout = () => {
+    const token = localStorage.getItem("token")
+    const refreshToken = localStorage.getItem("refresh_token")
+    if (token) {
+      axios.post(`${API}/logout`, { refresh_token: refreshToken }, {
+        headers: { Authorization: `Bearer ${token}` },
+      }).catch(() => {})
+    }
     setUser(null)
     localStorage.removeItem("user")
+    localStorage.removeItem("token")
+    localStorage.removeItem("refresh_token")
   }
 
   return (
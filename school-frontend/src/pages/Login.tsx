@@ -22,6 +22,7 @@ export default function LoginPage() {
 
       const token = res.data.token
       localStorage.setItem('token', token)
+      localStorage.setItem('refresh_token', res.data.refresh_token)
 
       const user = {
         user_id: res.data.user_id,
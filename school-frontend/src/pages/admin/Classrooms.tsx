@@ -14,7 +14,8 @@ interface Teacher {
   name: string
 }
 
-const formLevels = ['Form 1', 'Form 2', 'Form 3', 'Form 4']
+// The API stores and returns form levels as '1'..'4'
+const formLevels = ['1', '2', '3', '4']
 
 export default function AdminClassrooms() {
   const [classrooms, setClassrooms] = useState<Classroom[]>([])
@@ -98,7 +99,7 @@ export default function AdminClassrooms() {
     setFormData({
       class_name: cls.class_name,
       class_teacher_id: cls.class_teacher_id ?? null,
-      form_level: cls.form_level,
+      form_level: cls.form_level ?? '',
     })
     setEditingId(cls.class_id)
   }
@@ -146,7 +147,7 @@ export default function AdminClassrooms() {
             <option value="">-- Select Form Level --</option>
             {formLevels.map((level) => (
               <option key={level} value={level}>
-                {level}
+                Form {level}
               </option>
             ))}
           </select>
@@ -211,7 +212,7 @@ export default function AdminClassrooms() {
                 <tr key={cls.class_id} className="border-t hover:bg-gray-50">
                   <td className="p-3">{cls.class_name}</td>
                   <td className="p-3">{cls.class_teacher_name || '—'}</td>
-                  <td className="p-3">{cls.form_level || '—'}</td>
+                  <td className="p-3">{cls.form_level ? `Form ${cls.form_level}` : '—'}</td>
                   <td className="p-3 space-x-3">
                     <button className="text-blue-600 hover:underline" onClick={() => handleEdit(cls)}>
                       Edit
@@ -29,9 +29,13 @@ interface ExamOption {
   name: string
 }
 
+const PAGE_SIZE = 100
+
 export default function AdminGrades() {
   const [grades, setGrades] = useState<Grade[]>([])
+  const [nextCursor, setNextCursor] = useState<number | null>(null)
   const [loading, setLoading] = useState(false)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   const [classes, setClasses] = useState<ClassOption[]>([])
   const [subjects, setSubjects] = useState<SubjectOption[]>([])
@@ -68,23 +72,29 @@ export default function AdminGrades() {
     setExams(examRes.data)
   }
 
-  const fetchGrades = async () => {
-    setLoading(true)
+  // 📄 Grades come a page at a time; pass the previous page's next_cursor to get more
+  const fetchGrades = async (cursor: number | null = null) => {
+    if (cursor) setLoadingMore(true)
+    else setLoading(true)
     try {
       const token = localStorage.getItem('token')
-      const params = Object.entries(filters)
-        .filter(([value]) => value !== '')
+      const params: Record<string, string | number> = Object.entries(filters)
+        .filter(([, value]) => value !== '')
         .reduce((acc, [k, v]) => ({ ...acc, [k]: v }), {})
+      params.limit = PAGE_SIZE
+      if (cursor) params.cursor = cursor
 
       const res = await axios.get('http://localhost:5001/api/v1/grades', {
         headers: { Authorization: `Bearer ${token}` },
         params
       })
-      setGrades(res.data)
+      setGrades((prev) => (cursor ? [...prev, ...res.data.grades] : res.data.grades))
+      setNextCursor(res.data.next_cursor)
     } catch (err) {
       console.error('Error loading grades:', err)
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -189,6 +199,16 @@ export default function AdminGrades() {
               ))}
             </tbody>
           </table>
+
+          {nextCursor && (
+            <button
+              onClick={() => fetchGrades(nextCursor)}
+              disabled={loadingMore}
+              className="mt-4 bg-blue-600 text-white px-4 py-2 rounded disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : '⬇️ Load more'}
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -52,6 +52,8 @@ export default function ExamSchedulesPage() {
   const [openGradesId, setOpenGradesId] = useState<number | null>(null)
   const [gradeInputs, setGradeInputs] = useState<{ student_id: number; full_name: string; marks: string }[]>([])
 
+  const [importing, setImporting] = useState(false)
+
   const token = localStorage.getItem('token')
   const headers = { Authorization: `Bearer ${token}` }
 
@@ -162,11 +164,23 @@ export default function ExamSchedulesPage() {
 
     if (entries.length === 0) return alert('❌ Please enter at least one mark.')
 
-    try {
-      await axios.post(`${API}/grades/`, {
+    // 🔁 Retries on a dropped connection reuse the key, so the server saves the marks once
+    const idempotencyKey = crypto.randomUUID()
+    const submit = () =>
+      axios.post(`${API}/grades/`, {
         exam_schedule_id: examScheduleId,
         grades: entries,
-      }, { headers })
+      }, { headers: { ...headers, 'Idempotency-Key': idempotencyKey } })
+
+    try {
+      for (let attempt = 1; ; attempt++) {
+        try {
+          await submit()
+          break
+        } catch (err: any) {
+          if (err.response || attempt === 3) throw err
+        }
+      }
 
       alert('✅ Grades saved successfully!')
       setOpenGradesId(null)
@@ -175,6 +189,31 @@ export default function ExamSchedulesPage() {
     }
   }
 
+  const handleImportGrades = async (examScheduleId: number, file: File) => {
+    const form = new FormData()
+    form.append('file', file)
+    form.append('exam_schedule_id', String(examScheduleId))
+
+    setImporting(true)
+    try {
+      const res = await axios.post(`${API}/grades/import`, form, { headers })
+      const { added, updated, errors } = res.data
+      const problems = errors
+        .slice(0, 10)
+        .map((e: any) => `Row ${e.row} (${e.admission_number || 'no admission #'}): ${e.error}`)
+        .join('\n')
+      alert(
+        `✅ Imported ${added + updated} marks (${added} added, ${updated} updated)` +
+        (errors.length ? `\n⚠️ ${errors.length} rows skipped:\n${problems}` : '')
+      )
+      setOpenGradesId(null)
+    } catch (err: any) {
+      alert(`❌ ${err.response?.data?.error || 'Failed to import grades.'}`)
+    } finally {
+      setImporting(false)
+    }
+  }
+
   return (
     <div className="max-w-5xl mx-auto px-6 py-8">
       <h1 className="text-3xl font-bold text-blue-800 mb-6">🗓 Exam Schedules & Grades</h1>
@@ -326,6 +365,21 @@ export default function ExamSchedulesPage() {
               {openGradesId === s.id && (
                 <div className="mt-3 bg-gray-50 p-4 rounded">
                   <h3 className="font-semibold mb-3">📝 Enter Grades</h3>
+                  <div className="mb-4 text-sm">
+                    <label className="block mb-1">
+                      📥 Or import a CSV/Excel file with <code>admission_number</code> and <code>marks</code> columns
+                    </label>
+                    <input
+                      type="file"
+                      accept=".csv,.xlsx"
+                      disabled={importing}
+                      onChange={(e) => {
+                        const file = e.target.files?.[0]
+                        if (file) handleImportGrades(s.id, file)
+                        e.target.value = ''
+                      }}
+                    />
+                  </div>
                   {gradeInputs.length === 0 ? (
                     <p className="text-gray-500">No students found for this class.</p>
                   ) : (
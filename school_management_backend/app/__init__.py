@@ -21,14 +21,48 @@ def create_app():
     CORS(app,
      resources={r"/api/*": {"origins": ["*"]}},
      supports_credentials=True,
-     expose_headers=["Authorization"],
-     allow_headers=["Content-Type", "Authorization"],
+     expose_headers=["Authorization", "Idempotent-Replayed"],
+     allow_headers=["Content-Type", "Authorization", "Idempotency-Key"],
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
 
+    from utils.db_engine import configure_engine, init_db_engine
+    configure_engine(app)
+
     db.init_app(app)
     migrate.init_app(app, db)
+    init_db_engine(app, db)
+
+    import utils.grade_events  # Registers the grade flush/commit listeners
+    import utils.grading_schemes  # Registers the grading scheme cache invalidation
+
+    from utils.artifact_cache import init_artifact_cache
+    init_artifact_cache(app)
+
+    from utils.principal_cache import init_principal_cache
+    init_principal_cache(app)
+
+    from utils.token_revocation import init_token_revocation
+    init_token_revocation(app)
+
+    from utils.passwords import init_password_verifier
+    init_password_verifier(app)
+
+    from utils.leaderboard_cache import init_leaderboard_cache
+    init_leaderboard_cache(app)
+
+    from utils.report_jobs import init_report_jobs
+    init_report_jobs(app)
+
+    from utils.grade_audit import init_grade_audit
+    init_grade_audit(app)
+
+    from utils.write_queue import init_write_queue
+    init_write_queue(app)
 
     from routes import init_routes
     init_routes(app)
 
+    from utils.commands import init_commands
+    init_commands(app)
+
     return app
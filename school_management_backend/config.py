@@ -4,3 +4,69 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'super-secret')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///school.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Engine profile (utils/db_engine.py): development, production or test. Picks the SQLite
+    # PRAGMAs (WAL, synchronous, busy_timeout, mmap, cache) or the server connection pool
+    DB_PROFILE = os.getenv('DB_PROFILE', 'development')
+
+    # Group commit for SQLite (utils/write_queue.py): grade entry, messages and announcement
+    # reads go through one writer thread, committed in groups of up to MAX_BATCH writes that
+    # wait up to MAX_DELAY_MS for company (0: just take what queued during the last commit);
+    # requests wait up to TIMEOUT seconds for their commit
+    WRITE_QUEUE_ENABLED = os.getenv('WRITE_QUEUE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    WRITE_QUEUE_MAX_BATCH = int(os.getenv('WRITE_QUEUE_MAX_BATCH', 64))
+    WRITE_QUEUE_MAX_DELAY_MS = float(os.getenv('WRITE_QUEUE_MAX_DELAY_MS', 0))
+    WRITE_QUEUE_TIMEOUT = float(os.getenv('WRITE_QUEUE_TIMEOUT', 30))
+
+    # Size of the process pool (one per web process) that renders bulk report-card PDFs
+    REPORT_PDF_WORKERS = int(os.getenv('REPORT_PDF_WORKERS', os.cpu_count() or 2))
+
+    # Rendered student PDF/CSV cache (defaults to <instance>/report_cache)
+    REPORT_CACHE_DIR = os.getenv('REPORT_CACHE_DIR')
+    REPORT_CACHE_MAX_BYTES = int(os.getenv('REPORT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+    # Login tokens: access/refresh lifetimes, how often each process pulls new revocations,
+    # and how long / how many verified users it caches
+    ACCESS_TOKEN_EXPIRES_SECONDS = int(os.getenv('ACCESS_TOKEN_EXPIRES_SECONDS', 15 * 60))
+    REFRESH_TOKEN_EXPIRES_SECONDS = int(os.getenv('REFRESH_TOKEN_EXPIRES_SECONDS', 14 * 24 * 60 * 60))
+    REVOCATION_SYNC_SECONDS = float(os.getenv('REVOCATION_SYNC_SECONDS', 5))
+    PRINCIPAL_CACHE_TTL = int(os.getenv('PRINCIPAL_CACHE_TTL', 60))
+    PRINCIPAL_CACHE_SIZE = int(os.getenv('PRINCIPAL_CACHE_SIZE', 10000))
+
+    # Password hashing (any Werkzeug method, e.g. "scrypt" or "pbkdf2:sha256:600000") and the
+    # login verification pool: threads, checks allowed in flight before logins get 503, timeout
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_VERIFY_WORKERS = int(os.getenv('PASSWORD_VERIFY_WORKERS', os.cpu_count() or 2))
+    PASSWORD_VERIFY_QUEUE = int(os.getenv('PASSWORD_VERIFY_QUEUE', 64))
+    PASSWORD_VERIFY_TIMEOUT = float(os.getenv('PASSWORD_VERIFY_TIMEOUT', 10))
+
+    # How often each process checks grading_schemes for edits made by other processes
+    GRADING_SCHEME_CHECK_SECONDS = float(os.getenv('GRADING_SCHEME_CHECK_SECONDS', 5))
+
+    # Seconds a cached class leaderboard (student report cards) may be served
+    LEADERBOARD_CACHE_TTL = int(os.getenv('LEADERBOARD_CACHE_TTL', 300))
+
+    # Background report jobs (/api/v1/jobs): concurrent jobs per process, where results
+    # are kept (defaults to <instance>/report_jobs), the lease the owning process renews
+    # on its queued/running jobs (one not renewed for that long counts as interrupted),
+    # how long finished jobs and their files are kept, and how often to sweep
+    REPORT_JOB_WORKERS = int(os.getenv('REPORT_JOB_WORKERS', 2))
+    REPORT_JOB_DIR = os.getenv('REPORT_JOB_DIR')
+    REPORT_JOB_LEASE_SECONDS = int(os.getenv('REPORT_JOB_LEASE_SECONDS', 2 * 60))
+    REPORT_JOB_RETENTION_SECONDS = int(os.getenv('REPORT_JOB_RETENTION_SECONDS', 7 * 24 * 60 * 60))
+    REPORT_JOB_SWEEP_SECONDS = int(os.getenv('REPORT_JOB_SWEEP_SECONDS', 10 * 60))
+
+    # Idempotency-Key replays: how long stored responses are kept, how long a duplicate
+    # waits for the first request to finish before getting 409, and the lease the first
+    # request renews while it runs; a claim not renewed for that long (its worker died)
+    # is taken over by the next request
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 24 * 60 * 60))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', 30))
+    IDEMPOTENCY_LEASE_SECONDS = float(os.getenv('IDEMPOTENCY_LEASE_SECONDS', 60))
+
+    # Grade audit log writer: rows per INSERT batch, max seconds a record waits,
+    # queue bound, and how long a request waits on a full queue before writing itself
+    GRADE_AUDIT_BATCH_SIZE = int(os.getenv('GRADE_AUDIT_BATCH_SIZE', 200))
+    GRADE_AUDIT_FLUSH_SECONDS = float(os.getenv('GRADE_AUDIT_FLUSH_SECONDS', 1.0))
+    GRADE_AUDIT_QUEUE_SIZE = int(os.getenv('GRADE_AUDIT_QUEUE_SIZE', 10000))
+    GRADE_AUDIT_PUT_TIMEOUT = float(os.getenv('GRADE_AUDIT_PUT_TIMEOUT', 0.5))
@@ -14,4 +14,11 @@ from .message import Message
 from .announcement_read import AnnouncementRead
 from .timetable_entry import TimetableEntry
 from .exam_schedule import ExamSchedule
-from .student_subject import StudentSelection
\ No newline at end of file
+from .student_subject import StudentSelection
+from .student_term_aggregate import StudentTermAggregate
+from .grading_scheme import GradingScheme
+from .report_job import ReportJob
+from .idempotency_key import IdempotencyKey
+from .grade_audit import GradeAudit
+from .refresh_token import RefreshToken
+from .revoked_token import RevokedToken
@@ -10,7 +10,10 @@ class AnnouncementRead(db.Model):
     announcement_id = db.Column(db.Integer, db.ForeignKey('announcements.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
 
-    __table_args__ = (db.UniqueConstraint('announcement_id', 'user_id'),)
+    __table_args__ = (
+        db.UniqueConstraint('announcement_id', 'user_id'),
+        db.Index('ix_announcement_reads_user', 'user_id'),
+    )
 
     # Add relationships for easier querying (optional but recommended)
     announcement = db.relationship('Announcement', backref='read_by_users')
@@ -5,7 +5,7 @@ class ClassAssignment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     class_id = db.Column(db.Integer, db.ForeignKey('classrooms.class_id'), nullable=False)
     subject_id = db.Column(db.Integer, db.ForeignKey('subjects.subject_id'), nullable=False)
-    teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.teacher_id'), nullable=False)
+    teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.teacher_id'), nullable=False, index=True)
 
     classroom = db.relationship('Classroom', backref='subject_assignments')
     subject = db.relationship('Subject')
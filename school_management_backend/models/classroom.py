@@ -1,4 +1,6 @@
+from sqlalchemy.orm import validates
 from app import db
+from utils.helpers import normalize_form_level
 
 class Classroom(db.Model):
     __tablename__ = 'classrooms'
@@ -7,10 +9,14 @@ class Classroom(db.Model):
     class_name = db.Column(db.String(100), unique=True, nullable=False)
 
     # NEW: Optional field to store form level explicitly
-    form_level = db.Column(db.String(20), nullable=True)  # e.g. Form 1, Form 2, etc.
+    form_level = db.Column(db.String(20), nullable=True, index=True)  # Normalized to "1".."4"
 
     class_teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.teacher_id'))
 
     # Relationships
     class_teacher = db.relationship('Teacher', back_populates='classrooms')
     students = db.relationship('Student', backref='classroom')
+
+    @validates('form_level')
+    def validate_form_level(self, key, value):
+        return normalize_form_level(value)
@@ -6,7 +6,7 @@ class ExamSchedule(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
     exam_id = db.Column(db.Integer, db.ForeignKey('exams.exam_id'), nullable=False)
-    class_assignment_id = db.Column(db.Integer, db.ForeignKey('class_assignments.id'), nullable=False)
+    class_assignment_id = db.Column(db.Integer, db.ForeignKey('class_assignments.id'), nullable=False, index=True)
 
     # Relationships
     exam = db.relationship('Exam', backref='schedules')
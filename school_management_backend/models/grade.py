@@ -5,6 +5,7 @@ class Grade(db.Model):
     grade_id = db.Column(db.Integer, primary_key=True)
     exam_schedule_id = db.Column(db.Integer, db.ForeignKey('exam_schedules.id'), nullable=False)
     marks = db.Column(db.Float, nullable=False)
+    raw_marks = db.Column(db.Float)  # Mark as entered, kept when moderation adjusts marks
     student_id = db.Column(db.Integer, db.ForeignKey('students.student_id'), nullable=False)
     subject_id = db.Column(db.Integer, db.ForeignKey('subjects.subject_id'), nullable=False)
 
@@ -12,3 +13,11 @@ class Grade(db.Model):
     exam_schedule = db.relationship('ExamSchedule', backref='grades')
     student = db.relationship('Student', backref='grades')
     subject = db.relationship('Subject', backref='grades')
+
+    # One mark per student per exam schedule; bulk saves upsert against this.
+    # The (filter, grade_id) indexes serve the paginated grade listing.
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'exam_schedule_id', name='uq_grade_student_schedule'),
+        db.Index('ix_grades_schedule_grade', 'exam_schedule_id', 'grade_id'),
+        db.Index('ix_grades_subject_grade', 'subject_id', 'grade_id'),
+    )
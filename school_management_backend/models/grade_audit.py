@@ -0,0 +1,25 @@
+from datetime import datetime
+from app import db
+
+# Append-only history of mark changes, written in batches by utils/grade_audit.py.
+# grade_id is None for rows written by the bulk upsert, which identifies the grade
+# by (student_id, exam_schedule_id) instead.
+class GradeAudit(db.Model):
+    __tablename__ = 'grade_audits'
+
+    id = db.Column(db.Integer, primary_key=True)
+    grade_id = db.Column(db.Integer)
+    student_id = db.Column(db.Integer, nullable=False)
+    exam_schedule_id = db.Column(db.Integer, nullable=False)
+    subject_id = db.Column(db.Integer)
+
+    action = db.Column(db.String(10), nullable=False)  # insert, update, upsert, delete, moderate
+    old_marks = db.Column(db.Float)
+    new_marks = db.Column(db.Float)
+
+    changed_by = db.Column(db.Integer)  # users.user_id, None outside a request
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_grade_audits_student_schedule', 'student_id', 'exam_schedule_id', 'changed_at'),
+    )
@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy.orm import validates
+from app import db
+from utils.helpers import normalize_form_level
+
+class GradingScheme(db.Model):
+    __tablename__ = 'grading_schemes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    form_level = db.Column(db.String(20), nullable=True, unique=True)  # None = school default
+
+    # [{"min": 0, "grade": "E"}, {"min": 30, "grade": "D-"}, ...] sorted by min
+    boundaries = db.Column(db.JSON, nullable=False)
+    cat_weight = db.Column(db.Float, nullable=False, default=40)
+    main_weight = db.Column(db.Float, nullable=False, default=60)
+    # {"<subject_id>": [{"min": 0, "grade": "E"}, ...]}
+    subject_overrides = db.Column(db.JSON, nullable=False, default=dict)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @validates('form_level')
+    def validate_form_level(self, key, value):
+        return normalize_form_level(value)
+
+    def __repr__(self):
+        return f"<GradingScheme {self.name} (Form {self.form_level or 'default'})>"
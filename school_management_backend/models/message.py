@@ -14,3 +14,9 @@ class Message(db.Model):
 
     sender = db.relationship('User', foreign_keys=[sender_id], backref='sent_messages')
     receiver = db.relationship('User', foreign_keys=[receiver_id], backref='received_messages')
+
+    # Inbox / unread counts and the sent folder
+    __table_args__ = (
+        db.Index('ix_messages_receiver_read_time', 'receiver_id', 'read', 'timestamp'),
+        db.Index('ix_messages_sender_time', 'sender_id', 'timestamp'),
+    )
@@ -0,0 +1,17 @@
+from datetime import datetime
+from app import db
+
+# Refresh token issued at login, stored as a SHA-256 hash. Each refresh rotates it:
+# the old row is revoked and points at its replacement; tokens from one login share a family_id
+class RefreshToken(db.Model):
+    __tablename__ = 'refresh_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False)
+    family_id = db.Column(db.String(36), nullable=False, index=True)
+    replaced_by = db.Column(db.Integer, db.ForeignKey('refresh_tokens.id'))
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime)
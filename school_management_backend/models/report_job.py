@@ -0,0 +1,26 @@
+from datetime import datetime
+from app import db
+
+# A report generated in the background (utils/report_jobs.py); the result file
+# lives under REPORT_JOB_DIR
+class ReportJob(db.Model):
+    __tablename__ = 'report_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)        # e.g., overall_forms, class_csv
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, done, failed
+    error = db.Column(db.Text)
+
+    result_path = db.Column(db.String(255))
+    filename = db.Column(db.String(255))
+    mimetype = db.Column(db.String(100))
+
+    created_by = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # renewed by the owning process while queued/running
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<ReportJob {self.id} {self.kind} ({self.status})>"
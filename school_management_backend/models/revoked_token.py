@@ -0,0 +1,15 @@
+from datetime import datetime
+from app import db
+
+# Access tokens that must stop working before they expire (utils/token_revocation.py):
+# one token by jti (logout), or every token a user was issued before issued_before
+# (role change, deletion). Rows are only needed until expires_at.
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True)
+    user_id = db.Column(db.Integer, nullable=False)  # no FK: outlives a deleted user
+    issued_before = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
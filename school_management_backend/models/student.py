@@ -10,4 +10,4 @@ class Student(db.Model):
     gender = db.Column(db.String(10), nullable=False)
     date_of_birth = db.Column(db.String(255), nullable=False)
     parent_id = db.Column(db.Integer, db.ForeignKey('parents.parent_id'))
-    class_id = db.Column(db.Integer, db.ForeignKey('classrooms.class_id'))
+    class_id = db.Column(db.Integer, db.ForeignKey('classrooms.class_id'), index=True)
@@ -0,0 +1,23 @@
+from app import db
+
+# Running totals per (student, term, year, subject), kept in sync with grades
+# by the listeners in utils/grade_events.py
+class StudentTermAggregate(db.Model):
+    __tablename__ = 'student_term_aggregates'
+
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.student_id'), nullable=False)
+    term = db.Column(db.String(10), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.subject_id'), nullable=False)
+
+    total_marks = db.Column(db.Float, nullable=False, default=0)
+    grade_count = db.Column(db.Integer, nullable=False, default=0)
+
+    student = db.relationship('Student', backref='term_aggregates')
+    subject = db.relationship('Subject')
+
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'term', 'year', 'subject_id', name='uq_student_term_subject'),
+        db.Index('ix_term_aggregates_term_student', 'term', 'year', 'student_id'),
+    )
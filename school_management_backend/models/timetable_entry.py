@@ -15,3 +15,8 @@ class TimetableEntry(db.Model):
     classroom = db.relationship('Classroom', backref='timetable')
     subject = db.relationship('Subject')
     teacher = db.relationship('Teacher')
+
+    __table_args__ = (
+        db.Index('ix_timetable_teacher_day', 'teacher_id', 'day'),
+        db.Index('ix_timetable_class_day_start', 'class_id', 'day', 'start_time'),
+    )
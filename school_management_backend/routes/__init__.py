@@ -17,6 +17,8 @@ from .exam_schedules import exam_schedules_bp
 from .teacher_reports import teacher_report_bp
 from .dashboard import dashboard_bp
 from .student_selections import student_selection_bp
+from .grading_schemes import grading_scheme_bp
+from .jobs import job_bp
 
 def init_routes(app):
    app.register_blueprint(auth_bp,url_prefix='/api/v1/auth')
@@ -38,4 +40,6 @@ def init_routes(app):
    app.register_blueprint(exam_schedules_bp, url_prefix='/api/v1/exam-schedules')
    app.register_blueprint(teacher_report_bp, url_prefix='/api/v1/teacher-reports')
    app.register_blueprint(dashboard_bp, url_prefix='/api/v1/dashboard')
-   app.register_blueprint(student_selection_bp, url_prefix='/api/v1/student-selection')
\ No newline at end of file
+   app.register_blueprint(student_selection_bp, url_prefix='/api/v1/student-selection')
+   app.register_blueprint(grading_scheme_bp, url_prefix='/api/v1/grading-schemes')
+   app.register_blueprint(job_bp, url_prefix='/api/v1/jobs')
\ No newline at end of file
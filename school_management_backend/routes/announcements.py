@@ -4,6 +4,7 @@ from flask import Blueprint, request, jsonify
 from models import Announcement, User, AnnouncementRead
 from app import db
 from utils.auth_utils import token_required
+from utils.write_queue import run_write, WriteQueueTimeout
 
 announcement_bp = Blueprint('announcements', __name__)
 
@@ -47,19 +48,21 @@ def get_announcements(current_user):
 @announcement_bp.route('/<int:announcement_id>/read', methods=['POST'])
 @token_required
 def mark_announcement_read(current_user, announcement_id):
-    exists = AnnouncementRead.query.filter_by(
-        announcement_id=announcement_id,
-        user_id=current_user.user_id
-    ).first()
+    user_id = current_user.user_id
 
-    if not exists:
-        read = AnnouncementRead(
+    def mark_read(session):
+        exists = session.query(AnnouncementRead).filter_by(
             announcement_id=announcement_id,
-            user_id=current_user.user_id
-        )
-        db.session.add(read)
-        db.session.commit()
+            user_id=user_id
+        ).first()
 
+        if not exists:
+            session.add(AnnouncementRead(announcement_id=announcement_id, user_id=user_id))
+
+    try:
+        run_write(mark_read)
+    except WriteQueueTimeout as e:
+        return jsonify({'error': str(e), 'may_be_applied': e.may_be_applied}), 503
     return jsonify({'message': 'Marked as read'}), 200
 
 @announcement_bp.route('/unread-count', methods=['GET'])
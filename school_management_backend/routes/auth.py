@@ -1,7 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, g
 from models import User
 from app import db
-from utils.auth_utils import generate_token
+from utils.auth_utils import (
+    generate_token, token_required, issue_refresh_token, rotate_refresh_token, find_refresh_token,
+    revoke_refresh_family
+)
+from utils.token_revocation import revoke_access_token
+from utils.passwords import get_password_verifier, hash_password, needs_rehash, VerifierBusy
 
 
 auth_bp = Blueprint('auth', __name__)
@@ -13,20 +18,74 @@ def login():
     email = data.get('email')
     password = data.get('password')
 
+    if not email or not password:
+        return jsonify({'error': 'Email and password are required'}), 400
+
     user = User.query.filter_by(email=email).first()
-    if not user or user.password != password:
+    stored = user.password if user else None
+    db.session.commit()  # don't hold the read transaction open while the password is checked
+
+    try:
+        valid = get_password_verifier().verify(stored, password)
+    except (VerifierBusy, TimeoutError):
+        return jsonify({'error': 'Too many login attempts right now, please try again'}), 503, {'Retry-After': '2'}
+    if not valid:
         return jsonify({'error': 'Invalid credentials'}), 401
 
+    # 🔐 Plaintext or outdated hash: upgrade it now that we know the password
+    if needs_rehash(stored):
+        user.password = hash_password(password)
+
     token = generate_token(user)
+    refresh_token, _ = issue_refresh_token(user.user_id)
+    db.session.commit()
     # ✅ Add 'name' to the response
     return jsonify({
         'token': token,
+        'refresh_token': refresh_token,
+        'expires_in': current_app.config['ACCESS_TOKEN_EXPIRES_SECONDS'],
         'role': user.role,
         'user_id': user.user_id,
         'name': user.name  # 👈 Add this line
     }), 200
 
 
+# 🔄 REFRESH: trade a refresh token for a new access token and a new refresh token
+@auth_bp.route('/refresh', methods=['POST'])
+def refresh():
+    data = request.get_json() or {}
+    refresh_token = data.get('refresh_token')
+    if not refresh_token:
+        return jsonify({'error': 'refresh_token is required'}), 400
+
+    rotated = rotate_refresh_token(refresh_token)
+    db.session.commit()  # also keeps the family revocation when a used token was replayed
+    if not rotated or not rotated[0]:
+        return jsonify({'error': 'Invalid or expired refresh token'}), 401
+
+    user, new_refresh_token = rotated
+    return jsonify({
+        'token': generate_token(user),
+        'refresh_token': new_refresh_token,
+        'expires_in': current_app.config['ACCESS_TOKEN_EXPIRES_SECONDS']
+    }), 200
+
+
+# 🚪 LOGOUT: revoke this access token and, if given, the refresh token's whole login
+@auth_bp.route('/logout', methods=['POST'])
+@token_required
+def logout(current_user):
+    data = request.get_json(silent=True) or {}
+    if g.token_claims.get('jti'):
+        revoke_access_token(db.session, g.token_claims)
+    if data.get('refresh_token'):
+        row = find_refresh_token(data['refresh_token'])
+        if row and row.user_id == current_user.user_id:
+            revoke_refresh_family(row.family_id)
+    db.session.commit()
+    return jsonify({'message': 'Logged out'}), 200
+
+
 # REGISTER
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -35,7 +94,7 @@ def register():
     user = User(
         name=data['name'],
         email=data['email'],
-        password=data['password'],  # ✅ Plaintext password
+        password=hash_password(data['password']),
         role=data['role']
     )
     db.session.add(user)
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from app import db
 from models import Classroom, Teacher
 from utils.auth_utils import token_required
+from utils.helpers import normalize_form_level
 
 class_bp = Blueprint('classrooms', __name__)
 
@@ -42,10 +43,14 @@ def create_class(current_user):
         return jsonify({'error': 'Unauthorized'}), 403
 
     data = request.get_json()
+    form_level = normalize_form_level(data.get('form_level'))
+    if form_level is None:
+        return jsonify({'error': 'form_level must be one of Form 1 to Form 4'}), 400
+
     new_class = Classroom(
         class_name=data['class_name'],
         class_teacher_id=data.get('class_teacher_id'),
-        form_level=data['form_level']
+        form_level=form_level
     )
     db.session.add(new_class)
     db.session.commit()
@@ -63,6 +68,11 @@ def update_class(current_user, class_id):
 
     classroom.class_name = data.get('class_name', classroom.class_name)
     classroom.class_teacher_id = data.get('class_teacher_id', classroom.class_teacher_id)
+    if 'form_level' in data:
+        form_level = normalize_form_level(data['form_level'])
+        if form_level is None:
+            return jsonify({'error': 'form_level must be one of Form 1 to Form 4'}), 400
+        classroom.form_level = form_level
 
     db.session.commit()
     return jsonify({'message': 'Classroom updated'}), 200
@@ -120,7 +130,7 @@ def get_class_teacher(current_user, class_id):
     # ✅ Add this to your classrooms routes file
 @class_bp.route('/filter', methods=['GET'])
 def get_classes_by_form():
-    form_level = request.args.get('form_level', type=int)
+    form_level = normalize_form_level(request.args.get('form_level'))
 
     query = Classroom.query
     if form_level is not None:
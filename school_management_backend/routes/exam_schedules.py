@@ -9,7 +9,7 @@ exam_schedules_bp = Blueprint('exam_schedules', __name__)
 @token_required
 def get_exam_schedules(current_user):
     if current_user.role == 'teacher':
-        teacher_id = current_user.teacher.teacher_id
+        teacher_id = current_user.teacher_id
         schedules = ExamSchedule.query.join(ClassAssignment).filter(ClassAssignment.teacher_id == teacher_id).all()
     else:
         schedules = ExamSchedule.query.all()
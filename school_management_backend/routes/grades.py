@@ -1,49 +1,99 @@
 from flask import Blueprint, request, jsonify
 from sqlalchemy.exc import IntegrityError
 from app import db
-from models import Grade, Student, ExamSchedule
+from models import Grade, Student, ExamSchedule, Exam, ClassAssignment, Subject, Teacher, User, Classroom, GradeAudit
 from utils.auth_utils import token_required
-from utils.grade_utils import get_kcse_grade
+from utils.write_queue import run_write, WriteQueueTimeout
+from utils.idempotency import idempotent
+from utils.grading_schemes import scheme_for_form
+from utils.grade_upsert import upsert_grades
+from utils.grade_import import import_grades, ImportFormatError
+from utils.grade_stats import grade_statistics, STAT_GROUPS
+from utils.moderation import moderation_frame, moderate, moderation_summary, apply_moderation, MODERATION_METHODS
 
 grade_bp = Blueprint('grades', __name__)
 
-# 1. Get all grades
+GRADE_PAGE_SIZE = 50
+MAX_GRADE_PAGE_SIZE = 500
+
+# 1. List grades, newest first, a page at a time.
+# ?limit=50&cursor=<next_cursor> plus optional term, year, class_id, subject_id, teacher_id, exam_id
 @grade_bp.route('/', methods=['GET'])
 @token_required
 def get_all_grades(current_user):
     if current_user.role not in ['admin', 'teacher']:
         return jsonify({'error': 'Unauthorized'}), 403
 
-    grades = Grade.query.all()
-    result = []
-
-    for g in grades:
-        student = g.student
-        exam_schedule = g.exam_schedule  # ✅ FIXED HERE
-        class_assignment = exam_schedule.class_assignment if exam_schedule else None 
-        subject = class_assignment.subject if class_assignment else None
-        classroom = class_assignment.classroom if class_assignment else None
-        exam = exam_schedule.exam if exam_schedule else None
-        teacher = class_assignment.teacher if class_assignment else None
-
-        result.append({
-            'grade_id': g.grade_id,
-            'student_name': f"{student.first_name} {student.last_name}",
-            'admission_number': student.admission_number,
-            'subject': subject.name if subject else '',
-            'score': g.marks,
-            'exam_name': exam.name if exam else '',
-            'term': exam.term if exam else '',
-            'year': exam.year if exam else '',
-           'teacher_name': f"{teacher.user.name}" if teacher and teacher.user else ''
-        })
-
-    return jsonify(result), 200
+    limit = request.args.get('limit', GRADE_PAGE_SIZE, type=int)
+    cursor = request.args.get('cursor', type=int)
+    if limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    limit = min(limit, MAX_GRADE_PAGE_SIZE)
+
+    # 🔗 Every name the table shows, in one joined query
+    query = (
+        db.session.query(
+            Grade.grade_id,
+            Grade.marks,
+            Student.first_name,
+            Student.last_name,
+            Student.admission_number,
+            Subject.name.label('subject_name'),
+            Exam.name.label('exam_name'),
+            Exam.term,
+            Exam.year,
+            User.name.label('teacher_name')
+        )
+        .join(Student, Student.student_id == Grade.student_id)
+        .join(ExamSchedule, ExamSchedule.id == Grade.exam_schedule_id)
+        .outerjoin(Exam, Exam.exam_id == ExamSchedule.exam_id)
+        .outerjoin(ClassAssignment, ClassAssignment.id == ExamSchedule.class_assignment_id)
+        .outerjoin(Subject, Subject.subject_id == ClassAssignment.subject_id)
+        .outerjoin(Teacher, Teacher.teacher_id == ClassAssignment.teacher_id)
+        .outerjoin(User, User.user_id == Teacher.user_id)
+    )
+
+    filters = {
+        'term': (Exam.term, str),
+        'year': (Exam.year, int),
+        'class_id': (ClassAssignment.class_id, int),
+        'subject_id': (Grade.subject_id, int),
+        'teacher_id': (ClassAssignment.teacher_id, int),
+        'exam_id': (ExamSchedule.exam_id, int),
+    }
+    for name, (column, cast) in filters.items():
+        value = request.args.get(name, type=cast)
+        if value is not None and value != '':
+            query = query.filter(column == value)
+
+    # ⏩ Keyset pagination: the cursor is the last grade_id of the previous page
+    if cursor is not None:
+        query = query.filter(Grade.grade_id < cursor)
+    rows = query.order_by(Grade.grade_id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return jsonify({
+        'grades': [{
+            'grade_id': r.grade_id,
+            'student_name': f"{r.first_name} {r.last_name}",
+            'admission_number': r.admission_number,
+            'subject': r.subject_name or '',
+            'score': r.marks,
+            'exam_name': r.exam_name or '',
+            'term': r.term or '',
+            'year': r.year or '',
+            'teacher_name': r.teacher_name or ''
+        } for r in rows],
+        'next_cursor': rows[-1].grade_id if has_more else None
+    }), 200
 
 
 # 2. Enter grades for an exam schedule
 @grade_bp.route('/', methods=['POST'])
 @token_required
+@idempotent
 def enter_grades(current_user):
     data = request.get_json()
     exam_schedule_id = data.get('exam_schedule_id')
@@ -61,42 +111,13 @@ def enter_grades(current_user):
     if not class_assignment or not class_assignment.subject_id:
         return jsonify({"error": "Related subject not found in class assignment."}), 500
 
-    subject_id = class_assignment.subject_id
-    valid_student_ids = [s.student_id for s in class_assignment.classroom.students]
-
-    responses = []
-
-    for entry in entries:
-        student_id = entry.get('student_id')
-        marks = entry.get('marks')
-
-        if student_id is None or marks is None or student_id not in valid_student_ids:
-            continue
-
-        existing_grade = Grade.query.filter_by(
-            student_id=student_id,
-            exam_schedule_id=exam_schedule_id
-        ).first()
-
-        if existing_grade:
-            existing_grade.marks = marks
-            existing_grade.subject_id = subject_id  # Ensure update in case subject was added later
-            status = "updated"
-        else:
-            new_grade = Grade(
-                student_id=student_id,
-                exam_schedule_id=exam_schedule_id,
-                subject_id=subject_id,
-                marks=marks
-            )
-            db.session.add(new_grade)
-            status = "added"
-
-        responses.append({"student_id": student_id, "status": status})
-
     try:
-        db.session.commit()
+        # 💾 One lookup for existing grades, then batched INSERT ... ON CONFLICT
+        subject_id, class_id = class_assignment.subject_id, class_assignment.class_id
+        responses = run_write(lambda session: upsert_grades(exam_schedule_id, subject_id, class_id, entries))
         return jsonify({"message": "Grades saved successfully", "details": responses}), 201
+    except WriteQueueTimeout as e:
+        return jsonify({"error": str(e), "may_be_applied": e.may_be_applied}), 503
     except IntegrityError:
         db.session.rollback()
         return jsonify({"error": "Database integrity error"}), 409
@@ -105,6 +126,40 @@ def enter_grades(current_user):
         return jsonify({"error": str(e)}), 500
 
 
+# 2b. Import grades for an exam schedule from a CSV/XLSX file
+# (multipart: file + exam_schedule_id; columns admission_number, marks)
+@grade_bp.route('/import', methods=['POST'])
+@token_required
+@idempotent
+def import_grade_file(current_user):
+    if current_user.role not in ['admin', 'teacher']:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    upload = request.files.get('file')
+    exam_schedule_id = request.form.get('exam_schedule_id', type=int)
+    if not upload or not exam_schedule_id:
+        return jsonify({"error": "Missing file or exam_schedule_id"}), 400
+
+    exam_schedule = ExamSchedule.query.get(exam_schedule_id)
+    if not exam_schedule:
+        return jsonify({"error": "ExamSchedule not found"}), 404
+
+    class_assignment = exam_schedule.class_assignment
+    if not class_assignment or not class_assignment.subject_id:
+        return jsonify({"error": "Related subject not found in class assignment."}), 500
+
+    try:
+        summary = import_grades(exam_schedule, upload.stream, upload.filename)
+    except ImportFormatError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Database integrity error"}), 409
+
+    return jsonify({"message": "Grades imported", **summary}), 200
+
+
 # 3. Get grades by student
 @grade_bp.route('/student/<int:student_id>', methods=['GET'])
 @token_required
@@ -147,7 +202,10 @@ def update_grade(current_user, grade_id):
 
     grade = Grade.query.get_or_404(grade_id)
     data = request.get_json()
-    grade.marks = data.get('marks', grade.marks)
+    if 'marks' in data:
+        # A corrected mark replaces any moderation; the next moderation starts from it
+        grade.marks = data['marks']
+        grade.raw_marks = None
 
     db.session.commit()
     return jsonify({'message': 'Grade updated'}), 200
@@ -173,14 +231,195 @@ def summary_by_exam_schedule(current_user, exam_schedule_id):
     student_map = {s.student_id: f"{s.first_name} {s.last_name}" for s in students}
     grade_map = {g.student_id: g.marks for g in grades}
 
-    result = []
-    for student_id, full_name in student_map.items():
-        marks = grade_map.get(student_id, 0)
-        result.append({
-            'student_id': student_id,
-            'student_name': full_name,
-            'marks': marks,
-            'kcse': get_kcse_grade(marks)
-        })
+    marks = [grade_map.get(student_id, 0) for student_id in student_map]
+    kcse_grades = scheme_for_form(classroom.form_level if classroom else None).grade(marks, [subject_id] * len(marks))
+    result = [{
+        'student_id': student_id,
+        'student_name': full_name,
+        'marks': student_marks,
+        'kcse': kcse
+    } for (student_id, full_name), student_marks, kcse in zip(student_map.items(), marks, kcse_grades)]
 
     return jsonify(result), 200
+
+
+# 📊 Mark statistics for an exam schedule, class, subject or whole exam.
+# ?exam_schedule_id= | exam_id= [&class_id=&subject_id=&term=&year=] [&group_by=class|subject|schedule|exam]
+@grade_bp.route('/stats', methods=['GET'])
+@token_required
+def grade_stats(current_user):
+    if current_user.role not in ['teacher', 'admin']:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    group_by = request.args.get('group_by')
+    if group_by and group_by not in STAT_GROUPS:
+        return jsonify({'error': f"group_by must be one of {', '.join(STAT_GROUPS)}"}), 400
+
+    filters = {
+        'exam_schedule_id': (ExamSchedule.id, int),
+        'exam_id': (ExamSchedule.exam_id, int),
+        'class_id': (ClassAssignment.class_id, int),
+        'subject_id': (ClassAssignment.subject_id, int),
+        'term': (Exam.term, str),
+        'year': (Exam.year, int),
+    }
+    criteria = []
+    for name, (column, cast) in filters.items():
+        value = request.args.get(name, type=cast)
+        if value is not None and value != '':
+            criteria.append(column == value)
+    if not criteria:
+        return jsonify({'error': 'Pass exam_schedule_id, exam_id, class_id, subject_id, term or year'}), 400
+
+    stats = grade_statistics(*criteria, group_by=group_by)
+    if stats is None:
+        return jsonify({'error': 'No exam schedules match these filters'}), 404
+    return jsonify(stats), 200
+
+
+# 📝 My exam schedules with the students still missing a mark.
+# One query: each schedule outer-joined to its class's students that have no grade row.
+@grade_bp.route('/worklist/me', methods=['GET'])
+@token_required
+def my_grade_worklist(current_user):
+    if current_user.role != 'teacher':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    has_grade = (
+        db.session.query(Grade.grade_id)
+        .filter(Grade.exam_schedule_id == ExamSchedule.id, Grade.student_id == Student.student_id)
+        .exists()
+    )
+    query = (
+        db.session.query(
+            ExamSchedule.id,
+            Exam.name.label('exam_name'),
+            Exam.term,
+            Exam.year,
+            Classroom.class_id,
+            Classroom.class_name,
+            Subject.name.label('subject_name'),
+            Student.student_id
+        )
+        .join(Exam, Exam.exam_id == ExamSchedule.exam_id)
+        .join(ClassAssignment, ClassAssignment.id == ExamSchedule.class_assignment_id)
+        .join(Classroom, Classroom.class_id == ClassAssignment.class_id)
+        .join(Subject, Subject.subject_id == ClassAssignment.subject_id)
+        .outerjoin(Student, db.and_(Student.class_id == ClassAssignment.class_id, ~has_grade))
+        .filter(ClassAssignment.teacher_id == current_user.teacher_id)
+    )
+    term = request.args.get('term')
+    year = request.args.get('year', type=int)
+    if term:
+        query = query.filter(Exam.term == term)
+    if year:
+        query = query.filter(Exam.year == year)
+
+    schedules = {}
+    for r in query.order_by(Exam.year.desc(), ExamSchedule.id, Student.student_id):
+        schedule = schedules.setdefault(r.id, {
+            'exam_schedule_id': r.id,
+            'exam_name': r.exam_name,
+            'term': r.term,
+            'year': r.year,
+            'class_id': r.class_id,
+            'class_name': r.class_name,
+            'subject_name': r.subject_name,
+            'missing_count': 0,
+            'missing_student_ids': []
+        })
+        if r.student_id is not None:
+            schedule['missing_count'] += 1
+            schedule['missing_student_ids'].append(r.student_id)
+
+    return jsonify(list(schedules.values())), 200
+
+
+# 🕵️ Who changed marks and when (?student_id=&exam_schedule_id=&limit=)
+@grade_bp.route('/audit', methods=['GET'])
+@token_required
+def grade_audit_log(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    query = (
+        db.session.query(GradeAudit, User.name)
+        .outerjoin(User, User.user_id == GradeAudit.changed_by)
+    )
+    student_id = request.args.get('student_id', type=int)
+    exam_schedule_id = request.args.get('exam_schedule_id', type=int)
+    if student_id:
+        query = query.filter(GradeAudit.student_id == student_id)
+    if exam_schedule_id:
+        query = query.filter(GradeAudit.exam_schedule_id == exam_schedule_id)
+    limit = min(request.args.get('limit', 100, type=int), MAX_GRADE_PAGE_SIZE)
+
+    entries = query.order_by(GradeAudit.id.desc()).limit(limit).all()
+    return jsonify([{
+        'id': a.id,
+        'grade_id': a.grade_id,
+        'student_id': a.student_id,
+        'exam_schedule_id': a.exam_schedule_id,
+        'subject_id': a.subject_id,
+        'action': a.action,
+        'old_marks': a.old_marks,
+        'new_marks': a.new_marks,
+        'changed_by': a.changed_by,
+        'changed_by_name': name,
+        'changed_at': a.changed_at.isoformat()
+    } for a, name in entries]), 200
+
+
+# ⚖️ Moderate one exam's marks across parallel classes.
+# {exam_id, subject_id?, class_ids?, method: zscore|linear, target_mean?, target_sd? (zscore only)}
+# /moderation/preview is a dry run; /moderation/apply writes the adjusted marks.
+def _moderation_request():
+    data = request.get_json() or {}
+    exam_id = data.get('exam_id')
+    method = data.get('method', 'zscore')
+    if not isinstance(exam_id, int):
+        return None, (jsonify({'error': 'exam_id is required'}), 400)
+    if method not in MODERATION_METHODS:
+        return None, (jsonify({'error': f"method must be one of {', '.join(MODERATION_METHODS)}"}), 400)
+
+    targets = {}
+    for field in ('target_mean', 'target_sd'):
+        value = data.get(field)
+        if value is not None and (not isinstance(value, (int, float)) or not 0 <= value <= 100):
+            return None, (jsonify({'error': f"{field} must be a number between 0 and 100"}), 400)
+        targets[field] = value
+    if method == 'linear' and targets['target_sd'] is not None:
+        return None, (jsonify({'error': 'target_sd only applies to method zscore'}), 400)
+
+    frame = moderation_frame(exam_id, data.get('subject_id'), data.get('class_ids'))
+    if frame.empty:
+        return None, (jsonify({'error': 'No grades found for this exam'}), 404)
+    return moderate(frame, method, **targets), None
+
+
+@grade_bp.route('/moderation/preview', methods=['POST'])
+@token_required
+def preview_moderation(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    frame, error = _moderation_request()
+    if error:
+        return error
+    return jsonify({'classes': moderation_summary(frame)}), 200
+
+
+@grade_bp.route('/moderation/apply', methods=['POST'])
+@token_required
+@idempotent
+def apply_grade_moderation(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    frame, error = _moderation_request()
+    if error:
+        return error
+
+    updated = apply_moderation(frame)
+    db.session.commit()
+    return jsonify({'message': 'Moderation applied', 'updated': updated, 'classes': moderation_summary(frame)}), 200
@@ -0,0 +1,154 @@
+import math
+from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import IntegrityError
+from app import db
+from models import GradingScheme
+from utils.auth_utils import token_required
+from utils.grading_schemes import validate_boundaries, KCSE_SCHEME_BOUNDARIES
+
+grading_scheme_bp = Blueprint('grading_schemes', __name__)
+
+
+def serialize_scheme(s):
+    return {
+        'id': s.id,
+        'name': s.name,
+        'form_level': s.form_level,
+        'boundaries': s.boundaries,
+        'cat_weight': s.cat_weight,
+        'main_weight': s.main_weight,
+        'subject_overrides': s.subject_overrides or {},
+        'updated_at': s.updated_at.isoformat() if s.updated_at else None
+    }
+
+
+def _weight(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) and value >= 0 else None
+
+
+def _apply(scheme, data):
+    if 'name' in data:
+        scheme.name = data['name']
+    if 'form_level' in data:
+        scheme.form_level = data['form_level']
+    if 'boundaries' in data:
+        error = validate_boundaries(data['boundaries'])
+        if error:
+            return error
+        scheme.boundaries = sorted(
+            ({'min': float(b['min']), 'grade': b['grade']} for b in data['boundaries']),
+            key=lambda b: b['min']
+        )
+    for field in ('cat_weight', 'main_weight'):
+        if field in data:
+            weight = _weight(data[field])
+            if weight is None:
+                return f"{field} must be a non-negative number"
+            setattr(scheme, field, weight)
+    if 'subject_overrides' in data:
+        overrides = data['subject_overrides'] or {}
+        if not isinstance(overrides, dict):
+            return 'subject_overrides must map subject_id to boundaries'
+        for subject_id, boundaries in overrides.items():
+            if not str(subject_id).isdigit():
+                return 'subject_overrides must map subject_id to boundaries'
+            error = validate_boundaries(boundaries)
+            if error:
+                return f"subject {subject_id}: {error}"
+        scheme.subject_overrides = {
+            str(subject_id): sorted(
+                ({'min': float(b['min']), 'grade': b['grade']} for b in boundaries),
+                key=lambda b: b['min']
+            ) for subject_id, boundaries in overrides.items()
+        }
+
+    if not scheme.name:
+        return 'name is required'
+    total = scheme.cat_weight + scheme.main_weight
+    if math.isclose(total, 1):
+        # Fractions (0.4 / 0.6) are stored as percentages like the defaults
+        scheme.cat_weight, scheme.main_weight = scheme.cat_weight * 100, scheme.main_weight * 100
+    elif not math.isclose(total, 100):
+        return 'cat_weight and main_weight must add up to 100 (or 1 as fractions)'
+    return None
+
+
+# 📄 List grading schemes
+@grading_scheme_bp.route('/', methods=['GET'])
+@token_required
+def get_grading_schemes(current_user):
+    if current_user.role not in ['admin', 'teacher']:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    schemes = GradingScheme.query.order_by(GradingScheme.form_level, GradingScheme.id).all()
+    return jsonify([serialize_scheme(s) for s in schemes]), 200
+
+
+# 🆕 Create a grading scheme (defaults to the KCSE boundaries and 40/60 weighting)
+@grading_scheme_bp.route('/', methods=['POST'])
+@token_required
+def create_grading_scheme(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    data = request.get_json() or {}
+    scheme = GradingScheme(boundaries=KCSE_SCHEME_BOUNDARIES, cat_weight=40, main_weight=60, subject_overrides={})
+    error = _apply(scheme, data)
+    if error:
+        return jsonify({'error': error}), 400
+    if 'form_level' in data and data['form_level'] is not None and scheme.form_level is None:
+        return jsonify({'error': 'Invalid form_level'}), 400
+
+    db.session.add(scheme)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'A scheme with this name or form level already exists'}), 409
+
+    return jsonify(serialize_scheme(scheme)), 201
+
+
+# ✏️ Update a grading scheme; the compiled tables are rebuilt on commit
+@grading_scheme_bp.route('/<int:scheme_id>', methods=['PUT'])
+@token_required
+def update_grading_scheme(current_user, scheme_id):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    scheme = GradingScheme.query.get_or_404(scheme_id)
+    data = request.get_json() or {}
+    error = _apply(scheme, data)
+    if error:
+        db.session.rollback()
+        return jsonify({'error': error}), 400
+    if 'form_level' in data and data['form_level'] is not None and scheme.form_level is None:
+        db.session.rollback()
+        return jsonify({'error': 'Invalid form_level'}), 400
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'A scheme with this name or form level already exists'}), 409
+
+    return jsonify(serialize_scheme(scheme)), 200
+
+
+# ❌ Delete a grading scheme
+@grading_scheme_bp.route('/<int:scheme_id>', methods=['DELETE'])
+@token_required
+def delete_grading_scheme(current_user, scheme_id):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    scheme = GradingScheme.query.get_or_404(scheme_id)
+    db.session.delete(scheme)
+    db.session.commit()
+    return jsonify({'message': 'Grading scheme deleted'}), 200
@@ -0,0 +1,90 @@
+import os
+from flask import Blueprint, request, jsonify, send_file
+from models import ReportJob
+from utils.auth_utils import token_required
+from utils.idempotency import idempotent
+from utils.report_jobs import JOB_KINDS, get_report_job_runner
+
+job_bp = Blueprint('jobs', __name__)
+
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'params': job.params,
+        'status': job.status,
+        'error': job.error,
+        'filename': job.filename,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'download_url': f"/api/v1/jobs/{job.id}/download" if job.status == 'done' else None
+    }
+
+
+def _get_own_job(current_user, job_id):
+    job = ReportJob.query.get_or_404(job_id)
+    if current_user.role != 'admin' and job.created_by != current_user.user_id:
+        return None
+    return job
+
+
+# 🚀 Queue a report job, e.g. {"kind": "class_csv", "params": {"class_id": 3}}
+@job_bp.route('/', methods=['POST'])
+@token_required
+@idempotent
+def submit_job(current_user):
+    data = request.get_json() or {}
+    kind = JOB_KINDS.get(data.get('kind'))
+    if not kind:
+        return jsonify({'error': f"kind must be one of {', '.join(JOB_KINDS)}"}), 400
+    if current_user.role not in kind.roles:
+        return jsonify({'error': 'Access denied'}), 403
+
+    params = data.get('params') or {}
+    if not isinstance(params, dict):
+        return jsonify({'error': 'params must be an object'}), 400
+    try:
+        params = kind.parse(params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    job = get_report_job_runner().submit(data['kind'], params, current_user.user_id)
+    return jsonify(serialize_job(job)), 202
+
+
+# 📄 My recent jobs (admins see everyone's)
+@job_bp.route('/', methods=['GET'])
+@token_required
+def list_jobs(current_user):
+    query = ReportJob.query
+    if current_user.role != 'admin':
+        query = query.filter_by(created_by=current_user.user_id)
+    jobs = query.order_by(ReportJob.id.desc()).limit(50).all()
+    return jsonify([serialize_job(j) for j in jobs]), 200
+
+
+# 🔎 Poll a job's status
+@job_bp.route('/<int:job_id>', methods=['GET'])
+@token_required
+def get_job(current_user, job_id):
+    job = _get_own_job(current_user, job_id)
+    if not job:
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify(serialize_job(job)), 200
+
+
+# 📥 Download a finished job's result
+@job_bp.route('/<int:job_id>/download', methods=['GET'])
+@token_required
+def download_job(current_user, job_id):
+    job = _get_own_job(current_user, job_id)
+    if not job:
+        return jsonify({'error': 'Access denied'}), 403
+    if job.status != 'done':
+        return jsonify({'error': f"Job is {job.status}"}), 409
+    if not os.path.exists(job.result_path):
+        return jsonify({'error': 'Result is no longer available'}), 410
+
+    return send_file(job.result_path, as_attachment=True, download_name=job.filename, mimetype=job.mimetype)
@@ -4,6 +4,7 @@ from flask import Blueprint, request, jsonify
 from app import db
 from models import Message, User, Announcement, AnnouncementRead
 from utils.auth_utils import token_required
+from utils.write_queue import run_write, WriteQueueTimeout
 
 message_bp = Blueprint('messages', __name__)
 
@@ -17,8 +18,10 @@ def send_message(current_user):
         receiver_id=data['receiver_id'],
         content=data['content']
     )
-    db.session.add(msg)
-    db.session.commit()
+    try:
+        run_write(lambda session: session.add(msg))
+    except WriteQueueTimeout as e:
+        return jsonify({'error': str(e), 'may_be_applied': e.may_be_applied}), 503
     return jsonify({'message': 'Message sent successfully'}), 201
 
 # 📬 Get all received messages
@@ -1,8 +1,8 @@
 # routes/parents.py
 from flask import Blueprint, request, jsonify
 from models import db, Parent, User, Student
-from werkzeug.security import generate_password_hash
 from utils.auth_utils import token_required
+from utils.passwords import hash_password
 
 parent_bp = Blueprint('parents', __name__)
 
@@ -63,7 +63,7 @@ def create_parent(current_user):
     user = User(
         name=data['name'],
         email=data['email'],
-        password=generate_password_hash(data['password']),
+        password=hash_password(data['password']),
         role='parent'
     )
     db.session.add(user)
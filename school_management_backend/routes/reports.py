@@ -1,13 +1,17 @@
-from flask import Blueprint, request, jsonify, send_file, Response
+from flask import Blueprint, request, jsonify, send_file, Response, stream_with_context, current_app
 from sqlalchemy.orm import joinedload
-from io import StringIO, BytesIO
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
+from io import BytesIO
 from app import db
-from models import Student, Classroom, Grade, Subject, ExamSchedule
+from models import Student, Classroom, Grade, Subject, ExamSchedule, Exam
 from utils.auth_utils import token_required
-from utils.grade_utils import get_kcse_grade
-import csv
+from utils.grading_schemes import scheme_for_form
+from utils.grade_aggregation import weighted_form1_2_scores
+from utils.helpers import normalize_form_level
+from utils.csv_export import gradebook_csv, gradebook_record, gradebook_rows, school_gradebook_csv, stream_csv
+from utils.artifact_cache import get_artifact_cache
+from utils.pdf_reports import render_student_pdf, cohort_report_data, stream_report_zip
+from utils.report_engine import class_performance, overall_forms, RANK_METHODS
+from utils.report_engine import school_rankings as rank_school
 
 report_bp = Blueprint('reports', __name__)
 
@@ -18,28 +22,14 @@ def is_kcse_style(class_name: str) -> bool:
 
 
 # 📊 For Form 1-2: Combine CATs and Main Exam into weighted scores per subject
-def aggregate_form1_2(grades):
-    grouped = {}
-    for g in grades:
-        key = g.subject_id
-        exam_name = g.exam_schedule.exam.name if g.exam_schedule and g.exam_schedule.exam else 'Unknown'
-        grouped.setdefault(key, {'subject': g.subject.name, 'scores': []})
-        grouped[key]['scores'].append((exam_name, g.marks))
-
-    results = []
-    for subject in grouped.values():
-        scores = {name: score for name, score in subject['scores']}
-        cat1 = scores.get("CAT 1", 0)
-        cat2 = scores.get("CAT 2", 0)
-        main = scores.get("Main Exam", 0)
-        total = round(((cat1 + cat2) / 100 * 40) + (main / 100 * 60), 2)
-
-        results.append({
-            'subject': subject['subject'],
-            'score': total,
-            'grade': get_kcse_grade(total)
-        })
-    return results
+def aggregate_form1_2(grades, scheme):
+    return weighted_form1_2_scores(
+        [g.subject.name for g in grades],
+        [g.exam_schedule.exam.name if g.exam_schedule and g.exam_schedule.exam else 'Unknown' for g in grades],
+        [g.marks for g in grades],
+        subject_ids=[g.subject_id for g in grades],
+        scheme=scheme
+    )
 
 
 # 📄 Individual student report (used by admin, teacher, parent)
@@ -61,19 +51,22 @@ def student_report(current_user, student_id):
         return jsonify({'message': 'No grades found'}), 404
 
     # Form 3-4: view all exam scores
+    scheme = scheme_for_form(student.classroom.form_level)
+
     if is_kcse_style(student.classroom.class_name):
+        kcse_grades = scheme.grade([g.marks for g in grades], [g.subject_id for g in grades])
         subject_grades = [{
             'subject': g.subject.name,
             'exam': g.exam_schedule.exam.name if g.exam_schedule and g.exam_schedule.exam else 'N/A',
             'score': g.marks,
-            'grade': get_kcse_grade(g.marks),
+            'grade': kcse_grade,
             'term': g.exam_schedule.exam.term if g.exam_schedule and g.exam_schedule.exam else '',
             'year': g.exam_schedule.exam.year if g.exam_schedule and g.exam_schedule.exam else ''
-        } for g in grades]
+        } for g, kcse_grade in zip(grades, kcse_grades)]
         average = round(sum(g.marks for g in grades) / len(grades), 2)
     else:
         # Form 1-2: aggregate into one weighted subject score
-        subject_grades = aggregate_form1_2(grades)
+        subject_grades = aggregate_form1_2(grades, scheme)
         average = round(sum(g['score'] for g in subject_grades) / len(subject_grades), 2)
 
     return jsonify({
@@ -93,24 +86,7 @@ def class_report(current_user, class_id):
         return jsonify({'error': 'Access denied'}), 403
 
     classroom = Classroom.query.get_or_404(class_id)
-    students = Student.query.filter_by(class_id=class_id).all()
-    data = []
-
-    for s in students:
-        grades = Grade.query.filter_by(student_id=s.student_id).all()
-        if not grades:
-            continue
-        avg = round(sum(g.marks for g in grades) / len(grades), 2)
-        data.append({
-            'student_id': s.student_id,
-            'student_name': f"{s.first_name} {s.last_name}",
-            'average_score': avg,
-            'mean_grade': get_kcse_grade(avg)
-        })
-
-    ranked = sorted(data, key=lambda d: d['average_score'], reverse=True)
-    for i, student in enumerate(ranked, 1):
-        student['position'] = i
+    ranked = class_performance(class_id, scheme_for_form(classroom.form_level))
 
     return jsonify({
         'class_id': classroom.class_id,
@@ -136,54 +112,85 @@ def export_student_pdf(current_user, student_id):
     if not grades:
         return jsonify({'message': 'No grades to export'}), 404
 
-    buffer = BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    y = height - 40
-
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(60, y, "📘 Student Report")
-    y -= 30
-
-    p.setFont("Helvetica", 11)
-    p.drawString(60, y, f"Name: {student.first_name} {student.last_name}")
-    p.drawString(300, y, f"Admission #: {student.admission_number}")
-    y -= 20
-    p.drawString(60, y, f"Class: {student.classroom.class_name}")
-    y -= 30
-
-    p.setFont("Helvetica-Bold", 10)
-    p.drawString(60, y, "Subject")
-    p.drawString(180, y, "Exam")
-    p.drawString(300, y, "Marks")
-    p.drawString(360, y, "Term")
-    p.drawString(420, y, "Year")
-    y -= 15
-
-    p.setFont("Helvetica", 10)
-    for g in grades:
-        if y < 40:
-            p.showPage()
-            y = height - 40
-        exam = g.exam_schedule.exam if g.exam_schedule else None
-        p.drawString(60, y, g.subject.name)
-        p.drawString(180, y, exam.name if exam else "N/A")
-        p.drawString(300, y, str(g.marks))
-        p.drawString(360, y, exam.term if exam else "")
-        p.drawString(420, y, str(exam.year) if exam else "")
-        y -= 15
-
-    p.save()
-    buffer.seek(0)
+    rows = [(
+        g.subject.name,
+        g.exam_schedule.exam.name if g.exam_schedule and g.exam_schedule.exam else None,
+        g.marks,
+        g.exam_schedule.exam.term if g.exam_schedule and g.exam_schedule.exam else None,
+        g.exam_schedule.exam.year if g.exam_schedule and g.exam_schedule.exam else None
+    ) for g in grades]
+    report_student = {
+        'first_name': student.first_name,
+        'last_name': student.last_name,
+        'admission_number': student.admission_number,
+        'class_name': student.classroom.class_name
+    }
+    download_name = f"{student.first_name}_{student.last_name}_report.pdf"
+
+    # ♻️ Same student + same grade rows -> same cached PDF
+    cache = get_artifact_cache()
+    cache_key = cache.key(student_id, 'pdf', [report_student, rows], 'pdf')
+    cached = cache.get(cache_key)
+    if cached:
+        return send_file(cached, as_attachment=True, download_name=download_name, mimetype='application/pdf')
+
+    pdf, _ = render_student_pdf(report_student, rows)
+    cache.put(cache_key, pdf)
 
     return send_file(
-        buffer,
+        BytesIO(pdf),
         as_attachment=True,
-        download_name=f"{student.first_name}_{student.last_name}_report.pdf",
+        download_name=download_name,
         mimetype='application/pdf'
     )
 
 
+# 🗂 Bulk report cards for a whole class as a streamed ZIP
+@report_bp.route('/export/class/<int:class_id>/pdf.zip', methods=['GET'])
+@token_required
+def export_class_pdf_zip(current_user, class_id):
+    if current_user.role not in ['admin', 'teacher']:
+        return jsonify({'error': 'Access denied'}), 403
+
+    classroom = Classroom.query.get_or_404(class_id)
+    cohort = cohort_report_data(Student.class_id == class_id)
+    if not cohort:
+        return jsonify({'message': 'No grades to export'}), 404
+
+    return _zip_response(cohort, f"{classroom.class_name}_report_cards.zip")
+
+
+# 🗂 Bulk report cards for a whole form (e.g. /export/form/3/pdf.zip) as a streamed ZIP
+@report_bp.route('/export/form/<level>/pdf.zip', methods=['GET'])
+@token_required
+def export_form_pdf_zip(current_user, level):
+    if current_user.role not in ['admin', 'teacher']:
+        return jsonify({'error': 'Access denied'}), 403
+
+    form_level = normalize_form_level(level)
+    if not form_level:
+        return jsonify({'error': 'Invalid form'}), 400
+
+    cohort = cohort_report_data(Classroom.form_level == form_level)
+    if not cohort:
+        return jsonify({'message': 'No grades to export'}), 404
+
+    return _zip_response(cohort, f"Form_{form_level}_report_cards.zip")
+
+
+def _zip_response(cohort, filename):
+    workers = current_app.config['REPORT_PDF_WORKERS']
+    return Response(
+        stream_with_context(stream_report_zip(cohort, workers, logger=current_app.logger)),
+        mimetype='application/zip',
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            'X-Report-Count': str(len(cohort)),
+            'X-Report-Workers': str(workers)
+        }
+    )
+
+
 # 📁 Export student report as CSV
 @report_bp.route('/export/student/<int:student_id>/csv', methods=['GET'])
 @token_required
@@ -193,36 +200,20 @@ def export_student_csv(current_user, student_id):
     if current_user.role not in ['admin', 'teacher', 'parent'] and current_user.user_id != student.user_id:
         return jsonify({'error': 'Access denied'}), 403
 
-    text_stream = StringIO()
-    writer = csv.writer(text_stream)
-    text_stream.write('\ufeff')  # BOM for Excel
-    writer.writerow(['Student Name', 'Subject', 'Score', 'Grade', 'Exam', 'Term', 'Year'])
+    header = ['Student Name', 'Subject', 'Score', 'Grade', 'Exam', 'Term', 'Year']
+    records = [gradebook_record(r) for r in gradebook_rows(Grade.student_id == student_id)]
+    download_name = f"{student.admission_number}_report.csv"
 
-    grades = Grade.query.filter_by(student_id=student_id).options(
-        joinedload(Grade.subject),
-        joinedload(Grade.exam_schedule).joinedload(ExamSchedule.exam)
-    ).all()
+    cache = get_artifact_cache()
+    cache_key = cache.key(student_id, 'csv', [header, records], 'csv')
+    cached = cache.get(cache_key)
+    if cached:
+        return send_file(cached, as_attachment=True, download_name=download_name, mimetype='text/csv')
 
-    for g in grades:
-        exam = g.exam_schedule.exam if g.exam_schedule else None
-        writer.writerow([
-            f"{student.first_name} {student.last_name}",
-            g.subject.name,
-            g.marks,
-            get_kcse_grade(g.marks),
-            exam.name if exam else '',
-            exam.term if exam else '',
-            exam.year if exam else ''
-        ])
-
-    output = BytesIO(text_stream.getvalue().encode('utf-8'))
-    output.seek(0)
+    data = b''.join(stream_csv(header, records))
+    cache.put(cache_key, data)
 
-    return Response(
-        output,
-        mimetype='text/csv',
-        headers={'Content-Disposition': f'attachment; filename={student.admission_number}_report.csv'}
-    )
+    return send_file(BytesIO(data), as_attachment=True, download_name=download_name, mimetype='text/csv')
 
 
 # 📁 Export class report as CSV
@@ -233,39 +224,36 @@ def export_class_csv(current_user, class_id):
         return jsonify({'error': 'Access denied'}), 403
 
     classroom = Classroom.query.get_or_404(class_id)
-    students = Student.query.filter_by(class_id=class_id).all()
-
-    text_stream = StringIO()
-    writer = csv.writer(text_stream)
-    text_stream.write('\ufeff')
-    writer.writerow(['Student Name', 'Subject', 'Marks', 'Grade', 'Exam', 'Term', 'Year'])
-
-    for s in students:
-        grades = Grade.query.filter_by(student_id=s.student_id).options(
-            joinedload(Grade.subject),
-            joinedload(Grade.exam_schedule).joinedload(ExamSchedule.exam)
-        ).all()
-
-        for g in grades:
-            exam = g.exam_schedule.exam if g.exam_schedule else None
-            writer.writerow([
-                f"{s.first_name} {s.last_name}",
-                g.subject.name,
-                g.marks,
-                get_kcse_grade(g.marks),
-                exam.name if exam else '',
-                exam.term if exam else '',
-                exam.year if exam else ''
-            ])
-
-    output = BytesIO(text_stream.getvalue().encode('utf-8'))
-    output.seek(0)
+    rows = gradebook_csv(Student.class_id == class_id)
 
     return Response(
-        output,
+        stream_with_context(rows),
         mimetype="text/csv",
         headers={"Content-Disposition": f"attachment; filename={classroom.class_name}_report.csv"}
     )
+
+
+# 📁 Export every grade in the school as CSV (optionally one term/year)
+@report_bp.route('/export/school/csv', methods=['GET'])
+@token_required
+def export_school_csv(current_user):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Access denied'}), 403
+
+    term = request.args.get('term')
+    year = request.args.get('year', type=int)
+
+    criteria = []
+    if term:
+        criteria.append(Exam.term == term)
+    if year:
+        criteria.append(Exam.year == year)
+
+    return Response(
+        stream_with_context(school_gradebook_csv(*criteria)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=school_gradebook.csv"}
+    )
     
     # Overall report
 @report_bp.route('/overall-forms', methods=['GET', 'OPTIONS'])
@@ -274,49 +262,7 @@ def overall_forms_report(current_user):
     if current_user.role not in ['admin', 'teacher']:
         return jsonify({'error': 'Access denied'}), 403
 
-    # Fetch all students with classrooms
-    students = Student.query.options(joinedload(Student.classroom)).all()
-
-    form_data = {}
-
-    for student in students:
-        class_name = student.classroom.class_name if student.classroom else ''
-        form_key = class_name.split(" ")[0] if class_name else 'Unknown'
-
-        grades = Grade.query.filter_by(student_id=student.student_id).all()
-        if not grades:
-            continue
-
-        mean_score = round(sum(g.marks for g in grades) / len(grades), 2)
-        grade = get_kcse_grade(mean_score)
-
-        student_summary = {
-            'student_id': student.student_id,
-            'student_name': f"{student.first_name} {student.last_name}",
-            'class_name': class_name,
-            'mean_score': mean_score,
-            'kcse_grade': grade
-        }
-
-        if form_key not in form_data:
-            form_data[form_key] = {
-                'student_count': 0,
-                'total_score': 0,
-                'grade_distribution': {},
-                'students': []
-            }
-
-        form_data[form_key]['student_count'] += 1
-        form_data[form_key]['total_score'] += mean_score
-        form_data[form_key]['grade_distribution'][grade] = form_data[form_key]['grade_distribution'].get(grade, 0) + 1
-        form_data[form_key]['students'].append(student_summary)
-
-    # Finalize average score per form
-    for form_key, data in form_data.items():
-        data['mean_score'] = round(data['total_score'] / data['student_count'], 2)
-        del data['total_score']
-
-    return jsonify(form_data), 200
+    return jsonify(overall_forms()), 200
 
 @report_bp.route('/school/rankings', methods=['GET'])
 @token_required
@@ -324,59 +270,18 @@ def school_rankings(current_user):
     if current_user.role not in ['admin', 'teacher']:
         return jsonify({'error': 'Access denied'}), 403
 
-    forms = ['Form 1', 'Form 2', 'Form 3', 'Form 4']
-    form_rankings = {}
-
-    for form_level in forms:
-        # Get all classes under this form (e.g. Form 1R, 1G, etc.)
-        classes = Classroom.query.filter(Classroom.class_name.startswith(form_level)).all()
-
-        form_students = []
-        class_means = {}
-
-        for classroom in classes:
-            students = Student.query.filter_by(class_id=classroom.class_id).all()
-            class_student_data = []
-
-            for student in students:
-                grades = Grade.query.filter_by(student_id=student.student_id).all()
-                if not grades:
-                    continue
-
-                total_marks = sum(g.marks for g in grades)
-                avg = round(total_marks / len(grades), 2)
-
-                student_info = {
-                    'student_id': student.student_id,
-                    'student_name': f"{student.first_name} {student.last_name}",
-                    'class_name': classroom.class_name,
-                    'total_marks': total_marks,
-                    'average_score': avg,
-                    'mean_grade': get_kcse_grade(avg)
-                }
-                form_students.append(student_info)
-                class_student_data.append(avg)
-
-            # Class mean (if students exist)
-            if class_student_data:
-                class_mean = round(sum(class_student_data) / len(class_student_data), 2)
-                class_means[classroom.class_name] = class_mean
-
-        # Rank students by average score
-        ranked = sorted(form_students, key=lambda d: d['average_score'], reverse=True)
-        for i, s in enumerate(ranked, 1):
-            s['position'] = i
-
-        # Form mean from all class means
-        form_mean = (
-            round(sum(class_means.values()) / len(class_means), 2)
-            if class_means else 0
-        )
-
-        form_rankings[form_level] = {
-            'form_mean': form_mean,
-            'class_means': class_means,
-            'students': ranked
-        }
+    form_level = request.args.get('form')
+    limit = request.args.get('limit', type=int)
+    method = request.args.get('rank', 'competition')
+
+    if form_level is not None:
+        form_level = normalize_form_level(form_level)
+        if not form_level:
+            return jsonify({'error': 'Invalid form'}), 400
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    if method not in RANK_METHODS:
+        return jsonify({'error': f"rank must be one of {', '.join(RANK_METHODS)}"}), 400
 
+    form_rankings = rank_school(form_level=form_level, limit=limit, method=method)
     return jsonify(form_rankings), 200
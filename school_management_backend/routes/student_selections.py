@@ -8,6 +8,7 @@ student_selection_bp = Blueprint('student_selection', __name__)
 
 from flask import Blueprint, request, jsonify
 from models import db, Student, Subject, StudentSelection
+from utils.helpers import normalize_form_level
 
 student_selection_bp = Blueprint('student_selection', __name__)
 
@@ -26,10 +27,11 @@ def select_subjects():
     if not student or not student.classroom:
         return jsonify({'error': 'Student or classroom not found'}), 404
 
-    form_level = student.classroom.form_level
-    if form_level not in ['Form 3', 'Form 4']:
+    form_level = normalize_form_level(student.classroom.form_level)
+    if form_level not in ('3', '4'):
+        current = f"Form {form_level}" if form_level else 'a class without a form level'
         return jsonify({
-            'error': f'Subject selection allowed only for Form 3 and 4 students. Student is in {form_level}.'
+            'error': f'Subject selection allowed only for Form 3 and 4 students. Student is in {current}.'
         }), 403
 
     # Optional: Clear old selections before adding new ones
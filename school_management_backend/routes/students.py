@@ -4,6 +4,7 @@ from app import db
 from models import Student, Classroom, Parent, Exam
 from utils.auth_utils import token_required
 from utils.grade_utils import get_kcse_grade
+from utils.helpers import normalize_term
 from datetime import datetime
 
 student_bp = Blueprint('students', __name__)
@@ -110,8 +111,8 @@ def delete_student(current_user, student_id):
 @token_required
 def get_student_report_card(current_user, student_id):
     from models import Grade, Subject, ExamSchedule, Exam
-    from sqlalchemy import func
-    from utils.grade_utils import get_kcse_grade
+    from utils.grading_schemes import scheme_for_form
+    from utils.leaderboard_cache import get_leaderboard_cache
 
     term = request.args.get('term')
     year = request.args.get('year')
@@ -119,42 +120,29 @@ def get_student_report_card(current_user, student_id):
 
     if not term or not year:
         return jsonify({'error': 'Missing term or year'}), 400
+    term = normalize_term(term)
+    if not term:
+        return jsonify({'error': 'Invalid term (expected Term 1, Term 2 or Term 3)'}), 400
+    if not year.isdigit():
+        return jsonify({'error': 'Invalid year'}), 400
 
     student = Student.query.get_or_404(student_id)
     classroom = student.classroom
     if not classroom:
         return jsonify({'error': 'Student has no class assigned'}), 400
 
-    # 📊 Get classmates and calculate their mean scores
-    classmates = Student.query.filter_by(class_id=classroom.class_id).all()
-    student_means = []
-
-    for s in classmates:
-        grades = (
-            db.session.query(Grade, ExamSchedule, Exam)
-            .join(ExamSchedule, Grade.exam_schedule_id == ExamSchedule.id)
-            .join(Exam, Exam.exam_id == ExamSchedule.exam_id)
-            .filter(
-                Grade.student_id == s.student_id,
-                Exam.term == term,
-                Exam.year == year
-            )
-            .all()
-        )
-        marks = [grade.marks for grade, _, _ in grades]
-        avg = sum(marks) / len(marks) if marks else 0
-
-        student_means.append({
-            'student_id': s.student_id,
-            'student_name': f"{s.first_name} {s.last_name}",
-            'mean': round(avg, 1),
-            'kcse_grade': get_kcse_grade(avg)
-        })
+    scheme = scheme_for_form(classroom.form_level)
 
-    sorted_means = sorted(student_means, key=lambda x: x['mean'], reverse=True)
+    # 📊 Class leaderboard for the term, shared by every report card of the class
+    board = get_leaderboard_cache().get(classroom.class_id, term, int(year))
+    sorted_means = board['students']
     position = next((i + 1 for i, s in enumerate(sorted_means) if s['student_id'] == student_id), None)
-    class_average = round(sum(s['mean'] for s in sorted_means) / len(sorted_means), 1) if sorted_means else 0
-    leaderboard = sorted_means[:top_n]
+    class_average = board['class_average']
+    top = sorted_means[:top_n]
+    leaderboard = [
+        dict(s, kcse_grade=kcse_grade)
+        for s, kcse_grade in zip(top, scheme.grade([s['mean'] for s in top]))
+    ]
 
     # 📚 Subject-wise breakdown
     grades = (
@@ -178,6 +166,7 @@ def get_student_report_card(current_user, student_id):
 
         if subject_name not in subjects:
             subjects[subject_name] = {
+                'subject_id': subject.subject_id,
                 'subject_name': subject_name,
                 'average_score': 0,
                 'kcse_grade': '',
@@ -191,11 +180,14 @@ def get_student_report_card(current_user, student_id):
             'year': exam.year
         })
 
-    for sub in subjects.values():
-        scores = [e['score'] for e in sub['exams']]
-        avg = sum(scores) / len(scores) if scores else 0
+    subject_averages = [
+        sum(e['score'] for e in sub['exams']) / len(sub['exams'])
+        for sub in subjects.values()
+    ]
+    subject_grades = scheme.grade(subject_averages, [sub.pop('subject_id') for sub in subjects.values()])
+    for sub, avg, kcse_grade in zip(subjects.values(), subject_averages, subject_grades):
         sub['average_score'] = round(avg, 1)
-        sub['kcse_grade'] = get_kcse_grade(avg)
+        sub['kcse_grade'] = kcse_grade
         total_score += avg
 
     mean_score = round(total_score / len(subjects), 1) if subjects else 0
@@ -207,7 +199,7 @@ def get_student_report_card(current_user, student_id):
         'term': term,
         'year': year,
         'mean_score': mean_score,
-        'kcse_grade': get_kcse_grade(mean_score),
+        'kcse_grade': scheme.grade_one(mean_score),
         'position': position,
         'class_average': class_average,
         'leaderboard': leaderboard,
@@ -1,13 +1,97 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy.orm import joinedload
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+import pandas as pd
 from app import db
-from models import Grade, Student, Subject, Exam, TeacherSubject
+from models import Grade, Student, Subject, Exam, ExamSchedule, ClassAssignment, Classroom
 from utils.auth_utils import token_required
-from utils.grade_utils import get_kcse_grade
+from utils.csv_export import stream_csv
+from utils.grading_schemes import scheme_for_form
 
 teacher_report_bp = Blueprint('teacher_reports', __name__)
 
-# 📊 GET Grades for Teacher’s Subject + Class
+REPORT_COLUMNS = [
+    'class_assignment_id', 'class_id', 'class_name', 'form_level', 'subject_id', 'subject_name',
+    'student_id', 'admission_number', 'first_name', 'last_name', 'exam_name', 'term', 'year', 'marks'
+]
+CSV_HEADER = ['Class', 'Subject', 'Admission Number', 'Student Name', 'Exam', 'Term', 'Year', 'Marks', 'Average', 'Grade']
+
+
+# 📥 Every grade a teacher's assignments produced, in one joined query
+# (ClassAssignment -> ExamSchedule -> Exam), with per-student averages and grades
+def _teacher_grades_frame(teacher_id, term=None, year=None, *criteria):
+    query = (
+        db.session.query(
+            ClassAssignment.id,
+            Classroom.class_id,
+            Classroom.class_name,
+            Classroom.form_level,
+            Subject.subject_id,
+            Subject.name,
+            Student.student_id,
+            Student.admission_number,
+            Student.first_name,
+            Student.last_name,
+            Exam.name,
+            Exam.term,
+            Exam.year,
+            Grade.marks
+        )
+        .select_from(ClassAssignment)
+        .join(Classroom, Classroom.class_id == ClassAssignment.class_id)
+        .join(Subject, Subject.subject_id == ClassAssignment.subject_id)
+        .join(ExamSchedule, ExamSchedule.class_assignment_id == ClassAssignment.id)
+        .join(Exam, Exam.exam_id == ExamSchedule.exam_id)
+        .join(Grade, Grade.exam_schedule_id == ExamSchedule.id)
+        .join(Student, Student.student_id == Grade.student_id)
+        .filter(ClassAssignment.teacher_id == teacher_id, *criteria)
+    )
+    if term:
+        query = query.filter(Exam.term == term)
+    if year:
+        query = query.filter(Exam.year == year)
+
+    frame = pd.DataFrame(
+        query.order_by(Classroom.class_name, Subject.name, Student.student_id, Exam.exam_id).all(),
+        columns=REPORT_COLUMNS
+    )
+    frame['average'] = frame.groupby(['class_assignment_id', 'student_id'])['marks'].transform('mean').round(2)
+
+    # ⚡ One grading call per form level
+    frame['grade'] = None
+    for (level, subject_id), group in frame.groupby(['form_level', 'subject_id'], dropna=False, sort=False):
+        scheme = scheme_for_form(None if pd.isna(level) else level)
+        frame.loc[group.index, 'grade'] = scheme.grade(group['average'].to_numpy(), [subject_id] * len(group))
+    return frame
+
+
+def _students(frame):
+    return [{
+        'student_id': int(student_id),
+        'student_name': f"{rows['first_name'].iat[0]} {rows['last_name'].iat[0]}",
+        'average_score': float(rows['average'].iat[0]),
+        'kcse_grade': rows['grade'].iat[0],
+        'exams': [{
+            'exam': exam,
+            'score': score,
+            'term': term,
+            'year': int(year)
+        } for exam, score, term, year in zip(rows['exam_name'], rows['marks'], rows['term'], rows['year'])]
+    } for student_id, rows in frame.groupby('student_id', sort=False)]
+
+
+def _csv_response(frame, filename):
+    rows = (
+        [r.class_name, r.subject_name, r.admission_number, f"{r.first_name} {r.last_name}",
+         r.exam_name, r.term, r.year, r.marks, r.average, r.grade]
+        for r in frame.itertuples()
+    )
+    return Response(
+        stream_with_context(stream_csv(CSV_HEADER, rows)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+# 📊 GET Grades for Teacher's Subject + Class (?term=&year=&format=csv)
 @teacher_report_bp.route('/grades/<int:class_id>/<int:subject_id>', methods=['GET'])
 @token_required
 def teacher_grades(current_user, class_id, subject_id):
@@ -15,64 +99,47 @@ def teacher_grades(current_user, class_id, subject_id):
         return jsonify({'error': 'Unauthorized'}), 403
 
     # 🧠 Confirm teacher teaches the subject in the class
-    teacher_subject = TeacherSubject.query.filter_by(
-        teacher_id=current_user.teacher.teacher_id,
+    assignment = ClassAssignment.query.filter_by(
+        teacher_id=current_user.teacher_id,
         class_id=class_id,
         subject_id=subject_id
     ).first()
 
-    if not teacher_subject:
+    if not assignment:
         return jsonify({'error': 'You are not assigned to this subject in this class'}), 403
 
-    term = request.args.get('term')
-    year = request.args.get('year', type=int)
+    frame = _teacher_grades_frame(
+        current_user.teacher_id,
+        request.args.get('term'),
+        request.args.get('year', type=int),
+        ClassAssignment.id == assignment.id
+    )
 
-    # 📥 Get all students in class
-    students = Student.query.filter_by(class_id=class_id).all()
-    student_map = {s.student_id: f"{s.first_name} {s.last_name}" for s in students}
+    if request.args.get('format') == 'csv':
+        return _csv_response(frame, f"{assignment.classroom.class_name}_{assignment.subject.name}_grades.csv")
+    return jsonify(_students(frame)), 200
 
-    # 🧾 Get grades for subject
-    grade_query = Grade.query.options(
-        joinedload(Grade.student),
-        joinedload(Grade.exam)
-    ).filter_by(subject_id=subject_id)
 
-    if term:
-        grade_query = grade_query.filter(Grade.term == term)
-    if year:
-        grade_query = grade_query.filter(Grade.year == year)
-
-    grades = grade_query.all()
-
-    # 🧮 Organize by student
-    results = {}
-    for g in grades:
-        sid = g.student_id
-        if sid not in results:
-            results[sid] = {
-                'student_name': student_map.get(sid, 'Unknown'),
-                'exams': [],
-                'total_score': 0,
-                'count': 0
-            }
-        results[sid]['exams'].append({
-            'exam': g.exam.name if g.exam else 'N/A',
-            'score': g.score,
-            'term': g.term,
-            'year': g.year
-        })
-        results[sid]['total_score'] += g.score
-        results[sid]['count'] += 1
-
-    # 🧾 Format output
-    final = []
-    for sid, data in results.items():
-        avg = round(data['total_score'] / data['count'], 2) if data['count'] else 0
-        final.append({
-            'student_name': data['student_name'],
-            'average_score': avg,
-            'kcse_grade': get_kcse_grade(avg),
-            'exams': data['exams']
-        })
-
-    return jsonify(final), 200
+# 📚 GET Grades for all of the teacher's classes and subjects at once (?term=&year=&format=csv)
+@teacher_report_bp.route('/grades/me', methods=['GET'])
+@token_required
+def my_teacher_grades(current_user):
+    if current_user.role != 'teacher':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    frame = _teacher_grades_frame(
+        current_user.teacher_id,
+        request.args.get('term'),
+        request.args.get('year', type=int)
+    )
+
+    if request.args.get('format') == 'csv':
+        return _csv_response(frame, 'my_class_grades.csv')
+
+    return jsonify([{
+        'class_id': int(rows['class_id'].iat[0]),
+        'class_name': rows['class_name'].iat[0],
+        'subject_id': int(rows['subject_id'].iat[0]),
+        'subject_name': rows['subject_name'].iat[0],
+        'students': _students(rows)
+    } for _, rows in frame.groupby('class_assignment_id', sort=False)]), 200
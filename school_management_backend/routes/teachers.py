@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
 from models import db, Teacher, User
-from werkzeug.security import generate_password_hash
 from utils.auth_utils import token_required
 from utils.helpers import generate_employee_number, generate_random_password
+from utils.passwords import hash_password
 from sqlalchemy import or_, func
 
 teacher_bp = Blueprint('teachers', __name__)
@@ -55,7 +55,7 @@ def create_teacher(current_user):
     new_user = User(
         name=name,
         email=email,
-        password=generate_password_hash(password),
+        password=hash_password(password),
         role='teacher'
     )
     db.session.add(new_user)
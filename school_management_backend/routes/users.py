@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from app import db
 from models import User
 from utils.auth_utils import token_required
+from utils.passwords import hash_password
 
 
 user_bp = Blueprint("users", __name__)
@@ -56,7 +57,7 @@ def create_user(current_user):
     if existing:
         return jsonify({"error": "Email already exists"}), 409
 
-    new_user = User(name=name, email=email, password=password, role=role)
+    new_user = User(name=name, email=email, password=hash_password(password), role=role)
     db.session.add(new_user)
     db.session.commit()
 
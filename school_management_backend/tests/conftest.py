@@ -0,0 +1,107 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Config reads the environment at import time, so point it at a scratch database first
+_TMP = tempfile.mkdtemp(prefix='school-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ['DB_PROFILE'] = 'test'
+os.environ['SECRET_KEY'] = 'test-secret-key-that-is-long-enough-for-hs256'
+os.environ['REPORT_CACHE_DIR'] = os.path.join(_TMP, 'report_cache')
+os.environ['REPORT_JOB_DIR'] = os.path.join(_TMP, 'report_jobs')
+os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from utils.grading_schemes import clear_scheme_cache  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture(autouse=True)
+def clean_db(app):
+    yield
+    with app.app_context():
+        db.session.remove()
+        with db.engine.begin() as connection:
+            for table in reversed(db.metadata.sorted_tables):
+                connection.execute(table.delete())
+    for name in ('principal_cache', 'leaderboard_cache'):
+        app.extensions[name].clear()
+    clear_scheme_cache()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    from models import User, Teacher
+    from utils.auth_utils import generate_token
+
+    def make(role='admin'):
+        with app.app_context():
+            user = User(name=f"Test {role}", email=f"{role}-{User.query.count()}@test", password='x', role=role)
+            db.session.add(user)
+            db.session.flush()
+            if role == 'teacher':
+                db.session.add(Teacher(user_id=user.user_id, employee_number=f"T{user.user_id}"))
+            db.session.commit()
+            return {'Authorization': f"Bearer {generate_token(user)}"}
+    return make
+
+
+# Two Form 2 classes sitting one Mathematics paper: class A scored 40/50/60, class B 70/80/90
+@pytest.fixture
+def graded_exam(app):
+    from models import (
+        User, Teacher, Classroom, Subject, Student, Exam, ClassAssignment, ExamSchedule, Grade
+    )
+
+    with app.app_context():
+        user = User(name='Maths Teacher', email='maths@test', password='x', role='teacher')
+        subject = Subject(name='Mathematics')
+        exam = Exam(name='CAT 1', term='Term 1', year=2026, form_level='Form 2')
+        db.session.add_all([user, subject, exam])
+        db.session.flush()
+        teacher = Teacher(user_id=user.user_id, employee_number='T-MATHS')
+        db.session.add(teacher)
+        db.session.flush()
+
+        ids = {'exam_id': exam.exam_id, 'subject_id': subject.subject_id, 'schedules': {}, 'grades': {}}
+        for class_name, marks in (('2A', [40, 50, 60]), ('2B', [70, 80, 90])):
+            classroom = Classroom(class_name=class_name, form_level='2')
+            db.session.add(classroom)
+            db.session.flush()
+            assignment = ClassAssignment(class_id=classroom.class_id, subject_id=subject.subject_id,
+                                         teacher_id=teacher.teacher_id)
+            db.session.add(assignment)
+            db.session.flush()
+            schedule = ExamSchedule(exam_id=exam.exam_id, class_assignment_id=assignment.id)
+            db.session.add(schedule)
+            db.session.flush()
+            ids['schedules'][class_name] = schedule.id
+            for i, mark in enumerate(marks):
+                student = Student(admission_number=f"{class_name}-{i}", first_name='Student', last_name=str(i),
+                                  gender='F', date_of_birth='2010-01-01', class_id=classroom.class_id)
+                db.session.add(student)
+                db.session.flush()
+                grade = Grade(exam_schedule_id=schedule.id, student_id=student.student_id,
+                              subject_id=subject.subject_id, marks=mark)
+                db.session.add(grade)
+                db.session.flush()
+                ids['grades'][(class_name, i)] = (grade.grade_id, student.student_id)
+        db.session.commit()
+        return ids
@@ -0,0 +1,55 @@
+import os
+from utils.artifact_cache import ArtifactCache
+
+
+def test_invalidating_a_student_removes_only_their_reports(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=1024 * 1024)
+    first = cache.key(1, 'pdf', ['rows'], 'pdf')
+    second = cache.key(2, 'pdf', ['rows'], 'pdf')
+    cache.put(first, b'one')
+    cache.put(second, b'two')
+
+    cache.invalidate_students({1})
+
+    assert not os.path.exists(tmp_path / '1')
+    assert cache.get(first) is None
+    with cache.get(second) as f:
+        assert f.read() == b'two'
+
+
+def test_least_recently_used_reports_are_evicted(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=10)
+    old = cache.key(1, 'csv', ['old'], 'csv')
+    cache.put(old, b'123456')
+    os.utime(tmp_path / old, (0, 0))
+    new = cache.key(2, 'csv', ['new'], 'csv')
+    cache.put(new, b'123456')
+
+    assert cache.get(old) is None
+    with cache.get(new) as f:
+        assert f.read() == b'123456'
+
+
+def test_cached_report_stays_readable_after_invalidation(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=1024 * 1024)
+    name = cache.key(1, 'pdf', ['rows'], 'pdf')
+    cache.put(name, b'report')
+
+    with cache.get(name) as f:
+        cache.invalidate_students({1})
+        assert f.read() == b'report'
+
+
+def test_startup_removes_only_files_the_cache_wrote(tmp_path):
+    legacy = tmp_path / f"7-{'a' * 64}.pdf"
+    stale_tmp = tmp_path / '.artifact-abc123.tmp'
+    fresh_tmp = tmp_path / '.artifact-def456.tmp'
+    unrelated = tmp_path / 'school.db'
+    for path in (legacy, stale_tmp, fresh_tmp, unrelated):
+        path.write_bytes(b'x')
+    os.utime(stale_tmp, (0, 0))
+
+    ArtifactCache(str(tmp_path), max_bytes=1024)
+
+    assert not legacy.exists() and not stale_tmp.exists()
+    assert fresh_tmp.exists() and unrelated.exists()
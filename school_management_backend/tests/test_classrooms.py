@@ -0,0 +1,35 @@
+from app import db
+from models import Classroom
+
+
+def test_create_class_normalizes_form_level(app, client, auth_headers):
+    response = client.post('/api/v1/classrooms/', json={'class_name': '3 East', 'form_level': 'Form 3'},
+                           headers=auth_headers('admin'))
+
+    assert response.status_code == 201
+    with app.app_context():
+        assert Classroom.query.one().form_level == '3'
+
+
+def test_create_class_rejects_unknown_form_level(app, client, auth_headers):
+    response = client.post('/api/v1/classrooms/', json={'class_name': '5 East', 'form_level': 'Form 5'},
+                           headers=auth_headers('admin'))
+
+    assert response.status_code == 400
+    with app.app_context():
+        assert Classroom.query.count() == 0
+
+
+def test_update_class_rejects_unknown_form_level(app, client, auth_headers):
+    with app.app_context():
+        classroom = Classroom(class_name='2 West', form_level='2')
+        db.session.add(classroom)
+        db.session.commit()
+        class_id = classroom.class_id
+
+    response = client.put(f'/api/v1/classrooms/{class_id}', json={'form_level': 'Grade 9'},
+                          headers=auth_headers('admin'))
+
+    assert response.status_code == 400
+    with app.app_context():
+        assert db.session.get(Classroom, class_id).form_level == '2'
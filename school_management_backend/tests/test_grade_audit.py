@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy.exc import OperationalError
+from app import db
+from models import GradeAudit
+from utils import grade_audit
+from utils.grade_audit import GradeAuditWriter
+
+
+class _LockedEngine:
+    """Fails like a busy SQLite database for the first few transactions."""
+
+    def __init__(self, engine, failures):
+        self.engine = engine
+        self.failures = failures
+
+    def begin(self):
+        if self.failures:
+            self.failures -= 1
+            raise OperationalError('INSERT INTO grade_audits', {}, Exception('database is locked'))
+        return self.engine.begin()
+
+
+def test_audit_batch_is_retried_until_written(app, monkeypatch):
+    monkeypatch.setattr(grade_audit, '_RETRY_START', 0.001)
+    records = [{
+        'grade_id': None, 'student_id': i, 'exam_schedule_id': 1, 'subject_id': 1, 'action': 'upsert',
+        'old_marks': None, 'new_marks': 50, 'changed_by': None, 'changed_at': datetime.utcnow()
+    } for i in range(3)]
+    with app.app_context():
+        writer = GradeAuditWriter(_LockedEngine(db.engine, failures=3), batch_size=10, flush_seconds=0.01,
+                                  max_queue=10, put_timeout=0.01)
+        writer.submit(records)
+        writer.close()
+
+        assert GradeAudit.query.count() == 3
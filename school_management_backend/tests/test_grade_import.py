@@ -0,0 +1,31 @@
+import io
+
+
+def _upload(client, headers, graded_exam, data, filename):
+    return client.post('/api/v1/grades/import', headers=headers, content_type='multipart/form-data', data={
+        'exam_schedule_id': str(graded_exam['schedules']['2A']),
+        'file': (io.BytesIO(data), filename),
+    })
+
+
+def test_csv_import_updates_marks(client, auth_headers, graded_exam):
+    response = _upload(client, auth_headers('teacher'), graded_exam, b'admission_number,marks\n2A-0,65\n', 'marks.csv')
+
+    assert response.status_code == 200
+    assert response.get_json()['updated'] == 1
+
+
+def test_non_utf8_csv_is_a_format_error(client, auth_headers, graded_exam):
+    data = 'admission_number,marks,comment\n2A-0,65,Très bien\n'.encode('cp1252')
+
+    response = _upload(client, auth_headers('teacher'), graded_exam, data, 'marks.csv')
+
+    assert response.status_code == 400
+    assert 'UTF-8' in response.get_json()['error']
+
+
+def test_corrupt_xlsx_is_a_format_error(client, auth_headers, graded_exam):
+    response = _upload(client, auth_headers('teacher'), graded_exam, b'not really a workbook', 'marks.xlsx')
+
+    assert response.status_code == 400
+    assert 'xlsx' in response.get_json()['error']
@@ -0,0 +1,36 @@
+from sqlalchemy import insert
+from app import db
+from models import GradingScheme
+from utils.grading_schemes import scheme_for_form, KCSE_SCHEME_BOUNDARIES
+
+
+def test_scheme_edits_from_another_process_are_picked_up(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'GRADING_SCHEME_CHECK_SECONDS', 0)
+    with app.app_context():
+        assert scheme_for_form('2').name == 'KCSE'
+
+        # Written outside this process's sessions, so no after_commit invalidation runs here
+        with db.engine.begin() as connection:
+            connection.execute(insert(GradingScheme.__table__).values(
+                name='Junior', form_level='2', boundaries=KCSE_SCHEME_BOUNDARIES,
+                cat_weight=50, main_weight=50, subject_overrides={}
+            ))
+
+        assert scheme_for_form('2').name == 'Junior'
+
+
+def test_scheme_weights_are_validated(client, auth_headers):
+    headers = auth_headers('admin')
+
+    for weights in ({'cat_weight': 'forty'}, {'cat_weight': None}, {'cat_weight': -10, 'main_weight': 110},
+                    {'cat_weight': 30, 'main_weight': 30}):
+        response = client.post('/api/v1/grading-schemes/', json={'name': 'Bad', **weights}, headers=headers)
+        assert response.status_code == 400, weights
+
+
+def test_fractional_scheme_weights_are_stored_as_percentages(client, auth_headers):
+    response = client.post('/api/v1/grading-schemes/', json={'name': 'Junior', 'cat_weight': 0.3, 'main_weight': 0.7},
+                           headers=auth_headers('admin'))
+
+    assert response.status_code == 201
+    assert (response.get_json()['cat_weight'], response.get_json()['main_weight']) == (30, 70)
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app import db
+from models import IdempotencyKey, User, Grade
+
+
+def _grade_request(graded_exam):
+    _, student_id = graded_exam['grades'][('2A', 0)]
+    return {'exam_schedule_id': graded_exam['schedules']['2A'], 'grades': [{'student_id': student_id, 'marks': 55}]}
+
+
+def _pending_claim(app, request_hash, heartbeat_at):
+    with app.app_context():
+        user_id = User.query.filter(User.email.like('teacher-%')).one().user_id
+        with db.engine.begin() as connection:
+            connection.execute(insert(IdempotencyKey.__table__).values(
+                user_id=user_id, key='enter-2A', endpoint='grades.enter_grades', request_hash=request_hash,
+                status='pending', created_at=heartbeat_at, heartbeat_at=heartbeat_at,
+                expires_at=heartbeat_at + timedelta(days=1)
+            ))
+
+
+def test_abandoned_claim_is_taken_over(app, client, auth_headers, graded_exam):
+    headers = {**auth_headers('teacher'), 'Idempotency-Key': 'enter-2A'}
+    # Left pending by a worker that died: no heartbeat for longer than the lease
+    _pending_claim(app, 'stale', datetime.utcnow() - timedelta(seconds=app.config['IDEMPOTENCY_LEASE_SECONDS'] + 5))
+
+    response = client.post('/api/v1/grades/', json=_grade_request(graded_exam), headers=headers)
+    assert response.status_code == 201
+
+    replay = client.post('/api/v1/grades/', json=_grade_request(graded_exam), headers=headers)
+    assert replay.status_code == 201
+    assert replay.headers['Idempotent-Replayed'] == 'true'
+
+
+def test_duplicate_of_a_live_request_gets_409(app, client, auth_headers, graded_exam, monkeypatch):
+    monkeypatch.setitem(app.config, 'IDEMPOTENCY_WAIT_SECONDS', 0.2)
+    headers = {**auth_headers('teacher'), 'Idempotency-Key': 'enter-2A'}
+    with app.test_request_context('/api/v1/grades/', method='POST', json=_grade_request(graded_exam)):
+        from utils.idempotency import _request_hash
+        request_hash = _request_hash()
+    _pending_claim(app, request_hash, datetime.utcnow())
+
+    response = client.post('/api/v1/grades/', json=_grade_request(graded_exam), headers=headers)
+
+    assert response.status_code == 409
+    grade_id, _ = graded_exam['grades'][('2A', 0)]
+    with app.app_context():
+        assert db.session.get(Grade, grade_id).marks == 40
+
+
+def test_heartbeat_renews_the_claim(app, auth_headers):
+    import time
+    from utils.idempotency import _Heartbeat, _row_filter
+
+    auth_headers('teacher')
+    started = datetime.utcnow() - timedelta(minutes=5)
+    _pending_claim(app, 'running', started)
+    with app.app_context():
+        user_id = User.query.filter(User.email.like('teacher-%')).one().user_id
+        heartbeat = _Heartbeat(db.engine, _row_filter(user_id, 'enter-2A'), 0.05)
+        time.sleep(0.2)
+        heartbeat.stop()
+        assert IdempotencyKey.query.one().heartbeat_at > started
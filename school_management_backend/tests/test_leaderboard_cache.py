@@ -0,0 +1,20 @@
+def test_report_card_rejects_unknown_terms(client, auth_headers, graded_exam):
+    _, student_id = graded_exam['grades'][('2A', 0)]
+
+    response = client.get(f'/api/v1/students/{student_id}/report-card?term=anything&year=2026',
+                          headers=auth_headers('admin'))
+
+    assert response.status_code == 400
+
+
+def test_leaderboard_keys_use_the_normalized_term_and_drop_their_locks(app, client, auth_headers, graded_exam):
+    _, student_id = graded_exam['grades'][('2A', 0)]
+    headers = auth_headers('admin')
+    cache = app.extensions['leaderboard_cache']
+
+    for term in ('1', 'term 1', 'Term 1'):
+        response = client.get(f'/api/v1/students/{student_id}/report-card?term={term}&year=2026', headers=headers)
+        assert response.status_code == 200
+
+    assert [key[1:] for key in cache._entries] == [('Term 1', 2026)]
+    assert cache._key_locks == {}
@@ -0,0 +1,53 @@
+from app import db
+from models import Grade
+
+
+def _moderate(client, headers, graded_exam, **options):
+    body = {'exam_id': graded_exam['exam_id'], 'target_mean': 60, 'target_sd': 10, **options}
+    return client.post('/api/v1/grades/moderation/apply', json=body, headers=headers)
+
+
+def _grade(app, grade_id):
+    with app.app_context():
+        grade = db.session.get(Grade, grade_id)
+        return grade.marks, grade.raw_marks
+
+
+def test_corrected_mark_is_the_raw_mark_for_the_next_moderation(app, client, auth_headers, graded_exam):
+    headers = auth_headers('admin')
+    grade_id, _ = graded_exam['grades'][('2A', 0)]
+
+    assert _moderate(client, headers, graded_exam).status_code == 200
+    assert _grade(app, grade_id) == (47.8, 40)
+
+    response = client.put(f'/api/v1/grades/{grade_id}', json={'marks': 45}, headers=headers)
+    assert response.status_code == 200
+    assert _grade(app, grade_id) == (45, None)
+
+    assert _moderate(client, headers, graded_exam).status_code == 200
+    marks, raw_marks = _grade(app, grade_id)
+    assert raw_marks == 45
+    assert marks == 49.3  # 60 + (45 - mean 51.67) / sd 6.24 * 10
+
+
+def test_re_entered_marks_clear_the_moderation(app, client, auth_headers, graded_exam):
+    admin = auth_headers('admin')
+    grade_id, student_id = graded_exam['grades'][('2A', 0)]
+    assert _moderate(client, admin, graded_exam).status_code == 200
+
+    response = client.post('/api/v1/grades/', headers=auth_headers('teacher'), json={
+        'exam_schedule_id': graded_exam['schedules']['2A'],
+        'grades': [{'student_id': student_id, 'marks': 42}]
+    })
+
+    assert response.status_code == 201
+    assert _grade(app, grade_id) == (42, None)
+
+
+def test_linear_moderation_rejects_target_sd(app, client, auth_headers, graded_exam):
+    grade_id, _ = graded_exam['grades'][('2A', 0)]
+
+    response = _moderate(client, auth_headers('admin'), graded_exam, method='linear')
+
+    assert response.status_code == 400
+    assert _grade(app, grade_id) == (40, None)
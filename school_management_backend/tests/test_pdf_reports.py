@@ -0,0 +1,30 @@
+import io
+import os
+import json
+import zipfile
+from utils import pdf_reports
+
+
+def test_form_report_zip_reuses_one_render_pool(client, auth_headers, graded_exam):
+    headers = auth_headers('teacher')
+
+    first = client.get('/api/v1/reports/export/form/2/pdf.zip', headers=headers)
+    pool = pdf_reports._pool
+    second = client.get('/api/v1/reports/export/form/2/pdf.zip', headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert pool is not None and pdf_reports._pool is pool
+    archive = zipfile.ZipFile(io.BytesIO(second.get_data()))
+    assert json.loads(archive.read('summary.json'))['students'] == 6
+
+
+def test_student_pdf_is_served_from_the_cache(app, client, auth_headers, graded_exam):
+    headers = auth_headers('teacher')
+    _, student_id = graded_exam['grades'][('2A', 0)]
+
+    first = client.get(f'/api/v1/reports/export/student/{student_id}/pdf', headers=headers)
+    second = client.get(f'/api/v1/reports/export/student/{student_id}/pdf', headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.get_data() == first.get_data()
+    assert os.listdir(os.path.join(app.extensions['artifact_cache'].root, str(student_id)))
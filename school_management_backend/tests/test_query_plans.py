@@ -0,0 +1,17 @@
+from sqlalchemy import select
+from app import db
+from models import Grade
+from utils.query_plans import check_query_plans, _sqlite_full_scans
+
+
+def test_hot_queries_use_index_searches(app):
+    with app.app_context():
+        assert [name for name, _, scans in check_query_plans() if scans] == []
+
+
+def test_covering_index_scan_counts_as_a_full_scan(app):
+    with app.app_context(), db.engine.connect() as connection:
+        lines, scans = _sqlite_full_scans(connection, select(Grade.exam_schedule_id, Grade.grade_id), 'grades')
+
+    assert any('COVERING INDEX' in line for line in lines)
+    assert scans == lines
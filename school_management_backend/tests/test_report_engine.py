@@ -0,0 +1,19 @@
+from sqlalchemy import update
+from app import db
+from models import Classroom
+
+
+def test_school_rankings_normalize_legacy_form_levels(app, client, auth_headers, graded_exam):
+    with app.app_context(), db.engine.begin() as connection:
+        # Written before form levels were normalized, bypassing the model validator
+        table = Classroom.__table__
+        connection.execute(update(table).where(table.c.class_name == '2A').values(form_level='Form 2'))
+        connection.execute(update(table).where(table.c.class_name == '2B').values(form_level='Form 9'))
+    headers = auth_headers('admin')
+
+    everything = client.get('/api/v1/reports/school/rankings', headers=headers)
+    form_two = client.get('/api/v1/reports/school/rankings?form=2', headers=headers)
+
+    assert everything.status_code == form_two.status_code == 200
+    assert everything.get_json()['Form 2']['student_count'] == 3
+    assert form_two.get_json()['Form 2']['class_means'] == {'2A': 50.0}
@@ -0,0 +1,100 @@
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app import db
+from models import ReportJob, User
+from utils import report_jobs
+from utils.report_jobs import JobKind
+
+
+def _admin(app):
+    with app.app_context():
+        user = User(name='Admin', email='admin@test', password='x', role='admin')
+        db.session.add(user)
+        db.session.commit()
+        return user.user_id
+
+
+def _queued_job(app, kind):
+    with app.app_context():
+        job = ReportJob(kind=kind, status='queued', created_by=_admin(app), heartbeat_at=datetime.utcnow())
+        db.session.add(job)
+        db.session.commit()
+        return job.id
+
+
+def test_sweep_fails_interrupted_jobs_and_removes_expired_results(app):
+    runner = app.extensions['report_jobs']
+    now = datetime.utcnow()
+    old_result = os.path.join(runner.root, 'expired')
+    with open(old_result, 'w') as f:
+        f.write('{}')
+
+    with app.app_context():
+        user = User(name='Admin', email='admin@test', password='x', role='admin')
+        db.session.add(user)
+        db.session.flush()
+        jobs = {
+            'interrupted': ReportJob(kind='overall_forms', status='running', created_by=user.user_id,
+                                     created_at=now - timedelta(hours=3), started_at=now - timedelta(hours=3)),
+            'never_started': ReportJob(kind='overall_forms', status='queued', created_by=user.user_id,
+                                       created_at=now - timedelta(hours=3)),
+            'in_progress': ReportJob(kind='overall_forms', status='running', created_by=user.user_id,
+                                     created_at=now, started_at=now),
+            'long_running': ReportJob(kind='overall_forms', status='running', created_by=user.user_id,
+                                      created_at=now - timedelta(hours=3), started_at=now - timedelta(hours=3),
+                                      heartbeat_at=now),
+            'expired': ReportJob(kind='overall_forms', status='done', created_by=user.user_id, result_path=old_result,
+                                 created_at=now - timedelta(days=30), finished_at=now - timedelta(days=30)),
+        }
+        db.session.add_all(jobs.values())
+        db.session.commit()
+        ids = {name: job.id for name, job in jobs.items()}
+
+        runner.sweep()
+
+        db.session.expire_all()
+        assert db.session.get(ReportJob, ids['interrupted']).status == 'failed'
+        assert db.session.get(ReportJob, ids['never_started']).status == 'failed'
+        assert db.session.get(ReportJob, ids['in_progress']).status == 'running'
+        assert db.session.get(ReportJob, ids['long_running']).status == 'running'
+        assert db.session.get(ReportJob, ids['expired']) is None
+    assert not os.path.exists(old_result)
+
+
+def test_job_failed_by_the_sweep_is_not_reported_done(app, monkeypatch):
+    runner = app.extensions['report_jobs']
+
+    def run(params):
+        # The sweep gives up on the job while it is still being generated
+        table = ReportJob.__table__
+        db.session.execute(update(table).where(table.c.id == job_id).values(status='failed', error='interrupted'))
+        db.session.commit()
+        return 'slow.json', 'application/json', ['{}']
+
+    monkeypatch.setitem(report_jobs.JOB_KINDS, 'slow', JobKind(run))
+    job_id = _queued_job(app, 'slow')
+
+    runner._run(job_id)
+
+    with app.app_context():
+        job = db.session.get(ReportJob, job_id)
+        assert job.status == 'failed'
+        assert job.result_path is None
+    assert not os.path.exists(os.path.join(runner.root, str(job_id)))
+
+
+def test_job_failed_while_queued_is_not_started(app, monkeypatch):
+    runner = app.extensions['report_jobs']
+    calls = []
+    monkeypatch.setitem(report_jobs.JOB_KINDS, 'never', JobKind(lambda params: calls.append(params)))
+    job_id = _queued_job(app, 'never')
+    with app.app_context():
+        db.session.get(ReportJob, job_id).status = 'failed'
+        db.session.commit()
+
+    runner._run(job_id)
+
+    assert calls == []
+    with app.app_context():
+        assert db.session.get(ReportJob, job_id).started_at is None
@@ -0,0 +1,36 @@
+from app import db
+from models import Classroom, Student, Subject
+
+
+def _student_in(app, form_level):
+    with app.app_context():
+        classroom = Classroom(class_name=f"{form_level}G", form_level=form_level)
+        subject = Subject(name='Chemistry')
+        db.session.add_all([classroom, subject])
+        db.session.flush()
+        student = Student(
+            admission_number='A1', first_name='Amina', last_name='Otieno', gender='F',
+            date_of_birth='2008-01-01', class_id=classroom.class_id
+        )
+        db.session.add(student)
+        db.session.commit()
+        return student.student_id, subject.subject_id
+
+
+def test_form_three_student_can_select_subjects(app, client):
+    student_id, subject_id = _student_in(app, 'Form 3')
+
+    response = client.post('/api/v1/student-selection/select-subjects',
+                           json={'student_id': student_id, 'subject_ids': [subject_id]})
+
+    assert response.status_code == 200
+
+
+def test_form_one_student_is_refused(app, client):
+    student_id, subject_id = _student_in(app, 'Form 1')
+
+    response = client.post('/api/v1/student-selection/select-subjects',
+                           json={'student_id': student_id, 'subject_ids': [subject_id]})
+
+    assert response.status_code == 403
+    assert 'Student is in Form 1' in response.get_json()['error']
@@ -0,0 +1,44 @@
+from app import db
+from models import User
+from utils.auth_utils import generate_token
+from utils.token_revocation import revoke_user_tokens
+
+
+def test_token_issued_right_after_user_revocation_is_accepted(app, client):
+    with app.app_context():
+        user = User(name='Admin', email='admin@test', password='x', role='admin')
+        db.session.add(user)
+        db.session.commit()
+
+        revoke_user_tokens(db.session, user.user_id)
+        db.session.commit()
+        new_token = generate_token(user)
+
+    response = client.get('/api/v1/classrooms/', headers={'Authorization': f"Bearer {new_token}"})
+    assert response.status_code == 200
+
+
+def test_revocation_committed_out_of_order_is_still_synced(app):
+    from datetime import datetime, timedelta
+    from sqlalchemy import insert
+    from models import RevokedToken
+    from utils.token_revocation import RevocationList
+
+    now = datetime.utcnow()
+    table = RevokedToken.__table__
+    with app.app_context():
+        revocations = RevocationList(db.engine, sync_seconds=3600)
+        with db.engine.begin() as connection:
+            connection.execute(insert(table).values(id=2, jti='later-id', user_id=1, created_at=now,
+                                                    expires_at=now + timedelta(minutes=15)))
+        revocations.sync()
+
+        # A lower id from another process's transaction becomes visible only now
+        with db.engine.begin() as connection:
+            connection.execute(insert(table).values(id=1, jti='earlier-id', user_id=2,
+                                                    created_at=now - timedelta(seconds=5),
+                                                    expires_at=now + timedelta(minutes=15)))
+        revocations.sync()
+
+    assert revocations.is_revoked({'jti': 'later-id', 'user_id': 1})
+    assert revocations.is_revoked({'jti': 'earlier-id', 'user_id': 2})
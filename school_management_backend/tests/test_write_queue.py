@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+from utils import write_queue
+from utils.write_queue import WriteQueue, WriteQueueTimeout, run_write
+
+
+@pytest.fixture
+def writer(app, monkeypatch):
+    queue = WriteQueue(app, max_batch=8, max_delay=0)
+    monkeypatch.setattr(write_queue, '_queue', queue)
+    monkeypatch.setitem(app.config, 'WRITE_QUEUE_TIMEOUT', 0.2)
+    yield queue
+    queue.close()
+
+
+def _blocker(started, release):
+    def fn(session):
+        started.set()
+        release.wait(5)
+        return 'blocker'
+    return fn
+
+
+def test_timed_out_write_still_queued_is_withdrawn(app, writer):
+    started, release = threading.Event(), threading.Event()
+    blocker = writer.submit(_blocker(started, release))
+    assert started.wait(5)
+    applied = []
+
+    with app.app_context(), pytest.raises(WriteQueueTimeout) as excinfo:
+        run_write(lambda session: applied.append('late'))
+    release.set()
+
+    assert excinfo.value.may_be_applied is False
+    assert blocker.result(5) == 'blocker'
+    writer.close()
+    assert applied == []
+
+
+def test_timed_out_write_already_running_may_still_commit(app, writer):
+    started, release = threading.Event(), threading.Event()
+
+    with app.app_context(), pytest.raises(WriteQueueTimeout) as excinfo:
+        run_write(_blocker(started, release))
+    release.set()
+
+    assert excinfo.value.may_be_applied is True
+    assert 'may still be saved' in str(excinfo.value)
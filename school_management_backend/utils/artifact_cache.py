@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from flask import current_app
+from utils.grade_events import grades_changed
+
+# Bump when the PDF/CSV layout changes so old artifacts stop matching
+TEMPLATE_VERSION = 1
+
+_caches = []
+
+# Only files this cache wrote are ever removed from root: reports from the old flat
+# layout ("<student_id>-<sha256>.<ext>", plus their ".<thread>.tmp" partials) and
+# partial writes left by a process that died mid-put
+_LEGACY_NAME = re.compile(r'^\d+-[0-9a-f]{64}\.(pdf|csv)(\.\d+\.tmp)?$')
+_TMP_PREFIX = '.artifact-'
+_STALE_TMP_SECONDS = 60 * 60
+
+
+# 📦 On-disk cache of rendered student reports, named by a hash of their content.
+# Files are "<student_id>/<sha256>.<ext>", so invalidating a student removes one
+# directory; least recently used files are evicted once the cache grows past max_bytes.
+class ArtifactCache:
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._remove_leftovers()
+
+    def key(self, student_id, kind, payload, ext):
+        digest = hashlib.sha256(
+            json.dumps([TEMPLATE_VERSION, kind, payload], default=str, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        return f"{student_id}/{digest}.{ext}"
+
+    # An open binary file (the caller closes it), or None. Opened here so eviction or
+    # invalidation between the lookup and the send can't pull the file out from under it.
+    def get(self, name):
+        path = os.path.join(self.root, name)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            pass
+        return f
+
+    def put(self, name, data):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique across processes and threads, and outside the student directories
+        with tempfile.NamedTemporaryFile(dir=self.root, prefix=_TMP_PREFIX, suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+            try:
+                f.write(data)
+            except BaseException:
+                f.close()
+                _remove(tmp_path)
+                raise
+        try:
+            os.replace(tmp_path, path)
+        except FileNotFoundError:
+            _remove(tmp_path)
+            return None  # the student was invalidated meanwhile; this render is already stale
+        self._evict()
+        return path
+
+    def _remove_leftovers(self):
+        stale = time.time() - _STALE_TMP_SECONDS
+        for entry in os.scandir(self.root):
+            if not entry.is_file():
+                continue
+            if _LEGACY_NAME.match(entry.name):
+                _remove(entry.path)
+            elif entry.name.startswith(_TMP_PREFIX) and entry.name.endswith('.tmp'):
+                try:
+                    if entry.stat().st_mtime < stale:  # younger ones may still be being written
+                        _remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def invalidate_students(self, student_ids):
+        for student_id in student_ids:
+            shutil.rmtree(os.path.join(self.root, str(student_id)), ignore_errors=True)
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for shard in os.scandir(self.root):
+                try:
+                    files = list(os.scandir(shard.path)) if shard.is_dir() else []
+                except FileNotFoundError:
+                    continue
+                for entry in files:
+                    if entry.name.endswith('.tmp'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                _remove(path)
+                total -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def init_artifact_cache(app):
+    cache = ArtifactCache(
+        app.config.get('REPORT_CACHE_DIR') or os.path.join(app.instance_path, 'report_cache'),
+        app.config['REPORT_CACHE_MAX_BYTES']
+    )
+    app.extensions['artifact_cache'] = cache
+    _caches.append(cache)
+    return cache
+
+
+def get_artifact_cache():
+    return current_app.extensions['artifact_cache']
+
+
+# ♻️ Drop a student's cached reports as soon as any of their grades change
+@grades_changed.connect
+def _invalidate_changed_students(sender, keys, **kwargs):
+    student_ids = {key[0] for key in keys}
+    for cache in _caches:
+        cache.invalidate_students(student_ids)
@@ -1,8 +1,16 @@
+import hashlib
 import os
+import secrets
+import uuid
 import jwt
+from datetime import datetime, timedelta, timezone
 from functools import wraps
-from flask import request, jsonify
-from models import User, Teacher, Parent
+from flask import request, jsonify, g, current_app
+from sqlalchemy import update
+from app import db
+from models import User, RefreshToken
+from utils.principal_cache import get_principal_cache
+from utils.token_revocation import get_revocation_list
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,29 +33,105 @@ def token_required(f):
             return jsonify({'error': 'Token format is invalid'}), 401
 
         try:
-            data = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-            user = User.query.get(data['user_id'])
-
-            if not user:
-                return jsonify({'error': 'User not found'}), 401
-
-            if user.role == 'teacher':
-                teacher = Teacher.query.filter_by(user_id=user.user_id).first()
-                if not teacher:
-                    return jsonify({'error': 'Teacher profile not found'}), 401
-                user.teacher_id = teacher.teacher_id  # 👈 FIX: attach teacher_id directly
-            elif user.role == 'parent':
-                user.parent = Parent.query.filter_by(user_id=user.user_id).first()
-
+            data = jwt.decode(token, SECRET_KEY, algorithms=["HS256"], options={'require': ['exp']})
         except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token expired'}), 401
         except Exception:
             return jsonify({'error': 'Invalid token'}), 401
 
+        # 🚫 Logged out, or the user was deleted / changed role (in-memory, no query)
+        if get_revocation_list().is_revoked(data):
+            return jsonify({'error': 'Token has been revoked'}), 401
+
+        # ⚡ Usually served from the principal cache, so no query per request
+        user = get_principal_cache().get(data.get('user_id'))
+        if not user:
+            return jsonify({'error': 'User not found'}), 401
+
+        # 🔁 Role or profile changed since the token was issued (older tokens carry user_id only)
+        if 'role' in data and any(data.get(k) != v for k, v in user.claims().items()):
+            return jsonify({'error': 'Token is out of date, please log in again'}), 401
+
+        if user.role == 'teacher' and user.teacher_id is None:
+            return jsonify({'error': 'Teacher profile not found'}), 401
+
+        g.current_user_id = user.user_id  # recorded by the grade audit log
+        g.token_claims = data
         return f(user, *args, **kwargs)
     return decorated
 
 
+# 🎫 Short-lived access token carrying the caller's role and profile ids
+# (ACCESS_TOKEN_EXPIRES_SECONDS); jti lets a single token be revoked on logout
 def generate_token(user):
-    token = jwt.encode({'user_id': user.user_id}, SECRET_KEY, algorithm="HS256")
+    now = datetime.now(timezone.utc)
+    claims = {
+        'user_id': user.user_id,
+        'role': user.role,
+        'teacher_id': user.teacher.teacher_id if user.teacher else None,
+        'parent_id': user.parent.parent_id if user.parent else None,
+        'jti': str(uuid.uuid4()),
+        'iat': now,
+        'exp': now + timedelta(seconds=current_app.config['ACCESS_TOKEN_EXPIRES_SECONDS'])
+    }
+    token = jwt.encode(claims, SECRET_KEY, algorithm="HS256")
     return token
+
+
+def _hash_refresh_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# 🔑 New opaque refresh token for a user; only its hash is stored. The caller commits.
+def issue_refresh_token(user_id, family_id=None):
+    token = secrets.token_urlsafe(32)
+    row = RefreshToken(
+        user_id=user_id,
+        token_hash=_hash_refresh_token(token),
+        family_id=family_id or str(uuid.uuid4()),
+        expires_at=datetime.utcnow() + timedelta(seconds=current_app.config['REFRESH_TOKEN_EXPIRES_SECONDS'])
+    )
+    db.session.add(row)
+    db.session.flush()
+    return token, row
+
+
+def find_refresh_token(token):
+    return RefreshToken.query.filter_by(token_hash=_hash_refresh_token(token)).first()
+
+
+# 🔄 Swap a refresh token for a new one. Returns (user, new token), or None when the token is
+# unknown, expired or already used; presenting a used token revokes its whole family, since
+# only a copy (a stolen token) can still be holding it. The caller commits.
+def rotate_refresh_token(token):
+    row = find_refresh_token(token)
+    now = datetime.utcnow()
+    if not row or row.expires_at <= now:
+        return None
+
+    # Claim the row atomically so two concurrent refreshes can't both succeed
+    claimed = db.session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        revoke_refresh_family(row.family_id)
+        return None
+
+    new_token, new_row = issue_refresh_token(row.user_id, row.family_id)
+    db.session.execute(
+        update(RefreshToken).where(RefreshToken.id == row.id).values(replaced_by=new_row.id)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.get(User, row.user_id), new_token
+
+
+def revoke_refresh_family(family_id):
+    db.session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,135 @@
+import click
+from app import db
+
+
+def init_commands(app):
+
+    # ♻️ Recompute student_term_aggregates from the grades table
+    @app.cli.command('rebuild-aggregates')
+    def rebuild_aggregates():
+        from models import StudentTermAggregate
+        from utils.grade_events import rebuild_term_aggregates
+
+        with db.engine.begin() as connection:
+            rebuild_term_aggregates(connection)
+        click.echo(f"Rebuilt {StudentTermAggregate.query.count()} student term aggregates")
+
+    # 🏫 Normalize classrooms.form_level, deriving missing values from class names
+    @app.cli.command('normalize-form-levels')
+    def normalize_form_levels():
+        from models import Classroom
+        from utils.helpers import normalize_form_level
+
+        updated = 0
+        for classroom in Classroom.query.all():
+            level = normalize_form_level(classroom.form_level) or normalize_form_level(classroom.class_name)
+            if level != classroom.form_level:
+                classroom.form_level = level
+                updated += 1
+        db.session.commit()
+        click.echo(f"Normalized form level for {updated} classrooms")
+
+    # 🔎 EXPLAIN the hot queries and fail if any of them scans a whole table
+    @app.cli.command('check-query-plans')
+    @click.option('--verbose', is_flag=True, help='Print every query plan')
+    def check_query_plans_command(verbose):
+        from utils.query_plans import check_query_plans
+
+        failures = 0
+        for name, lines, scans in check_query_plans():
+            status = 'FULL SCAN' if scans else 'ok'
+            click.echo(f"{status:>9}  {name}")
+            for line in (lines if verbose else scans):
+                click.echo(f"           {line}")
+            failures += bool(scans)
+
+        if failures:
+            raise click.ClickException(f"{failures} hot queries fall back to a full table scan")
+
+    # 🔐 Hash any passwords still stored in plaintext (logins also upgrade them one by one)
+    @app.cli.command('hash-legacy-passwords')
+    @click.option('--batch-size', default=200, show_default=True)
+    def hash_legacy_passwords(batch_size):
+        from concurrent.futures import ThreadPoolExecutor
+        from sqlalchemy import select, update, bindparam
+        from models import User
+        from utils.passwords import is_password_hash, hash_password
+
+        users = User.__table__
+        stmt = update(users).where(users.c.user_id == bindparam('b_user_id')).values(password=bindparam('b_password'))
+        method = app.config['PASSWORD_HASH_METHOD']
+        hashed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=app.config['PASSWORD_VERIFY_WORKERS']) as pool:
+            while True:
+                rows = db.session.execute(
+                    select(users.c.user_id, users.c.password)
+                    .where(users.c.user_id > last_id)
+                    .order_by(users.c.user_id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1].user_id
+
+                legacy = [row for row in rows if not is_password_hash(row.password)]
+                hashes = pool.map(lambda row: hash_password(row.password, method), legacy)
+                params = [{'b_user_id': row.user_id, 'b_password': h} for row, h in zip(legacy, hashes)]
+                if params:
+                    db.session.execute(stmt, params)
+                db.session.commit()
+                hashed += len(params)
+        click.echo(f"Hashed {hashed} plaintext passwords")
+
+    # ⏱️ How many logins per second the verification pool sustains at a given hash cost
+    @app.cli.command('benchmark-login')
+    @click.option('--method', default=None, help='Werkzeug hash method, e.g. scrypt:16384:8:1 or pbkdf2:sha256:600000')
+    @click.option('--logins', default=200, show_default=True)
+    @click.option('--concurrency', default=32, show_default=True, help='Simultaneous clients')
+    @click.option('--workers', type=int, default=None, help='Verification threads (default PASSWORD_VERIFY_WORKERS)')
+    @click.option('--queue', type=int, default=None, help='Checks in flight (default PASSWORD_VERIFY_QUEUE)')
+    def benchmark_login(method, logins, concurrency, workers, queue):
+        from utils.passwords import benchmark_logins
+
+        result = benchmark_logins(
+            method or app.config['PASSWORD_HASH_METHOD'],
+            logins,
+            concurrency,
+            workers or app.config['PASSWORD_VERIFY_WORKERS'],
+            queue or app.config['PASSWORD_VERIFY_QUEUE']
+        )
+        click.echo(
+            f"{result['method']}: {result['per_second']:.1f} logins/s "
+            f"({result['verified']} verified, {result['rejected']} rejected as busy, {result['seconds']:.2f}s); "
+            f"p50 {result['p50_ms']:.0f} ms, p95 {result['p95_ms']:.0f} ms"
+        )
+
+    # 🏋️ Hammer the database with concurrent writers to check the DB_PROFILE settings
+    @app.cli.command('stress-db')
+    @click.option('--writers', default=8, show_default=True)
+    @click.option('--readers', default=4, show_default=True)
+    @click.option('--seconds', default=10.0, show_default=True)
+    @click.option('--group-commit', is_flag=True, help='Send writes through a write queue (WRITE_QUEUE_* settings)')
+    def stress_db(writers, readers, seconds, group_commit):
+        from utils.db_engine import stress_test
+        from utils.write_queue import WriteQueue
+
+        mode = 'group commit' if group_commit else 'one commit per write'
+        click.echo(f"Profile {app.config['DB_PROFILE']}, {mode}: {writers} writers, {readers} readers for {seconds:g}s")
+        write_queue = WriteQueue(
+            app,
+            max_batch=app.config['WRITE_QUEUE_MAX_BATCH'],
+            max_delay=app.config['WRITE_QUEUE_MAX_DELAY_MS'] / 1000
+        ) if group_commit else None
+        try:
+            result = stress_test(db.engine, writers, readers, seconds, write_queue)
+        finally:
+            if write_queue:
+                write_queue.close()
+        for kind in ('writes', 'reads'):
+            r = result[kind]
+            click.echo(f"  {kind:>6}: {r['count']} ok, {r['per_second']:.1f}/s, p95 {r['p95_ms']:.0f} ms")
+        for message, count in result['errors'].items():
+            click.echo(f"  error x{count}: {message}")
+        if result['errors']:
+            raise click.ClickException(f"{sum(result['errors'].values())} operations failed")
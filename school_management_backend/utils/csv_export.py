@@ -0,0 +1,90 @@
+import csv
+from io import StringIO
+from app import db
+from models import Grade, Student, Subject, Classroom, ExamSchedule, Exam
+from utils.grading_schemes import scheme_for_form
+
+CHUNK_SIZE = 64 * 1024  # flush to the response every ~64KB
+YIELD_PER = 1000        # rows fetched from the cursor at a time
+
+
+# 📚 One joined, ordered query over the gradebook, streamed from the cursor
+def gradebook_rows(*criteria):
+    return (
+        db.session.query(
+            Student.student_id,
+            Student.admission_number,
+            Student.first_name,
+            Student.last_name,
+            Classroom.class_name,
+            Classroom.form_level,
+            Grade.subject_id,
+            Subject.name.label('subject_name'),
+            Grade.marks,
+            Exam.name.label('exam_name'),
+            Exam.term,
+            Exam.year
+        )
+        .select_from(Grade)
+        .join(Student, Student.student_id == Grade.student_id)
+        .outerjoin(Classroom, Classroom.class_id == Student.class_id)
+        .join(Subject, Subject.subject_id == Grade.subject_id)
+        .join(ExamSchedule, ExamSchedule.id == Grade.exam_schedule_id)
+        .join(Exam, Exam.exam_id == ExamSchedule.exam_id)
+        .filter(*criteria)
+        .order_by(Classroom.class_name, Student.student_id, Grade.grade_id)
+        .yield_per(YIELD_PER)
+    )
+
+
+# ⬇ Write CSV rows into a small buffer and hand it out in chunks
+def stream_csv(header, rows, chunk_size=CHUNK_SIZE):
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')  # BOM for Excel
+    writer.writerow(header)
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode('utf-8')
+
+
+GRADEBOOK_HEADER = ['Student Name', 'Subject', 'Marks', 'Grade', 'Exam', 'Term', 'Year']
+SCHOOL_HEADER = ['Admission Number', 'Student Name', 'Class'] + GRADEBOOK_HEADER[1:]
+
+
+def gradebook_record(r):
+    return [
+        f"{r.first_name} {r.last_name}",
+        r.subject_name,
+        r.marks,
+        scheme_for_form(r.form_level).grade_one(r.marks, r.subject_id),
+        r.exam_name,
+        r.term,
+        r.year
+    ]
+
+
+def gradebook_csv(*criteria, header=GRADEBOOK_HEADER):
+    return stream_csv(header, (gradebook_record(r) for r in gradebook_rows(*criteria)))
+
+
+def school_gradebook_csv(*criteria):
+    return stream_csv(SCHOOL_HEADER, (
+        [
+            r.admission_number,
+            f"{r.first_name} {r.last_name}",
+            r.class_name or '',
+            r.subject_name,
+            r.marks,
+            scheme_for_form(r.form_level).grade_one(r.marks, r.subject_id),
+            r.exam_name,
+            r.term,
+            r.year
+        ] for r in gradebook_rows(*criteria)
+    ))
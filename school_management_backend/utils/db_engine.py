@@ -0,0 +1,178 @@
+import os
+import random
+import threading
+import time
+from collections import Counter
+from sqlalchemy import (
+    event, MetaData, Table, Column, Integer, Float, select, insert, func, table, column
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+# DB_PROFILE -> engine settings. "sqlite" entries become PRAGMAs run on every new
+# connection (None leaves SQLite's default); "pool" entries apply to server databases.
+ENGINE_PROFILES = {
+    'development': {
+        'sqlite': {
+            'journal_mode': None,
+            'synchronous': None,
+            'busy_timeout': 5000,
+            'mmap_size': None,
+            'cache_size': None,
+        },
+        'pool': {'pool_size': 5, 'max_overflow': 5, 'pool_pre_ping': True, 'pool_recycle': 1800, 'pool_timeout': 30},
+    },
+    'production': {
+        'sqlite': {
+            'journal_mode': 'WAL',            # readers don't block the writer and vice versa
+            'synchronous': 'NORMAL',          # safe with WAL; fsync at checkpoints, not every commit
+            'busy_timeout': 15000,            # ms a writer waits for the lock instead of failing
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64000,             # negative = KiB, so ~64 MB of page cache per connection
+        },
+        'pool': {'pool_size': 10, 'max_overflow': 20, 'pool_pre_ping': True, 'pool_recycle': 1800, 'pool_timeout': 30},
+    },
+    'test': {
+        'sqlite': {
+            'journal_mode': 'WAL',
+            'synchronous': 'OFF',
+            'busy_timeout': 5000,
+            'mmap_size': None,
+            'cache_size': None,
+        },
+        'pool': {'pool_size': 2, 'max_overflow': 2, 'pool_pre_ping': False, 'pool_recycle': -1, 'pool_timeout': 10},
+    },
+}
+
+# Environment overrides for single settings: env var -> (section, key, type)
+_OVERRIDES = {
+    'SQLITE_JOURNAL_MODE': ('sqlite', 'journal_mode', str),
+    'SQLITE_SYNCHRONOUS': ('sqlite', 'synchronous', str),
+    'SQLITE_BUSY_TIMEOUT_MS': ('sqlite', 'busy_timeout', int),
+    'SQLITE_MMAP_SIZE': ('sqlite', 'mmap_size', int),
+    'SQLITE_CACHE_SIZE': ('sqlite', 'cache_size', int),
+    'DB_POOL_SIZE': ('pool', 'pool_size', int),
+    'DB_MAX_OVERFLOW': ('pool', 'max_overflow', int),
+    'DB_POOL_RECYCLE': ('pool', 'pool_recycle', int),
+    'DB_POOL_TIMEOUT': ('pool', 'pool_timeout', int),
+}
+
+
+def engine_profile(name):
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{name}' (expected one of {', '.join(ENGINE_PROFILES)})")
+    profile = {section: dict(settings) for section, settings in ENGINE_PROFILES[name].items()}
+    for env, (section, key, cast) in _OVERRIDES.items():
+        if os.getenv(env):
+            profile[section][key] = cast(os.getenv(env))
+    return profile
+
+
+def _is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+# ⚙️ Fill SQLALCHEMY_ENGINE_OPTIONS from the DB_PROFILE (call before db.init_app).
+# Options set explicitly in the config win over the profile.
+def configure_engine(app):
+    profile = engine_profile(app.config['DB_PROFILE'])
+    app.extensions['db_profile'] = profile
+    if _is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        # The driver's own lock wait, in seconds; the busy_timeout PRAGMA below takes over once connected
+        options = {'connect_args': {'timeout': (profile['sqlite']['busy_timeout'] or 5000) / 1000}}
+    else:
+        options = dict(profile['pool'])
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**options, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+
+
+def _sqlite_pragmas(settings):
+    pragmas = []
+    for key in ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size'):
+        if settings.get(key) is not None:
+            pragmas.append(f"PRAGMA {key}={settings[key]}")
+    return pragmas
+
+
+# 🔌 Run the profile's PRAGMAs on every new SQLite connection (call after db.init_app)
+def init_db_engine(app, db):
+    settings = app.extensions['db_profile']['sqlite']
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = _sqlite_pragmas(settings)
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+# 🏋️ Concurrent-writer stress test against the configured engine. Writers read grades and
+# then insert into a scratch table (created and dropped here), like a request validating
+# and saving; readers run grade counts alongside. With write_queue, the inserts go through
+# its group commit instead of one transaction each. Returns throughput, latency and lock errors.
+def stress_test(engine, writers, readers, seconds, write_queue=None):
+    metadata = MetaData()
+    scratch = Table(
+        'stress_test_writes', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('writer', Integer, nullable=False),
+        Column('marks', Float),
+        Column('written_at', Float, nullable=False)
+    )
+    grades = table('grades', column('exam_schedule_id'), column('marks'))
+    metadata.create_all(engine)
+
+    stats = {'writes': [], 'reads': [], 'errors': Counter()}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def run(kind, writer_id):
+        rng = random.Random(writer_id)
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                if kind == 'writes':
+                    with engine.connect() as connection:
+                        marks = connection.execute(
+                            select(func.avg(grades.c.marks)).where(grades.c.exam_schedule_id == rng.randint(1, 500))
+                        ).scalar()
+                    row = insert(scratch).values(writer=writer_id, marks=marks, written_at=time.time())
+                    if write_queue:
+                        write_queue.submit(lambda session: session.execute(row)).result()
+                    else:
+                        with engine.begin() as connection:
+                            connection.execute(row)
+                else:
+                    with engine.connect() as connection:
+                        connection.execute(select(func.count()).select_from(grades)).scalar()
+            except OperationalError as exc:
+                with lock:
+                    stats['errors'][str(exc.orig)] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                stats[kind].append(elapsed)
+
+    threads = [threading.Thread(target=run, args=('writes', i)) for i in range(writers)]
+    threads += [threading.Thread(target=run, args=('reads', writers + i)) for i in range(readers)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        metadata.drop_all(engine)
+
+    def summary(latencies):
+        latencies.sort()
+        p95 = latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)] if latencies else 0
+        return {'count': len(latencies), 'per_second': len(latencies) / seconds, 'p95_ms': p95 * 1000}
+
+    return {'writes': summary(stats['writes']), 'reads': summary(stats['reads']), 'errors': dict(stats['errors'])}
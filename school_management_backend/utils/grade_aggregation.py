@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from utils.grade_utils import CAT_EXAMS, MAIN_EXAM
+from utils.grading_schemes import DEFAULT_SCHEME
+
+
+# 🏫 Mean of student averages per class -> {class_name: mean}
+def class_means(class_names, averages):
+    frame = pd.DataFrame({'class_name': class_names, 'average': averages}, dtype=object)
+    if frame.empty:
+        return {}
+    means = frame.astype({'average': float}).groupby('class_name', sort=False)['average'].mean().round(2)
+    return means.to_dict()
+
+
+# 📊 Form 1-2 weighted score per subject from (subject, exam, marks) rows.
+# A repeated exam keeps its last mark; missing CATs/Main Exam count as 0.
+def weighted_form1_2_scores(subjects, exams, marks, subject_ids=None, scheme=DEFAULT_SCHEME):
+    frame = pd.DataFrame({'subject': subjects, 'exam': exams, 'marks': marks})
+    if frame.empty:
+        return []
+
+    scores = (
+        frame.drop_duplicates(['subject', 'exam'], keep='last')
+        .pivot(index='subject', columns='exam', values='marks')
+        .reindex(index=frame['subject'].unique(), columns=[*CAT_EXAMS, MAIN_EXAM])
+        .fillna(0)
+    )
+    totals = scheme.weighted_score(
+        scores[CAT_EXAMS[0]].to_numpy(), scores[CAT_EXAMS[1]].to_numpy(), scores[MAIN_EXAM].to_numpy()
+    ).round(2)
+    if subject_ids is not None:
+        subject_ids = dict(zip(subjects, subject_ids))
+        subject_ids = [subject_ids[subject] for subject in scores.index]
+
+    return [{
+        'subject': subject,
+        'score': float(total),
+        'grade': grade
+    } for subject, total, grade in zip(scores.index, totals, scheme.grade(totals, subject_ids))]
+
+
+# 📈 Grade counts -> {grade: count}, only grades that occur (grade marks with scheme.grade first)
+def grade_distribution(grades):
+    labels, counts = np.unique(np.array(grades, dtype=object), return_counts=True)
+    return {label: int(count) for label, count in zip(labels, counts)}
@@ -0,0 +1,179 @@
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import g, has_app_context
+from sqlalchemy import event, inspect, insert
+from sqlalchemy.orm import Session
+from app import db
+from models import Grade, GradeAudit
+
+_PENDING_KEY = 'grade_audits'
+_STOP = object()
+_RETRY_START = 0.05
+_RETRY_MAX = 5.0
+
+_writer = None
+
+
+# 📝 Buffers audit records and inserts them in batches from a background thread.
+# A batch is written when it reaches batch_size or flush_seconds after its first
+# record. The queue is bounded: when it is full, producers wait up to put_timeout
+# and then write their records themselves. A failed insert (e.g. "database is locked")
+# is retried with backoff until it succeeds, so nothing is dropped.
+class GradeAuditWriter:
+    def __init__(self, engine, batch_size, flush_seconds, max_queue, put_timeout, logger=None):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.put_timeout = put_timeout
+        self.logger = logger
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name='grade-audit-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, records):
+        for i, record in enumerate(records):
+            try:
+                self._queue.put(record, timeout=self.put_timeout)
+            except queue.Full:
+                self._write(records[i:])
+                return
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                record = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                record = None
+
+            if record is _STOP:
+                self._write(batch)
+                return
+            if record is not None:
+                batch.append(record)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_seconds
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+                deadline = None
+
+    def _write(self, records):
+        if not records:
+            return
+        delay = _RETRY_START
+        attempts = 0
+        while True:
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(insert(GradeAudit.__table__), records)
+                return
+            except Exception:
+                attempts += 1
+                if self.logger:
+                    self.logger.exception(
+                        "Failed to write %d grade audit records (attempt %d), retrying in %.2fs",
+                        len(records), attempts, delay
+                    )
+            time.sleep(delay)
+            delay = min(delay * 2, _RETRY_MAX)
+
+    # 🛑 Write whatever is still queued and stop the thread
+    def close(self, timeout=10):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+
+def init_grade_audit(app):
+    global _writer
+    with app.app_context():
+        engine = db.engine
+    _writer = GradeAuditWriter(
+        engine,
+        batch_size=app.config['GRADE_AUDIT_BATCH_SIZE'],
+        flush_seconds=app.config['GRADE_AUDIT_FLUSH_SECONDS'],
+        max_queue=app.config['GRADE_AUDIT_QUEUE_SIZE'],
+        put_timeout=app.config['GRADE_AUDIT_PUT_TIMEOUT'],
+        logger=app.logger
+    )
+    atexit.register(_writer.close)
+    return _writer
+
+
+def _changed_by():
+    return g.get('current_user_id') if has_app_context() else None  # also set by the write queue
+
+
+def audit_record(action, student_id, exam_schedule_id, subject_id=None, old_marks=None, new_marks=None,
+                 grade_id=None):
+    return {
+        'grade_id': grade_id,
+        'student_id': student_id,
+        'exam_schedule_id': exam_schedule_id,
+        'subject_id': subject_id,
+        'action': action,
+        'old_marks': old_marks,
+        'new_marks': new_marks,
+        'changed_by': _changed_by(),
+        'changed_at': datetime.utcnow()
+    }
+
+
+# 📋 Queue audit records to be written once the session commits.
+# Bulk writers that bypass the ORM unit of work call this directly.
+def track_grade_audits(session, records):
+    session.info.setdefault(_PENDING_KEY, []).extend(records)
+
+
+def _marks_change(grade):
+    history = inspect(grade).attrs.marks.history
+    if not history.has_changes():
+        return None
+    old = history.deleted[0] if history.deleted else None
+    return old, grade.marks
+
+
+@event.listens_for(Session, 'after_flush')
+def _audit_after_flush(session, flush_context):
+    records = []
+    for obj in session.new:
+        if isinstance(obj, Grade):
+            records.append(audit_record(
+                'insert', obj.student_id, obj.exam_schedule_id, obj.subject_id,
+                new_marks=obj.marks, grade_id=obj.grade_id
+            ))
+    for obj in session.dirty:
+        if isinstance(obj, Grade):
+            change = _marks_change(obj)
+            if change:
+                records.append(audit_record(
+                    'update', obj.student_id, obj.exam_schedule_id, obj.subject_id,
+                    old_marks=change[0], new_marks=change[1], grade_id=obj.grade_id
+                ))
+    for obj in session.deleted:
+        if isinstance(obj, Grade):
+            records.append(audit_record(
+                'delete', obj.student_id, obj.exam_schedule_id, obj.subject_id,
+                old_marks=obj.marks, grade_id=obj.grade_id
+            ))
+    if records:
+        track_grade_audits(session, records)
+
+
+@event.listens_for(Session, 'after_commit')
+def _submit_after_commit(session):
+    records = session.info.pop(_PENDING_KEY, None)
+    if records and _writer is not None:
+        _writer.submit(records)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
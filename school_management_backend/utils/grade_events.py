@@ -0,0 +1,146 @@
+from blinker import Namespace
+from sqlalchemy import event, inspect, select, delete, insert, func, bindparam
+from sqlalchemy.orm import Session
+from app import db
+from models import Grade, ExamSchedule, Exam, StudentTermAggregate
+
+# 📣 Sent after a commit that touched grades, with the affected
+# (student_id, term, year, subject_id) keys
+_signals = Namespace()
+grades_changed = _signals.signal('grades-changed')
+
+_PENDING_KEY = 'grade_term_keys'
+_GRADE_FIELDS = ('student_id', 'exam_schedule_id', 'subject_id')
+_CHUNK = 500
+
+
+def aggregate_query():
+    return (
+        select(
+            Grade.student_id,
+            Exam.term,
+            Exam.year,
+            Grade.subject_id,
+            func.sum(Grade.marks).label('total_marks'),
+            func.count(Grade.grade_id).label('grade_count'),
+        )
+        .join(ExamSchedule, Grade.exam_schedule_id == ExamSchedule.id)
+        .join(Exam, Exam.exam_id == ExamSchedule.exam_id)
+        .group_by(Grade.student_id, Exam.term, Exam.year, Grade.subject_id)
+    )
+
+
+def _chunks(items, size=_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# 🔑 (student_id, exam_schedule_id, subject_id) -> (student_id, term, year, subject_id)
+def resolve_term_keys(connection, grade_keys):
+    schedule_ids = {k[1] for k in grade_keys if k[1] is not None}
+    terms = {}
+    for chunk in _chunks(schedule_ids):
+        rows = connection.execute(
+            select(ExamSchedule.id, Exam.term, Exam.year)
+            .join(Exam, Exam.exam_id == ExamSchedule.exam_id)
+            .where(ExamSchedule.id.in_(chunk))
+        )
+        terms.update({r.id: (r.term, r.year) for r in rows})
+
+    return {
+        (student_id, *terms[schedule_id], subject_id)
+        for student_id, schedule_id, subject_id in grade_keys
+        if student_id is not None and subject_id is not None and schedule_id in terms
+    }
+
+
+# ♻️ Recompute the aggregate rows for the given term keys only
+def refresh_term_aggregates(connection, term_keys):
+    if not term_keys:
+        return
+
+    rows = []
+    for chunk in _chunks({k[0] for k in term_keys}):
+        query = aggregate_query().where(
+            Grade.student_id.in_(chunk),
+            Grade.subject_id.in_({k[3] for k in term_keys}),
+            Exam.term.in_({k[1] for k in term_keys}),
+            Exam.year.in_({k[2] for k in term_keys})
+        )
+        rows.extend(r for r in connection.execute(query) if tuple(r[:4]) in term_keys)
+
+    table = StudentTermAggregate.__table__
+    connection.execute(
+        delete(table).where(
+            table.c.student_id == bindparam('b_student_id'),
+            table.c.term == bindparam('b_term'),
+            table.c.year == bindparam('b_year'),
+            table.c.subject_id == bindparam('b_subject_id')
+        ),
+        [{'b_student_id': s, 'b_term': t, 'b_year': y, 'b_subject_id': sub} for s, t, y, sub in term_keys]
+    )
+    if rows:
+        connection.execute(insert(table), [dict(r._mapping) for r in rows])
+
+
+# 🛠 Full rebuild (flask rebuild-aggregates)
+def rebuild_term_aggregates(connection):
+    table = StudentTermAggregate.__table__
+    connection.execute(delete(table))
+    connection.execute(
+        insert(table).from_select(
+            ['student_id', 'term', 'year', 'subject_id', 'total_marks', 'grade_count'],
+            aggregate_query()
+        )
+    )
+
+
+# 📝 Queue term keys for the grades_changed signal sent after commit.
+# Bulk writers that bypass the ORM unit of work call this directly.
+def track_grade_changes(session, term_keys):
+    session.info.setdefault(_PENDING_KEY, set()).update(term_keys)
+
+
+def _grade_keys(grade):
+    state = inspect(grade)
+    current = tuple(state.dict.get(field) for field in _GRADE_FIELDS)
+    previous = tuple(
+        state.attrs[field].history.deleted[0] if state.attrs[field].history.deleted else state.dict.get(field)
+        for field in _GRADE_FIELDS
+    )
+    return {current, previous}
+
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_after_flush(session, flush_context):
+    grade_keys = set()
+    for obj in session.new:
+        if isinstance(obj, Grade):
+            grade_keys |= _grade_keys(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Grade) and session.is_modified(obj, include_collections=False):
+            grade_keys |= _grade_keys(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Grade):
+            grade_keys |= _grade_keys(obj)
+
+    if not grade_keys:
+        return
+
+    connection = session.connection()
+    term_keys = resolve_term_keys(connection, grade_keys)
+    refresh_term_aggregates(connection, term_keys)
+    track_grade_changes(session, term_keys)
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_after_commit(session):
+    term_keys = session.info.pop(_PENDING_KEY, None)
+    if term_keys:
+        grades_changed.send(session, keys=frozenset(term_keys))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,153 @@
+import csv
+import io
+import zipfile
+from itertools import islice
+import numpy as np
+import pandas as pd
+from app import db
+from models import Student
+from utils.grade_upsert import upsert_grades
+
+IMPORT_BATCH = 500
+
+# Accepted header spellings, compared lower-cased with spaces/dashes as underscores
+ADMISSION_HEADERS = ('admission_number', 'admission_no', 'adm_no', 'admission')
+MARKS_HEADERS = ('marks', 'mark', 'score')
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def _normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def _column(header, names):
+    for i, value in enumerate(header):
+        if _normalize_header(value) in names:
+            return i
+    return None
+
+
+# 📄 Rows of a CSV or XLSX upload, read lazily (openpyxl read-only for Excel)
+def _iter_sheet(file, filename):
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        try:
+            yield from csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+        except UnicodeDecodeError:
+            # Typically an Excel "CSV" export in the Windows code page
+            raise ImportFormatError('The CSV file is not UTF-8 encoded; save it as "CSV UTF-8" and upload it again')
+    elif name.endswith('.xlsx'):
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+
+        try:
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except (zipfile.BadZipFile, InvalidFileException, KeyError):
+            raise ImportFormatError('The file is not a valid .xlsx workbook')
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    else:
+        raise ImportFormatError('Upload a .csv or .xlsx file')
+
+
+# 🔢 (row_number, admission_number, marks) for every non-blank data row
+def read_grade_rows(file, filename):
+    rows = _iter_sheet(file, filename)
+    header = next(rows, None)
+    if header is None:
+        raise ImportFormatError('The file is empty')
+
+    admission_col = _column(header, ADMISSION_HEADERS)
+    marks_col = _column(header, MARKS_HEADERS)
+    if admission_col is None or marks_col is None:
+        raise ImportFormatError('The file needs admission_number and marks columns')
+
+    for row_number, row in enumerate(rows, start=2):
+        admission = row[admission_col] if admission_col < len(row) else None
+        marks = row[marks_col] if marks_col < len(row) else None
+        if (admission is None or str(admission).strip() == '') and (marks is None or str(marks).strip() == ''):
+            continue
+        yield row_number, admission, marks
+
+
+def _admission_key(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Excel stores numeric admission numbers as floats
+    return str(value).strip() if value is not None else ''
+
+
+# ✅ Vectorized checks for one batch -> (entries for upsert_grades, row errors)
+def _validate_batch(batch, students_by_admission, class_id):
+    frame = pd.DataFrame(batch, columns=['row', 'admission_number', 'marks'])
+    frame['admission_number'] = frame['admission_number'].map(_admission_key)
+    blank = frame['marks'].isna() | (frame['marks'].astype(str).str.strip() == '')
+    marks = pd.to_numeric(frame['marks'], errors='coerce')
+
+    student = frame['admission_number'].map(students_by_admission)
+    student_id = student.str[0]
+    student_class = student.str[1]
+
+    # First matching problem wins
+    frame['error'] = np.select(
+        [
+            student.isna(),
+            student_class != class_id,
+            blank,
+            marks.isna(),
+            ~marks.between(0, 100),
+        ],
+        [
+            'Unknown admission number',
+            'Student is not in this class',
+            'Missing marks',
+            'Marks must be a number',
+            'Marks must be between 0 and 100',
+        ],
+        default=''
+    )
+
+    valid = frame['error'] == ''
+    entries = [
+        {'student_id': int(sid), 'marks': float(mark)}
+        for sid, mark in zip(student_id[valid], marks[valid])
+    ]
+    errors = [
+        {'row': int(r.row), 'admission_number': r.admission_number, 'error': r.error}
+        for r in frame[~valid].itertuples()
+    ]
+    return entries, errors
+
+
+# 📥 Import marks for one exam schedule, committing every IMPORT_BATCH rows
+def import_grades(exam_schedule, file, filename, batch_size=IMPORT_BATCH):
+    class_assignment = exam_schedule.class_assignment
+    students_by_admission = {
+        admission: (student_id, class_id)
+        for admission, student_id, class_id in db.session.query(
+            Student.admission_number, Student.student_id, Student.class_id
+        )
+    }
+
+    summary = {'rows': 0, 'added': 0, 'updated': 0, 'errors': []}
+    rows = read_grade_rows(file, filename)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        entries, errors = _validate_batch(batch, students_by_admission, class_assignment.class_id)
+        summary['rows'] += len(batch)
+        summary['errors'].extend(errors)
+        if entries:
+            for result in upsert_grades(
+                exam_schedule.id, class_assignment.subject_id, class_assignment.class_id, entries
+            ):
+                summary[result['status']] += 1
+            db.session.commit()
+
+    return summary
@@ -0,0 +1,117 @@
+import pandas as pd
+from sqlalchemy import func
+from app import db
+from models import Grade, Student, Classroom, Subject, ExamSchedule, ClassAssignment, Exam
+from utils.grading_schemes import scheme_for_form
+
+# group_by value -> (key column, label column) in the schedule frame
+STAT_GROUPS = {
+    'schedule': ('exam_schedule_id', 'schedule_label'),
+    'class': ('class_id', 'class_name'),
+    'subject': ('subject_id', 'subject_name'),
+    'exam': ('exam_id', 'exam_name'),
+}
+
+
+def _schedule_frame(*criteria):
+    rows = (
+        db.session.query(
+            ExamSchedule.id.label('exam_schedule_id'),
+            Exam.exam_id,
+            Exam.name.label('exam_name'),
+            ClassAssignment.class_id,
+            Classroom.class_name,
+            Classroom.form_level,
+            ClassAssignment.subject_id,
+            Subject.name.label('subject_name')
+        )
+        .join(Exam, Exam.exam_id == ExamSchedule.exam_id)
+        .join(ClassAssignment, ClassAssignment.id == ExamSchedule.class_assignment_id)
+        .join(Classroom, Classroom.class_id == ClassAssignment.class_id)
+        .join(Subject, Subject.subject_id == ClassAssignment.subject_id)
+        .filter(*criteria)
+        .all()
+    )
+    frame = pd.DataFrame(rows, columns=[
+        'exam_schedule_id', 'exam_id', 'exam_name', 'class_id', 'class_name', 'form_level', 'subject_id', 'subject_name'
+    ])
+    frame['schedule_label'] = frame['exam_name'] + ' - ' + frame['class_name'] + ' ' + frame['subject_name']
+    return frame
+
+
+def _with_grades(marks):
+    grades = pd.Series(index=marks.index, dtype=object)
+    for level, group in marks.groupby('form_level', dropna=False, sort=False):
+        scheme = scheme_for_form(None if pd.isna(level) else level)
+        grades[group.index] = scheme.grade(group['marks'].to_numpy(), group['subject_id'].to_numpy())
+    return marks.assign(grade=grades)
+
+
+def _summaries(marks, expected, key=None):
+    keys = marks[key] if key else pd.Series(0, index=marks.index)
+    grouped = marks['marks'].groupby(keys)
+    stats = pd.DataFrame({
+        'count': grouped.count(),
+        'mean': grouped.mean(),
+        'median': grouped.median(),
+        'std': grouped.std(ddof=0),
+        'min': grouped.min(),
+        'max': grouped.max(),
+        'q1': grouped.quantile(0.25),
+        'q3': grouped.quantile(0.75),
+    })
+    histograms = pd.crosstab(keys, marks['grade']) if len(marks) else pd.DataFrame()
+
+    summaries = {}
+    for group_key, expected_count in expected.items():
+        row = stats.loc[group_key] if group_key in stats.index else None
+        count = int(row['count']) if row is not None else 0
+        summary = {'count': count, 'missing': max(int(expected_count) - count, 0)}
+        for field in ('mean', 'median', 'std', 'min', 'max', 'q1', 'q3'):
+            summary[field] = round(float(row[field]), 2) if count else None
+        if group_key in histograms.index:
+            histogram = histograms.loc[group_key]
+            summary['grade_histogram'] = {grade: int(n) for grade, n in histogram.items() if n}
+        else:
+            summary['grade_histogram'] = {}
+        summaries[group_key] = summary
+    return summaries
+
+
+# 📊 Count, mean, median, spread, quartiles, grade histogram and missing marks for the
+# schedules matching criteria, overall and optionally per group_by (see STAT_GROUPS).
+# Missing = students currently in the class without a mark for the schedule.
+def grade_statistics(*criteria, group_by=None):
+    schedules = _schedule_frame(*criteria)
+    if schedules.empty:
+        return None
+
+    schedule_ids = schedules['exam_schedule_id'].tolist()
+    marks = pd.DataFrame(
+        db.session.query(Grade.exam_schedule_id, Grade.student_id, Grade.marks)
+        .filter(Grade.exam_schedule_id.in_(schedule_ids))
+        .all(),
+        columns=['exam_schedule_id', 'student_id', 'marks']
+    ).merge(schedules, on='exam_schedule_id')
+    marks = _with_grades(marks)
+
+    class_sizes = dict(
+        db.session.query(Student.class_id, func.count(Student.student_id))
+        .filter(Student.class_id.in_(schedules['class_id'].unique().tolist()))
+        .group_by(Student.class_id)
+        .all()
+    )
+    schedules['expected'] = schedules['class_id'].map(class_sizes).fillna(0)
+
+    result = {'overall': _summaries(marks, {0: schedules['expected'].sum()})[0]}
+    if group_by:
+        key, label = STAT_GROUPS[group_by]
+        expected = schedules.groupby(key)['expected'].sum()
+        labels = schedules.drop_duplicates(key).set_index(key)[label]
+        summaries = _summaries(marks, expected.to_dict(), key)
+        result['group_by'] = group_by
+        result['groups'] = sorted(
+            ({'id': int(group_key), 'label': labels[group_key], **summary} for group_key, summary in summaries.items()),
+            key=lambda g: g['label']
+        )
+    return result
@@ -0,0 +1,112 @@
+from sqlalchemy import select, insert, update, bindparam
+from app import db
+from models import Grade, Student
+from utils.grade_events import resolve_term_keys, refresh_term_aggregates, track_grade_changes
+from utils.grade_audit import audit_record, track_grade_audits
+
+_BATCH = 500
+
+
+def _batches(rows, size=_BATCH):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _upsert_statement(dialect_name):
+    table = Grade.__table__
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.student_id, table.c.exam_schedule_id],
+        # A re-entered mark replaces any moderation, so the next moderation starts from it
+        set_={'marks': stmt.excluded.marks, 'subject_id': stmt.excluded.subject_id, 'raw_marks': None}
+    )
+
+
+# 💾 Save marks for one exam schedule in a few statements instead of one query per student.
+# entries: [{student_id, marks}, ...]; entries for students outside class_id (or missing
+# values) are skipped. Returns [{student_id, status: added|updated}] in entry order.
+# The caller commits; term aggregates are refreshed, grades_changed and audit records queued here.
+def upsert_grades(exam_schedule_id, subject_id, class_id, entries):
+    session = db.session
+    table = Grade.__table__
+
+    valid_student_ids = set(session.scalars(select(Student.student_id).where(Student.class_id == class_id)))
+    existing = {
+        student_id: (previous_subject_id, previous_marks)
+        for student_id, previous_subject_id, previous_marks in session.execute(
+            select(Grade.student_id, Grade.subject_id, Grade.marks).where(Grade.exam_schedule_id == exam_schedule_id)
+        )
+    }
+
+    marks_by_student = {}
+    responses = []
+    for entry in entries:
+        student_id = entry.get('student_id')
+        marks = entry.get('marks')
+
+        if student_id is None or marks is None or student_id not in valid_student_ids:
+            continue
+
+        status = 'updated' if student_id in existing or student_id in marks_by_student else 'added'
+        marks_by_student[student_id] = marks
+        responses.append({'student_id': student_id, 'status': status})
+
+    if not marks_by_student:
+        return responses
+
+    rows = [{
+        'student_id': student_id,
+        'exam_schedule_id': exam_schedule_id,
+        'subject_id': subject_id,
+        'marks': marks
+    } for student_id, marks in marks_by_student.items()]
+
+    stmt = _upsert_statement(session.get_bind().dialect.name)
+    if stmt is not None:
+        for batch in _batches(rows):
+            session.execute(stmt, batch)
+    else:
+        # No ON CONFLICT on this backend: split into inserts and updates ourselves
+        new_rows = [r for r in rows if r['student_id'] not in existing]
+        changed_rows = [{
+            'b_student_id': r['student_id'],
+            'b_marks': r['marks'],
+            'b_subject_id': r['subject_id']
+        } for r in rows if r['student_id'] in existing]
+        for batch in _batches(new_rows):
+            session.execute(insert(table), batch)
+        update_stmt = (
+            update(table)
+            .where(table.c.student_id == bindparam('b_student_id'), table.c.exam_schedule_id == exam_schedule_id)
+            .values(marks=bindparam('b_marks'), subject_id=bindparam('b_subject_id'), raw_marks=None)
+        )
+        for batch in _batches(changed_rows):
+            session.execute(update_stmt, batch)
+
+    # ♻️ These statements bypass the ORM flush listeners, so refresh the aggregates here
+    grade_keys = {(student_id, exam_schedule_id, subject_id) for student_id in marks_by_student}
+    grade_keys |= {
+        (student_id, exam_schedule_id, existing[student_id][0])
+        for student_id in marks_by_student if student_id in existing
+    }
+    connection = session.connection()
+    term_keys = resolve_term_keys(connection, grade_keys)
+    refresh_term_aggregates(connection, term_keys)
+    track_grade_changes(session, term_keys)
+    track_grade_audits(session, [
+        audit_record(
+            'upsert', student_id, exam_schedule_id, subject_id,
+            old_marks=existing[student_id][1] if student_id in existing else None,
+            new_marks=marks
+        ) for student_id, marks in marks_by_student.items()
+        if student_id not in existing or existing[student_id][1] != marks
+    ])
+
+    return responses
@@ -1,25 +1,32 @@
+from bisect import bisect_right
+import numpy as np
+
+# 📊 Form 1-2 weighting: the two CATs are worth 40% and the Main Exam 60%
+CAT_EXAMS = ("CAT 1", "CAT 2")
+MAIN_EXAM = "Main Exam"
+CAT_WEIGHT = 40
+MAIN_WEIGHT = 60
+
+# 🎓 KCSE lower bounds (ascending) and the grade for each band; below 30 is an E
+KCSE_BOUNDARIES = (30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80)
+KCSE_GRADES = ("E", "D-", "D", "D+", "C-", "C", "C+", "B-", "B", "B+", "A-", "A")
+
+_BOUNDARY_ARRAY = np.array(KCSE_BOUNDARIES, dtype=float)
+_GRADE_ARRAY = np.array(KCSE_GRADES, dtype=object)
+
+
+def weighted_form1_2_score(cat1, cat2, main):
+    return ((cat1 + cat2) / 100 * CAT_WEIGHT) + (main / 100 * MAIN_WEIGHT)
+
+
 def get_kcse_grade(score):
-    if score >= 80:
-        return "A"
-    elif score >= 75:
-        return "A-"
-    elif score >= 70:
-        return "B+"
-    elif score >= 65:
-        return "B"
-    elif score >= 60:
-        return "B-"
-    elif score >= 55:
-        return "C+"
-    elif score >= 50:
-        return "C"
-    elif score >= 45:
-        return "C-"
-    elif score >= 40:
-        return "D+"
-    elif score >= 35:
-        return "D"
-    elif score >= 30:
-        return "D-"
-    else:
-        return "E"
+    return KCSE_GRADES[bisect_right(KCSE_BOUNDARIES, score)]
+
+
+# ⚡ Grade a whole array of marks in one call
+def kcse_grade_index(marks):
+    return np.searchsorted(_BOUNDARY_ARRAY, np.asarray(marks, dtype=float), side='right')
+
+
+def get_kcse_grades(marks):
+    return _GRADE_ARRAY[kcse_grade_index(marks)].tolist()
@@ -0,0 +1,146 @@
+import threading
+import time
+import numpy as np
+from flask import current_app
+from sqlalchemy import event, select, func
+from sqlalchemy.orm import Session
+from app import db
+from models import GradingScheme
+from utils.grade_utils import KCSE_BOUNDARIES, KCSE_GRADES, CAT_WEIGHT, MAIN_WEIGHT
+
+# Tables cover 0-100 in 0.5 steps: index = floor(marks * 2)
+RESOLUTION = 2
+TABLE_SIZE = 100 * RESOLUTION + 1
+
+KCSE_SCHEME_BOUNDARIES = [{'min': 0, 'grade': KCSE_GRADES[0]}] + [
+    {'min': low, 'grade': grade} for low, grade in zip(KCSE_BOUNDARIES, KCSE_GRADES[1:])
+]
+
+
+def validate_boundaries(boundaries):
+    if not isinstance(boundaries, list) or not boundaries:
+        return 'boundaries must be a non-empty list of {min, grade}'
+    try:
+        mins = [float(b['min']) for b in boundaries]
+    except (KeyError, TypeError, ValueError):
+        return 'each boundary needs a numeric min and a grade'
+    if any(not isinstance(b.get('grade'), str) or not b['grade'] for b in boundaries):
+        return 'each boundary needs a numeric min and a grade'
+    if mins[0] != 0:
+        return 'the lowest boundary must start at 0'
+    if any(low >= high for low, high in zip(mins, mins[1:])):
+        return 'boundary mins must be strictly increasing'
+    if mins[-1] > 100 or any(low * RESOLUTION != int(low * RESOLUTION) for low in mins):
+        return 'boundary mins must be multiples of 0.5 between 0 and 100'
+    return None
+
+
+# 🗂 Grade label for every half mark from 0 to 100
+def compile_table(boundaries):
+    mins = np.array([float(b['min']) for b in boundaries])
+    grades = np.array([b['grade'] for b in boundaries], dtype=object)
+    steps = np.arange(TABLE_SIZE) / RESOLUTION
+    return grades[np.searchsorted(mins, steps, side='right') - 1]
+
+
+def _table_index(marks):
+    marks = np.clip(np.asarray(marks, dtype=float), 0, 100)
+    return np.floor(marks * RESOLUTION).astype(int)
+
+
+# ⚡ A scheme compiled to plain lookup tables: grading is one array index per call
+class CompiledScheme:
+    def __init__(self, boundaries, cat_weight=CAT_WEIGHT, main_weight=MAIN_WEIGHT, subject_overrides=None, name='KCSE'):
+        self.name = name
+        self.cat_weight = cat_weight
+        self.main_weight = main_weight
+        self.table = compile_table(boundaries)
+        self.subject_tables = {
+            int(subject_id): compile_table(override)
+            for subject_id, override in (subject_overrides or {}).items()
+        }
+
+    def grade(self, marks, subject_ids=None):
+        index = _table_index(marks)
+        grades = self.table[index]
+        if subject_ids is not None and self.subject_tables:
+            subject_ids = np.asarray(subject_ids)
+            for subject_id, table in self.subject_tables.items():
+                mask = subject_ids == subject_id
+                if mask.any():
+                    grades[mask] = table[index[mask]]
+        return grades.tolist()
+
+    def grade_one(self, marks, subject_id=None):
+        table = self.subject_tables.get(subject_id, self.table)
+        return table[_table_index(marks)]
+
+    def weighted_score(self, cat1, cat2, main):
+        return ((cat1 + cat2) / 100 * self.cat_weight) + (main / 100 * self.main_weight)
+
+
+DEFAULT_SCHEME = CompiledScheme(KCSE_SCHEME_BOUNDARIES)
+
+# 🧠 Per-process cache: form level -> compiled scheme. Cleared here when this process
+# commits a scheme edit; edits from other processes are picked up by comparing the table's
+# (row count, latest updated_at) at most every GRADING_SCHEME_CHECK_SECONDS
+_lock = threading.Lock()
+_by_form = None
+_version = None
+_next_check = 0
+_DIRTY_KEY = 'grading_schemes_dirty'
+
+
+def _scheme_version():
+    return tuple(db.session.execute(
+        select(func.count(GradingScheme.id), func.max(GradingScheme.updated_at))
+    ).one())
+
+
+def _load():
+    by_form = {}
+    for scheme in GradingScheme.query.order_by(GradingScheme.id).all():
+        by_form.setdefault(scheme.form_level, CompiledScheme(
+            scheme.boundaries,
+            cat_weight=scheme.cat_weight,
+            main_weight=scheme.main_weight,
+            subject_overrides=scheme.subject_overrides,
+            name=scheme.name
+        ))
+    return by_form
+
+
+def scheme_for_form(form_level):
+    global _by_form, _version, _next_check
+    with _lock:
+        now = time.monotonic()
+        if _by_form is None or now >= _next_check:
+            version = _scheme_version()
+            if _by_form is None or version != _version:
+                _by_form, _version = _load(), version
+            _next_check = now + current_app.config['GRADING_SCHEME_CHECK_SECONDS']
+        by_form = _by_form
+    return by_form.get(form_level) or by_form.get(None) or DEFAULT_SCHEME
+
+
+def clear_scheme_cache():
+    global _by_form
+    with _lock:
+        _by_form = None
+
+
+@event.listens_for(Session, 'before_flush')
+def _flag_scheme_changes(session, flush_context, instances):
+    if any(isinstance(obj, GradingScheme) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop(_DIRTY_KEY, False):
+        clear_scheme_cache()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
@@ -1,5 +1,6 @@
 import string
 import random
+import re
 from datetime import datetime
 
 def generate_random_password(length=10):
@@ -10,3 +11,17 @@ def generate_employee_number():
     timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S%f')[:-3]
     random_digits = ''.join(random.choices(string.digits, k=3))
     return f"T{timestamp}{random_digits}"
+
+# 🏫 "Form 3", "form3", "F3", "3", 3 or a class name like "3G" -> "3"
+def normalize_form_level(value):
+    if value is None:
+        return None
+    match = re.match(r'^\s*(?:form|f)?\s*([1-4])', str(value), re.IGNORECASE)
+    return match.group(1) if match else None
+
+# 📅 "Term 2", "term2", "T2", "2" -> "Term 2" (the form exams are stored in)
+def normalize_term(value):
+    if value is None:
+        return None
+    match = re.match(r'^\s*(?:term|t)?\s*([1-3])\s*$', str(value), re.IGNORECASE)
+    return f"Term {match.group(1)}" if match else None
@@ -0,0 +1,170 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import request, jsonify, current_app, make_response
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app import db
+from models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+_POLL_START = 0.05
+_POLL_MAX = 0.5
+
+_table = IdempotencyKey.__table__
+
+
+def _request_hash():
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}?{request.query_string.decode()}\n".encode())
+    digest.update(request.get_data(cache=True))  # cached, so request.form/files still parse
+    return digest.hexdigest()
+
+
+def _row_filter(user_id, key):
+    return (_table.c.user_id == user_id) & (_table.c.key == key)
+
+
+# A pending claim whose heartbeat stopped before this belongs to a worker that died mid-request
+def _lease_cutoff():
+    return datetime.utcnow() - timedelta(seconds=current_app.config['IDEMPOTENCY_LEASE_SECONDS'])
+
+
+def _abandoned(row):
+    return (row.heartbeat_at or row.created_at) < _lease_cutoff()
+
+
+# 💓 Renew our claim's lease while the view runs, so waiters never take over a live request
+class _Heartbeat:
+    def __init__(self, engine, claim, interval, logger=None):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(engine, claim, interval, logger), name='idempotency-heartbeat', daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, engine, claim, interval, logger):
+        while not self._stop.wait(interval):
+            try:
+                with engine.begin() as connection:
+                    connection.execute(update(_table).where(claim).values(heartbeat_at=datetime.utcnow()))
+            except SQLAlchemyError:
+                if logger:
+                    logger.exception("Failed to renew an idempotency claim")
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+# 🔐 Insert a pending row for (user, key) in its own transaction, first dropping expired
+# rows and an abandoned claim (no heartbeat for IDEMPOTENCY_LEASE_SECONDS) on this key. Returns the claim's created_at (which the
+# claimant's final write matches on), or None if someone else holds the key.
+def _claim(user_id, key, request_hash):
+    now = datetime.utcnow()
+    ttl = timedelta(seconds=current_app.config['IDEMPOTENCY_TTL_SECONDS'])
+    with db.engine.begin() as connection:
+        connection.execute(delete(_table).where(_table.c.expires_at < now))
+        connection.execute(delete(_table).where(
+            _row_filter(user_id, key),
+            _table.c.status == 'pending',
+            func.coalesce(_table.c.heartbeat_at, _table.c.created_at) < _lease_cutoff()
+        ))
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(insert(_table).values(
+                user_id=user_id,
+                key=key,
+                endpoint=request.endpoint,
+                request_hash=request_hash,
+                status='pending',
+                created_at=now,
+                heartbeat_at=now,
+                expires_at=now + ttl
+            ))
+        return now
+    except IntegrityError:
+        return None
+
+
+def _load(user_id, key):
+    with db.engine.connect() as connection:
+        return connection.execute(select(_table).where(_row_filter(user_id, key))).first()
+
+
+def _replay(row):
+    response = make_response(row.response_body, row.response_status)
+    response.mimetype = row.response_mimetype or 'application/json'
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+# ⏳ Wait for the first request with this key to finish, then replay its response
+def _wait_for(user_id, key, request_hash):
+    deadline = time.monotonic() + current_app.config['IDEMPOTENCY_WAIT_SECONDS']
+    delay = _POLL_START
+    while True:
+        row = _load(user_id, key)
+        if row is None:
+            return None  # the first request failed and released the key
+        if row.request_hash != request_hash:
+            return jsonify({'error': f"{HEADER} was already used for a different request"}), 422
+        if row.status == 'done':
+            return _replay(row)
+        if time.monotonic() >= deadline:
+            return jsonify({'error': 'A request with this Idempotency-Key is still in progress'}), 409
+        if _abandoned(row):
+            return None  # its worker died; try to take the key over
+        time.sleep(delay)
+        delay = min(delay * 2, _POLL_MAX)
+
+
+# ♻️ Make a write endpoint safe to retry: with an Idempotency-Key header the first
+# response is stored and replayed for repeats; concurrent repeats wait for it.
+# Goes under @token_required (needs current_user). Server errors are not stored.
+def idempotent(f):
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return f(current_user, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f"{HEADER} must be at most {MAX_KEY_LENGTH} characters"}), 400
+
+        user_id = current_user.user_id
+        request_hash = _request_hash()
+        claimed_at = _claim(user_id, key, request_hash)
+        while claimed_at is None:
+            result = _wait_for(user_id, key, request_hash)
+            if result is not None:
+                return result
+            claimed_at = _claim(user_id, key, request_hash)
+
+        # Only touch our own claim: if its heartbeat stalled another request may hold the key now
+        own_claim = _row_filter(user_id, key) & (_table.c.created_at == claimed_at)
+        config = current_app.config
+        heartbeat = _Heartbeat(db.engine, own_claim, config['IDEMPOTENCY_LEASE_SECONDS'] / 4, current_app.logger)
+        try:
+            response = make_response(f(current_user, *args, **kwargs))
+        except Exception:
+            heartbeat.stop()
+            with db.engine.begin() as connection:
+                connection.execute(delete(_table).where(own_claim))
+            raise
+        heartbeat.stop()
+
+        with db.engine.begin() as connection:
+            if response.status_code >= 500 or response.is_streamed:
+                connection.execute(delete(_table).where(own_claim))
+            else:
+                connection.execute(update(_table).where(own_claim).values(
+                    status='done',
+                    response_status=response.status_code,
+                    response_body=response.get_data(as_text=True),
+                    response_mimetype=response.mimetype
+                ))
+        return response
+    return decorated
@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import Student
+from utils.grade_events import grades_changed
+from utils.report_engine import class_term_means
+
+_MAX_ENTRIES = 512
+_ROSTER_KEY = 'class_roster_changed'
+
+
+# 🏁 Per-process cache of class leaderboards keyed by (class_id, term, year).
+# Concurrent misses for the same key wait for a single computation (its lock only
+# lives while someone is computing or waiting); entries are dropped when grades of
+# one of their students change for that term.
+class LeaderboardCache:
+    def __init__(self, ttl, max_entries=_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._key_locks = {}  # key -> [lock, threads using it]
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, class_id, term, year):
+        key = (class_id, term, year)
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry
+
+        with self._key_lock(key):
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry
+
+            generation = self._generation
+            students = class_term_means(class_id, term, year)
+            entry = {
+                'students': students,
+                'student_ids': frozenset(s['student_id'] for s in students),
+                'class_average': round(sum(s['mean'] for s in students) / len(students), 1) if students else 0,
+                'expires': time.monotonic() + self.ttl
+            }
+            with self._lock:
+                # Grades changed while computing: serve the result but don't keep it
+                if generation == self._generation:
+                    self._entries[key] = entry
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return entry
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires'] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    @contextmanager
+    def _key_lock(self, key):
+        with self._lock:
+            holder = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            holder[1] += 1
+        try:
+            with holder[0]:
+                yield
+        finally:
+            with self._lock:
+                holder[1] -= 1
+                if not holder[1]:
+                    del self._key_locks[key]
+
+    def invalidate(self, keys):
+        terms = {}
+        for student_id, term, year, _ in keys:
+            terms.setdefault((term, year), set()).add(student_id)
+
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                _, term, year = key
+                student_ids = terms.get((term, year))
+                if student_ids and not student_ids.isdisjoint(self._entries[key]['student_ids']):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+_caches = []
+
+
+def init_leaderboard_cache(app):
+    cache = LeaderboardCache(app.config['LEADERBOARD_CACHE_TTL'])
+    app.extensions['leaderboard_cache'] = cache
+    _caches.append(cache)
+    return cache
+
+
+def get_leaderboard_cache():
+    return current_app.extensions['leaderboard_cache']
+
+
+# ♻️ Drop the leaderboards of any class/term whose grades changed
+@grades_changed.connect
+def _invalidate_changed_terms(sender, keys, **kwargs):
+    for cache in _caches:
+        cache.invalidate(keys)
+
+
+# 👥 Students joining, leaving or changing class change every leaderboard they appear in
+@event.listens_for(Session, 'before_flush')
+def _flag_roster_changes(session, flush_context, instances):
+    added_or_removed = any(isinstance(obj, Student) for obj in (*session.new, *session.deleted))
+    moved = any(
+        isinstance(obj, Student) and inspect(obj).attrs.class_id.history.has_changes()
+        for obj in session.dirty
+    )
+    if added_or_removed or moved:
+        session.info[_ROSTER_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _clear_after_roster_commit(session):
+    if session.info.pop(_ROSTER_KEY, False):
+        for cache in _caches:
+            cache.clear()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_ROSTER_KEY, None)
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import update, bindparam, func
+from app import db
+from models import Grade, ExamSchedule, ClassAssignment, Classroom, Subject
+from utils.grade_events import resolve_term_keys, refresh_term_aggregates, track_grade_changes
+from utils.grade_audit import audit_record, track_grade_audits
+
+# zscore: each class to the target mean/SD (defaults: all classes pooled, per subject)
+# linear: each class's marks multiplied so the class mean hits the target mean (no SD target)
+MODERATION_METHODS = ('zscore', 'linear')
+_BATCH = 500
+
+
+# 📥 One row per grade for an exam: raw mark (before any earlier moderation), class, subject
+def moderation_frame(exam_id, subject_id=None, class_ids=None):
+    query = (
+        db.session.query(
+            Grade.grade_id,
+            Grade.student_id,
+            Grade.exam_schedule_id,
+            Grade.subject_id,
+            Subject.name,
+            ClassAssignment.class_id,
+            Classroom.class_name,
+            Grade.marks,
+            func.coalesce(Grade.raw_marks, Grade.marks)
+        )
+        .join(ExamSchedule, ExamSchedule.id == Grade.exam_schedule_id)
+        .join(ClassAssignment, ClassAssignment.id == ExamSchedule.class_assignment_id)
+        .join(Classroom, Classroom.class_id == ClassAssignment.class_id)
+        .join(Subject, Subject.subject_id == Grade.subject_id)
+        .filter(ExamSchedule.exam_id == exam_id)
+    )
+    if subject_id:
+        query = query.filter(Grade.subject_id == subject_id)
+    if class_ids:
+        query = query.filter(ClassAssignment.class_id.in_(class_ids))
+
+    return pd.DataFrame(query.all(), columns=[
+        'grade_id', 'student_id', 'exam_schedule_id', 'subject_id', 'subject_name',
+        'class_id', 'class_name', 'marks', 'raw_marks'
+    ])
+
+
+# 🧮 Adjusted marks for every grade, computed per (subject, class) in one vectorized pass.
+# Classes with one student or no spread are left as they are.
+def moderate(frame, method='zscore', target_mean=None, target_sd=None):
+    raw = frame['raw_marks'].to_numpy(dtype=float)
+    by_class = frame.groupby(['subject_id', 'class_id'])['raw_marks']
+    by_subject = frame.groupby('subject_id')['raw_marks']
+    class_mean = by_class.transform('mean').to_numpy()
+    class_sd = by_class.transform('std', ddof=0).to_numpy()
+    class_size = by_class.transform('size').to_numpy()
+
+    mean = np.full(len(frame), target_mean, dtype=float) if target_mean is not None \
+        else by_subject.transform('mean').to_numpy()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method == 'zscore':
+            sd = np.full(len(frame), target_sd, dtype=float) if target_sd is not None \
+                else by_subject.transform('std', ddof=0).to_numpy()
+            adjusted = mean + (raw - class_mean) / class_sd * sd
+            usable = (class_size > 1) & (class_sd > 0)
+        else:
+            adjusted = raw * mean / class_mean
+            usable = class_mean > 0
+
+    adjusted = np.where(usable, np.clip(adjusted, 0, 100), raw).round(1)
+    return frame.assign(adjusted=adjusted)
+
+
+# 📊 Before/after mean and SD per class and subject, for the dry-run preview
+def moderation_summary(frame):
+    frame = frame.assign(changed=frame['adjusted'] != frame['marks'])
+    grouped = frame.groupby(['subject_id', 'subject_name', 'class_id', 'class_name'])
+    summary = pd.DataFrame({
+        'count': grouped['raw_marks'].size(),
+        'raw_mean': grouped['raw_marks'].mean(),
+        'raw_sd': grouped['raw_marks'].std(ddof=0),
+        'moderated_mean': grouped['adjusted'].mean(),
+        'moderated_sd': grouped['adjusted'].std(ddof=0),
+        'changed': grouped['changed'].sum(),
+    }).round(2).reset_index()
+    return summary.to_dict(orient='records')
+
+
+# 💾 Write every adjusted mark with executemany UPDATEs, keeping the first raw mark
+def apply_moderation(frame):
+    changed = frame[frame['adjusted'] != frame['marks']]
+    if changed.empty:
+        return 0
+
+    table = Grade.__table__
+    stmt = (
+        update(table)
+        .where(table.c.grade_id == bindparam('b_grade_id'))
+        .values(raw_marks=func.coalesce(table.c.raw_marks, table.c.marks), marks=bindparam('b_marks'))
+    )
+    rows = [
+        {'b_grade_id': int(grade_id), 'b_marks': float(marks)}
+        for grade_id, marks in zip(changed['grade_id'], changed['adjusted'])
+    ]
+    session = db.session
+    for i in range(0, len(rows), _BATCH):
+        session.execute(stmt, rows[i:i + _BATCH])
+
+    # ♻️ Bypassed the ORM, so refresh aggregates and queue events/audits by hand
+    connection = session.connection()
+    grade_keys = set(zip(changed['student_id'].tolist(), changed['exam_schedule_id'].tolist(),
+                         changed['subject_id'].tolist()))
+    term_keys = resolve_term_keys(connection, grade_keys)
+    refresh_term_aggregates(connection, term_keys)
+    track_grade_changes(session, term_keys)
+    track_grade_audits(session, [
+        audit_record('moderate', int(r.student_id), int(r.exam_schedule_id), int(r.subject_id),
+                     old_marks=float(r.marks), new_marks=float(r.adjusted), grade_id=int(r.grade_id))
+        for r in changed.itertuples()
+    ])
+    return len(rows)
@@ -0,0 +1,137 @@
+import atexit
+import hmac
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Werkzeug hashes look like "scrypt:32768:8:1$salt$hash" / "pbkdf2:sha256:600000$salt$hash"
+_HASH_PREFIXES = ('scrypt:', 'pbkdf2:')
+
+_verifier = None
+
+
+class VerifierBusy(Exception):
+    """Too many password checks already queued; the caller should retry shortly."""
+
+
+def is_password_hash(stored):
+    return stored.startswith(_HASH_PREFIXES) and stored.count('$') == 2
+
+
+def hash_password(password, method=None):
+    return generate_password_hash(password, method=method or current_app.config['PASSWORD_HASH_METHOD'])
+
+
+# 🔍 Works for Werkzeug hashes and for legacy plaintext rows
+def check_password(stored, password):
+    if is_password_hash(stored):
+        return check_password_hash(stored, password)
+    return hmac.compare_digest(stored.encode(), password.encode())
+
+
+# "scrypt" -> "scrypt:32768:8:1": the full method string Werkzeug writes into hashes
+@lru_cache(maxsize=8)
+def _full_method(method):
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
+# ♻️ Plaintext, or hashed with something other than the configured method and cost
+def needs_rehash(stored, method=None):
+    if not is_password_hash(stored):
+        return True
+    method = method or current_app.config['PASSWORD_HASH_METHOD']
+    return stored.split('$', 1)[0] != _full_method(method)
+
+
+# 🔐 Runs password checks on a fixed number of threads so a login rush can't occupy every
+# request worker with hashing (scrypt/pbkdf2 release the GIL while they run). At most
+# max_pending checks are queued or running; beyond that verify() raises VerifierBusy.
+class PasswordVerifier:
+    def __init__(self, workers, max_pending, timeout, dummy_hash):
+        self.timeout = timeout
+        self.dummy_hash = dummy_hash
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-verify')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def verify(self, stored, password):
+        if not self._slots.acquire(blocking=False):
+            raise VerifierBusy()
+        try:
+            # Unknown users still pay for a hash, so response time doesn't reveal which emails exist
+            future = self._executor.submit(check_password, stored or self.dummy_hash, password)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(self.timeout) and stored is not None
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def init_password_verifier(app):
+    global _verifier
+    _verifier = PasswordVerifier(
+        workers=app.config['PASSWORD_VERIFY_WORKERS'],
+        max_pending=app.config['PASSWORD_VERIFY_QUEUE'],
+        timeout=app.config['PASSWORD_VERIFY_TIMEOUT'],
+        dummy_hash=generate_password_hash('dummy-password', method=app.config['PASSWORD_HASH_METHOD'])
+    )
+    atexit.register(_verifier.close)
+    return _verifier
+
+
+def get_password_verifier():
+    return _verifier
+
+
+# ⏱️ Logins/sec through a PasswordVerifier for a given hash method: `concurrency` clients
+# send `logins` checks in total; busy rejections are counted, not retried
+def benchmark_logins(method, logins, concurrency, workers, max_pending):
+    stored = generate_password_hash('correct horse battery staple', method=method)
+    verifier = PasswordVerifier(workers, max_pending, timeout=None, dummy_hash=stored)
+    latencies = []
+    rejected = 0
+    lock = threading.Lock()
+    remaining = iter(range(logins))
+
+    def client():
+        nonlocal rejected
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            try:
+                verifier.verify(stored, 'correct horse battery staple')
+            except VerifierBusy:
+                with lock:
+                    rejected += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    duration = time.perf_counter() - started
+    verifier.close()
+
+    latencies.sort()
+    percentile = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] if latencies else 0
+    return {
+        'method': stored.split('$', 1)[0],
+        'verified': len(latencies),
+        'rejected': rejected,
+        'seconds': duration,
+        'per_second': len(latencies) / duration if duration else 0,
+        'p50_ms': percentile(0.5) * 1000,
+        'p95_ms': percentile(0.95) * 1000
+    }
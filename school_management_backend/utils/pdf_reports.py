@@ -0,0 +1,193 @@
+import atexit
+import io
+import json
+import multiprocessing
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from app import db
+from models import Grade, Student, Subject, Classroom, ExamSchedule, Exam
+
+
+# 📘 Render one student's report card. Takes plain data only so it can run in a worker process.
+# student: {first_name, last_name, admission_number, class_name}
+# rows: [(subject, exam, marks, term, year), ...]
+def render_student_pdf(student, rows):
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    y = height - 40
+
+    p.setFont("Helvetica-Bold", 14)
+    p.drawString(60, y, "📘 Student Report")
+    y -= 30
+
+    p.setFont("Helvetica", 11)
+    p.drawString(60, y, f"Name: {student['first_name']} {student['last_name']}")
+    p.drawString(300, y, f"Admission #: {student['admission_number']}")
+    y -= 20
+    p.drawString(60, y, f"Class: {student['class_name']}")
+    y -= 30
+
+    p.setFont("Helvetica-Bold", 10)
+    p.drawString(60, y, "Subject")
+    p.drawString(180, y, "Exam")
+    p.drawString(300, y, "Marks")
+    p.drawString(360, y, "Term")
+    p.drawString(420, y, "Year")
+    y -= 15
+
+    p.setFont("Helvetica", 10)
+    for subject, exam, marks, term, year in rows:
+        if y < 40:
+            p.showPage()
+            y = height - 40
+        p.drawString(60, y, subject)
+        p.drawString(180, y, exam or "N/A")
+        p.drawString(300, y, str(marks))
+        p.drawString(360, y, term or "")
+        p.drawString(420, y, str(year) if year else "")
+        y -= 15
+
+    pages = p.getPageNumber()
+    p.save()
+    return buffer.getvalue(), pages
+
+
+def _render_job(filename, student, rows):
+    pdf, pages = render_student_pdf(student, rows)
+    return filename, pdf, pages
+
+
+def report_filename(student):
+    return f"{student['first_name']}_{student['last_name']}_report.pdf"
+
+
+# 📚 Every grade for a cohort in one query, grouped into per-student payloads
+def cohort_report_data(*criteria):
+    rows = (
+        db.session.query(
+            Student.student_id,
+            Student.first_name,
+            Student.last_name,
+            Student.admission_number,
+            Classroom.class_name,
+            Subject.name,
+            Exam.name,
+            Grade.marks,
+            Exam.term,
+            Exam.year
+        )
+        .select_from(Grade)
+        .join(Student, Student.student_id == Grade.student_id)
+        .join(Classroom, Classroom.class_id == Student.class_id)
+        .join(Subject, Subject.subject_id == Grade.subject_id)
+        .join(ExamSchedule, ExamSchedule.id == Grade.exam_schedule_id)
+        .join(Exam, Exam.exam_id == ExamSchedule.exam_id)
+        .filter(*criteria)
+        .order_by(Classroom.class_name, Student.student_id, Grade.grade_id)
+        .all()
+    )
+
+    students = {}
+    for student_id, first, last, admission, class_name, subject, exam, marks, term, year in rows:
+        if student_id not in students:
+            students[student_id] = ({
+                'first_name': first,
+                'last_name': last,
+                'admission_number': admission,
+                'class_name': class_name
+            }, [])
+        students[student_id][1].append((subject, exam, marks, term, year))
+    return list(students.values())
+
+
+# 🗜 Zip written to a non-seekable sink; zipfile falls back to data descriptors
+class _ZipSink(io.RawIOBase):
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# 🏊 One render pool per web process, created on first use and shut down at exit. Workers
+# start through forkserver (spawn where unavailable) rather than forking a threaded server.
+def _render_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+# A worker died: drop the broken pool so the next export starts a fresh one
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ⚙️ Render the cohort on the shared process pool and yield ZIP bytes as each PDF completes.
+# A summary.json entry at the end records pages/second for sizing the pool.
+def stream_report_zip(cohort, workers, logger=None):
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED)
+    pool = _render_pool(workers)
+    started = time.perf_counter()
+    pages = 0
+    futures = []
+
+    try:
+        futures = [
+            pool.submit(_render_job, f"{student['class_name']}/{student['admission_number']}_{report_filename(student)}", student, rows)
+            for student, rows in cohort
+        ]
+        for future in as_completed(futures):
+            filename, pdf, page_count = future.result()
+            pages += page_count
+            archive.writestr(filename, pdf)
+            yield sink.drain()
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            'students': len(futures),
+            'pages': pages,
+            'workers': workers,
+            'seconds': round(elapsed, 3),
+            'pages_per_second': round(pages / elapsed, 2) if elapsed else None
+        }
+        if logger:
+            logger.info("Bulk report cards rendered: %s", summary)
+        archive.writestr('summary.json', json.dumps(summary, indent=2))
+        archive.close()
+        yield sink.drain()
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        # Client gone or a render failed: don't leave this export's work queued on the shared pool
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app import db
+from models import User, Teacher, Parent
+
+_CHANGED_KEY = 'principals_changed'
+
+
+# 👤 What token_required hands to routes as current_user: the caller's identity
+# and profile ids, without an ORM User behind it
+class Principal:
+    __slots__ = ('user_id', 'role', 'teacher_id', 'parent_id')
+
+    def __init__(self, user_id, role, teacher_id=None, parent_id=None):
+        self.user_id = user_id
+        self.role = role
+        self.teacher_id = teacher_id
+        self.parent_id = parent_id
+
+    def claims(self):
+        return {
+            'user_id': self.user_id,
+            'role': self.role,
+            'teacher_id': self.teacher_id,
+            'parent_id': self.parent_id
+        }
+
+
+# 🔎 One query for the user and their teacher/parent profile; None if the user is gone
+def load_principal(user_id):
+    row = db.session.execute(
+        select(User.user_id, User.role, Teacher.teacher_id, Parent.parent_id)
+        .outerjoin(Teacher, Teacher.user_id == User.user_id)
+        .outerjoin(Parent, Parent.user_id == User.user_id)
+        .where(User.user_id == user_id)
+    ).first()
+    return Principal(*row) if row else None
+
+
+# 🪪 Per-process LRU of principals by user_id with a TTL. Entries are dropped when the
+# user is deleted, their role changes or their teacher/parent profile is added or removed;
+# the TTL bounds how long other processes can serve a stale entry.
+class PrincipalCache:
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                return entry[0]
+            generation = self._generation
+
+        principal = load_principal(user_id)
+        if principal is None:
+            return None
+
+        with self._lock:
+            # A user changed while loading: serve the result but don't keep it
+            if generation == self._generation:
+                self._entries[user_id] = (principal, now + self.ttl)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+_caches = []
+
+
+def init_principal_cache(app):
+    cache = PrincipalCache(app.config['PRINCIPAL_CACHE_TTL'], app.config['PRINCIPAL_CACHE_SIZE'])
+    app.extensions['principal_cache'] = cache
+    _caches.append(cache)
+    return cache
+
+
+def get_principal_cache():
+    return current_app.extensions['principal_cache']
+
+
+def _changed_user_ids(session):
+    user_ids = set()
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, (User, Teacher, Parent)) and obj.user_id is not None:
+            user_ids.add(obj.user_id)
+    for obj in session.dirty:
+        if isinstance(obj, User) and inspect(obj).attrs.role.history.has_changes():
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, (Teacher, Parent)):
+            history = inspect(obj).attrs.user_id.history
+            if history.has_changes():
+                user_ids.update(i for i in (*history.deleted, *history.added) if i is not None)
+    return user_ids
+
+
+# ♻️ Drop cached principals for users whose identity changed, once the change commits
+@event.listens_for(Session, 'after_flush')
+def _flag_principal_changes(session, flush_context):
+    user_ids = _changed_user_ids(session)
+    if user_ids:
+        session.info.setdefault(_CHANGED_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    user_ids = session.info.pop(_CHANGED_KEY, None)
+    if user_ids:
+        for cache in _caches:
+            cache.invalidate(user_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_CHANGED_KEY, None)
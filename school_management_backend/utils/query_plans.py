@@ -0,0 +1,75 @@
+import re
+from sqlalchemy import select, func, text
+from app import db
+from models import (
+    Grade, Student, Message, TimetableEntry, AnnouncementRead, StudentTermAggregate,
+    ClassAssignment, ExamSchedule
+)
+
+# 🔥 Hot lookups that must be served by an index: (name, table, statement)
+HOT_QUERIES = [
+    ('grades by student', 'grades', select(Grade).where(Grade.student_id == 1)),
+    ('grades by exam schedule', 'grades', select(Grade).where(Grade.exam_schedule_id == 1)),
+    ('grade listing page', 'grades',
+     select(Grade.grade_id).where(Grade.exam_schedule_id == 1, Grade.grade_id < 1000)
+     .order_by(Grade.grade_id.desc()).limit(50)),
+    ('students by class', 'students', select(Student).where(Student.class_id == 1)),
+    ('inbox', 'messages',
+     select(Message).where(Message.receiver_id == 1).order_by(Message.timestamp.desc())),
+    ('unread message count', 'messages',
+     select(func.count()).select_from(Message).where(Message.receiver_id == 1, Message.read.is_(False))),
+    ('sent messages', 'messages',
+     select(Message).where(Message.sender_id == 1).order_by(Message.timestamp.desc())),
+    ('teacher timetable', 'timetable_entries',
+     select(TimetableEntry).where(TimetableEntry.teacher_id == 1, TimetableEntry.day == 'Monday')),
+    ('class timetable', 'timetable_entries',
+     select(TimetableEntry).where(TimetableEntry.class_id == 1)
+     .order_by(TimetableEntry.day, TimetableEntry.start_time)),
+    ('announcements read by user', 'announcement_reads',
+     select(func.count()).select_from(AnnouncementRead).where(AnnouncementRead.user_id == 1)),
+    ('term aggregates', 'student_term_aggregates',
+     select(StudentTermAggregate).where(StudentTermAggregate.term == 'Term 1', StudentTermAggregate.year == 2025)),
+    ('teacher assignments', 'class_assignments',
+     select(ClassAssignment).where(ClassAssignment.teacher_id == 1)),
+    ('schedules by assignment', 'exam_schedules',
+     select(ExamSchedule).where(ExamSchedule.class_assignment_id == 1)),
+]
+
+
+def _compile(connection, statement):
+    return str(statement.compile(connection, compile_kwargs={'literal_binds': True}))
+
+
+def _sqlite_full_scans(connection, statement, table):
+    plan = connection.execute(text('EXPLAIN QUERY PLAN ' + _compile(connection, statement))).all()
+    lines = [row[-1] for row in plan]
+    # Only "SEARCH t USING ..." seeks into an index; every "SCAN t", including
+    # "SCAN t USING COVERING INDEX", still walks all of the table's rows
+    return lines, [line for line in lines if re.match(rf'SCAN {table}\b', line)]
+
+
+def _postgres_full_scans(connection, statement, table):
+    # Small tables are often seq-scanned by choice, so ask whether an index path exists at all
+    connection.execute(text('SET LOCAL enable_seqscan = off'))
+    plan = connection.execute(text('EXPLAIN ' + _compile(connection, statement))).all()
+    lines = [row[0] for row in plan]
+    return lines, [line for line in lines if re.search(rf'Seq Scan on {table}\b', line)]
+
+
+# 🔎 EXPLAIN every hot query -> [(name, plan lines, full-scan lines)]
+def check_query_plans():
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        explain = _sqlite_full_scans
+    elif dialect == 'postgresql':
+        explain = _postgres_full_scans
+    else:
+        raise RuntimeError(f"Query plan checks support SQLite and PostgreSQL, not {dialect}")
+
+    results = []
+    with db.engine.connect() as connection:
+        for name, table, statement in HOT_QUERIES:
+            with connection.begin():
+                lines, scans = explain(connection, statement, table)
+            results.append((name, lines, scans))
+    return results
@@ -0,0 +1,222 @@
+import heapq
+import sqlite3
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload
+from app import db
+from models import Student, Classroom, StudentTermAggregate
+from utils.grading_schemes import DEFAULT_SCHEME, scheme_for_form
+from utils.grade_aggregation import class_means as mean_per_class, grade_distribution
+from utils.helpers import normalize_form_level
+
+
+# 🧠 Window functions (RANK() OVER ...) need SQLite 3.25+; other backends have them
+def supports_window_functions():
+    if db.engine.dialect.name == 'sqlite':
+        return sqlite3.sqlite_version_info >= (3, 25, 0)
+    return True
+
+
+RANK_METHODS = ('competition', 'dense')
+FORM_LEVELS = ('1', '2', '3', '4')
+
+
+# 🏅 Rank rows already sorted by score desc: competition ("1, 2, 2, 4") or dense ("1, 2, 2, 3")
+def assign_positions(rows, key='average_score', field='position', method='competition'):
+    previous = None
+    for i, row in enumerate(rows, 1):
+        if previous is not None and row[key] == previous[key]:
+            row[field] = previous[field]
+        elif method == 'dense':
+            row[field] = previous[field] + 1 if previous else 1
+        else:
+            row[field] = i
+        previous = row
+    return rows
+
+
+# 🧮 Mean of all marks from the per-subject running totals
+def aggregate_mean():
+    return func.sum(StudentTermAggregate.total_marks) / func.sum(StudentTermAggregate.grade_count)
+
+
+# 📋 Per-student totals (sum, count, mean) read from student_term_aggregates
+def student_totals_query(*criteria):
+    return (
+        db.session.query(
+            StudentTermAggregate.student_id,
+            func.sum(StudentTermAggregate.total_marks).label('total_marks'),
+            func.sum(StudentTermAggregate.grade_count).label('grade_count'),
+            aggregate_mean().label('mean')
+        )
+        .filter(*criteria)
+        .group_by(StudentTermAggregate.student_id)
+    )
+
+
+# 📊 Every student's average, mean grade and position in one grouped query
+def class_performance(class_id, scheme=DEFAULT_SCHEME):
+    average = aggregate_mean()
+    columns = [
+        Student.student_id,
+        Student.first_name,
+        Student.last_name,
+        average.label('average_score'),
+    ]
+
+    use_window = supports_window_functions()
+    if use_window:
+        columns.append(func.rank().over(order_by=average.desc()).label('position'))
+
+    rows = (
+        db.session.query(*columns)
+        .join(StudentTermAggregate, StudentTermAggregate.student_id == Student.student_id)
+        .filter(Student.class_id == class_id)
+        .group_by(Student.student_id, Student.first_name, Student.last_name)
+        .order_by(average.desc(), Student.student_id)
+        .all()
+    )
+
+    averages = [round(r.average_score, 2) for r in rows]
+    ranked = [{
+        'student_id': r.student_id,
+        'student_name': f"{r.first_name} {r.last_name}",
+        'average_score': average,
+        'mean_grade': mean_grade,
+        'position': r.position if use_window else None
+    } for r, average, mean_grade in zip(rows, averages, scheme.grade(averages))]
+
+    # Older SQLite: rows are already ordered, so rank them in Python
+    if not use_window:
+        assign_positions(ranked)
+
+    return ranked
+
+
+# 🏆 Form means, class means and ranked students for the whole school in one query.
+# With a limit only the top-K students per form are picked (heap) and serialized.
+def school_rankings(form_level=None, limit=None, method='competition'):
+    totals = student_totals_query().subquery()
+    query = (
+        db.session.query(
+            Student.student_id,
+            Student.first_name,
+            Student.last_name,
+            Classroom.class_name,
+            Classroom.form_level,
+            totals.c.total_marks,
+            totals.c.mean
+        )
+        .join(Classroom, Classroom.class_id == Student.class_id)
+        .join(totals, totals.c.student_id == Student.student_id)
+        .filter(Classroom.form_level.isnot(None))
+    )
+    if form_level:
+        # Rows not yet rewritten by `flask normalize-form-levels` are matched below
+        query = query.filter(or_(Classroom.form_level == form_level, Classroom.form_level.notin_(FORM_LEVELS)))
+
+    forms = {level: [] for level in ([form_level] if form_level else FORM_LEVELS)}
+    for row in query:
+        level = normalize_form_level(row.form_level)
+        if level is None or (form_level and level != form_level):
+            continue  # a form level that doesn't parse can't be ranked
+        forms.setdefault(level, []).append((round(row.mean, 2), row))
+
+    form_rankings = {}
+    for level in sorted(forms, key=int):
+        students = forms[level]
+        class_means = mean_per_class([row.class_name for _, row in students], [average for average, _ in students])
+        form_mean = round(sum(class_means.values()) / len(class_means), 2) if class_means else 0
+
+        if limit:
+            top = heapq.nlargest(limit, students, key=lambda s: s[0])
+        else:
+            top = sorted(students, key=lambda s: s[0], reverse=True)
+
+        mean_grades = scheme_for_form(level).grade([average for average, _ in top])
+        ranked = assign_positions([{
+            'student_id': row.student_id,
+            'student_name': f"{row.first_name} {row.last_name}",
+            'class_name': row.class_name,
+            'total_marks': row.total_marks,
+            'average_score': average,
+            'mean_grade': mean_grade
+        } for (average, row), mean_grade in zip(top, mean_grades)], method=method)
+
+        form_rankings[f"Form {level}"] = {
+            'form_mean': form_mean,
+            'class_means': class_means,
+            'student_count': len(students),
+            'students': ranked
+        }
+
+    return form_rankings
+
+
+# 🎓 (student_id, name, term mean) for a whole class, best first, in one grouped query.
+# Students without grades for the term count as 0.
+def class_term_means(class_id, term, year):
+    term_means = student_totals_query(
+        StudentTermAggregate.term == term,
+        StudentTermAggregate.year == year
+    ).subquery()
+    rows = (
+        db.session.query(Student.student_id, Student.first_name, Student.last_name, term_means.c.mean)
+        .outerjoin(term_means, term_means.c.student_id == Student.student_id)
+        .filter(Student.class_id == class_id)
+        .order_by(Student.student_id)
+        .all()
+    )
+    means = [{
+        'student_id': r.student_id,
+        'student_name': f"{r.first_name} {r.last_name}",
+        'mean': round(r.mean or 0, 1)
+    } for r in rows]
+    return sorted(means, key=lambda s: s['mean'], reverse=True)
+
+
+# 🏫 Every student's mean and grade grouped by form, with per-form counts, mean
+# and grade distribution (GET /reports/overall-forms)
+def overall_forms():
+    # Fetch all students with classrooms and their mean from the aggregates
+    totals = student_totals_query().subquery()
+    rows = (
+        db.session.query(Student, totals.c.mean)
+        .join(totals, totals.c.student_id == Student.student_id)
+        .options(joinedload(Student.classroom))
+        .all()
+    )
+
+    # ⚡ Grade the whole school with one call per form level's scheme
+    mean_scores = [round(mean, 2) for _, mean in rows]
+    kcse_grades = [None] * len(rows)
+    by_level = {}
+    for i, (student, _) in enumerate(rows):
+        by_level.setdefault(student.classroom.form_level if student.classroom else None, []).append(i)
+    for level, indexes in by_level.items():
+        for i, grade in zip(indexes, scheme_for_form(level).grade([mean_scores[i] for i in indexes])):
+            kcse_grades[i] = grade
+
+    form_data = {}
+
+    for (student, _), mean_score, grade in zip(rows, mean_scores, kcse_grades):
+        class_name = student.classroom.class_name if student.classroom else ''
+        form_key = class_name.split(" ")[0] if class_name else 'Unknown'
+
+        student_summary = {
+            'student_id': student.student_id,
+            'student_name': f"{student.first_name} {student.last_name}",
+            'class_name': class_name,
+            'mean_score': mean_score,
+            'kcse_grade': grade
+        }
+
+        form_data.setdefault(form_key, {'students': []})['students'].append(student_summary)
+
+    # Finalize count, average score and grade distribution per form
+    for form_key, data in form_data.items():
+        scores = [s['mean_score'] for s in data['students']]
+        data['student_count'] = len(scores)
+        data['mean_score'] = round(sum(scores) / len(scores), 2)
+        data['grade_distribution'] = grade_distribution([s['kcse_grade'] for s in data['students']])
+
+    return form_data
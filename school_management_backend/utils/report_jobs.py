@@ -0,0 +1,269 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from models import ReportJob, Student, Classroom, Exam
+from utils.helpers import normalize_form_level
+from utils.csv_export import gradebook_csv, school_gradebook_csv
+from utils.pdf_reports import cohort_report_data, stream_report_zip
+from utils.report_engine import overall_forms, school_rankings, RANK_METHODS
+
+
+# 🧾 Job kinds: who may submit them, how their params are checked and how the
+# result is produced. parse() raises ValueError for bad params; run() returns
+# (filename, mimetype, chunks) where chunks is an iterable of str or bytes.
+class JobKind:
+    def __init__(self, run, parse=None, roles=('admin', 'teacher')):
+        self.run = run
+        self.parse = parse or (lambda params: {})
+        self.roles = roles
+
+
+def _json_result(filename, data):
+    return filename, 'application/json', [json.dumps(data)]
+
+
+def _parse_rankings(params):
+    form_level = params.get('form')
+    limit = params.get('limit')
+    method = params.get('rank', 'competition')
+
+    if form_level is not None:
+        form_level = normalize_form_level(str(form_level))
+        if not form_level:
+            raise ValueError('Invalid form')
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        raise ValueError('limit must be a positive integer')
+    if method not in RANK_METHODS:
+        raise ValueError(f"rank must be one of {', '.join(RANK_METHODS)}")
+    return {'form': form_level, 'limit': limit, 'rank': method}
+
+
+def _parse_class(params):
+    class_id = params.get('class_id')
+    if not isinstance(class_id, int) or not db.session.get(Classroom, class_id):
+        raise ValueError('Class not found')
+    return {'class_id': class_id}
+
+
+def _parse_form(params):
+    form_level = normalize_form_level(str(params.get('form') or ''))
+    if not form_level:
+        raise ValueError('Invalid form')
+    return {'form': form_level}
+
+
+def _parse_term(params):
+    term = params.get('term')
+    year = params.get('year')
+    if year is not None and not isinstance(year, int):
+        raise ValueError('year must be an integer')
+    return {'term': term, 'year': year}
+
+
+def _run_class_csv(params):
+    classroom = db.session.get(Classroom, params['class_id'])
+    return (
+        f"{classroom.class_name}_report.csv",
+        'text/csv',
+        gradebook_csv(Student.class_id == classroom.class_id)
+    )
+
+
+def _run_school_csv(params):
+    criteria = []
+    if params.get('term'):
+        criteria.append(Exam.term == params['term'])
+    if params.get('year'):
+        criteria.append(Exam.year == params['year'])
+    return 'school_gradebook.csv', 'text/csv', school_gradebook_csv(*criteria)
+
+
+def _run_pdf_zip(filename, *criteria):
+    cohort = cohort_report_data(*criteria)
+    if not cohort:
+        raise ValueError('No grades to export')
+    workers = current_app.config['REPORT_PDF_WORKERS']
+    return filename, 'application/zip', stream_report_zip(cohort, workers, logger=current_app.logger)
+
+
+def _run_class_pdf_zip(params):
+    classroom = db.session.get(Classroom, params['class_id'])
+    return _run_pdf_zip(f"{classroom.class_name}_report_cards.zip", Student.class_id == classroom.class_id)
+
+
+def _run_form_pdf_zip(params):
+    return _run_pdf_zip(f"Form_{params['form']}_report_cards.zip", Classroom.form_level == params['form'])
+
+
+JOB_KINDS = {
+    'overall_forms': JobKind(lambda params: _json_result('overall_forms.json', overall_forms())),
+    'school_rankings': JobKind(
+        lambda params: _json_result('school_rankings.json', school_rankings(
+            form_level=params['form'], limit=params['limit'], method=params['rank']
+        )),
+        parse=_parse_rankings
+    ),
+    'class_csv': JobKind(_run_class_csv, parse=_parse_class),
+    'school_csv': JobKind(_run_school_csv, parse=_parse_term, roles=('admin',)),
+    'class_pdf_zip': JobKind(_run_class_pdf_zip, parse=_parse_class),
+    'form_pdf_zip': JobKind(_run_form_pdf_zip, parse=_parse_form),
+}
+
+
+# ⚙️ Runs report jobs on a fixed-size thread pool inside the web process.
+# Jobs are persisted as ReportJob rows; results are written to <root>/<job id>.
+# While this process holds a job (queued or running) it renews the job's heartbeat_at
+# every lease/4. sweep() (at startup, then at most every sweep_seconds on submit) fails
+# jobs whose heartbeat is older than lease, i.e. whose process is gone, and deletes
+# finished jobs and their files after retention.
+class ReportJobRunner:
+    def __init__(self, app, root, workers, lease, retention, sweep_seconds):
+        self.app = app
+        self.root = root
+        self.lease = timedelta(seconds=lease)
+        self.retention = timedelta(seconds=retention)
+        self.sweep_seconds = sweep_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-job')
+        self._sweep_lock = threading.Lock()
+        self._next_sweep = 0
+        self._owned = set()
+        self._owned_lock = threading.Lock()
+        self._heartbeat = threading.Thread(target=self._renew_leases, name='report-job-heartbeat', daemon=True)
+        os.makedirs(root, exist_ok=True)
+        self._heartbeat.start()
+
+    def submit(self, kind, params, user_id):
+        if time.monotonic() >= self._next_sweep:
+            self.sweep()
+        job = ReportJob(kind=kind, params=params, status='queued', created_by=user_id,
+                        heartbeat_at=datetime.utcnow())
+        db.session.add(job)
+        db.session.commit()
+        with self._owned_lock:
+            self._owned.add(job.id)
+        self._executor.submit(self._run, job.id)
+        return job
+
+    def _renew_leases(self):
+        table = ReportJob.__table__
+        while True:
+            time.sleep(self.lease.total_seconds() / 4)
+            with self._owned_lock:
+                job_ids = list(self._owned)
+            if not job_ids:
+                continue
+            try:
+                with self.app.app_context(), db.engine.begin() as connection:
+                    connection.execute(
+                        update(table)
+                        .where(table.c.id.in_(job_ids), table.c.status.in_(('queued', 'running')))
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+            except SQLAlchemyError:
+                self.app.logger.exception("Failed to renew report job leases")
+
+    def sweep(self):
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            now = datetime.utcnow()
+            table = ReportJob.__table__
+            with db.engine.begin() as connection:
+                # Rows from before heartbeats existed fall back to when they started or were created
+                last_seen = func.coalesce(table.c.heartbeat_at, table.c.started_at, table.c.created_at)
+                connection.execute(
+                    update(table)
+                    .where(table.c.status.in_(('queued', 'running')), last_seen < now - self.lease)
+                    .values(status='failed', error='Job was interrupted (server restarted?)', finished_at=now)
+                )
+                expired = connection.execute(
+                    select(table.c.id, table.c.result_path)
+                    .where(table.c.status.in_(('done', 'failed')), table.c.finished_at < now - self.retention)
+                ).all()
+                if expired:
+                    connection.execute(delete(table).where(table.c.id.in_([row.id for row in expired])))
+            for row in expired:
+                if row.result_path and os.path.exists(row.result_path):
+                    os.remove(row.result_path)
+        except (SQLAlchemyError, OSError) as exc:
+            self.app.logger.warning("Report job sweep failed: %s", exc)
+        finally:
+            self._next_sweep = time.monotonic() + self.sweep_seconds
+            self._sweep_lock.release()
+
+    def _run(self, job_id):
+        try:
+            with self.app.app_context():
+                self._execute(job_id)
+        finally:
+            with self._owned_lock:
+                self._owned.discard(job_id)
+
+    # Status changes are conditional so a job the sweep already failed stays failed
+    def _execute(self, job_id):
+        table = ReportJob.__table__
+        now = datetime.utcnow()
+        started = db.session.execute(
+            update(table)
+            .where(table.c.id == job_id, table.c.status == 'queued')
+            .values(status='running', started_at=now, heartbeat_at=now)
+        ).rowcount
+        db.session.commit()
+        if not started:
+            return
+
+        job = db.session.get(ReportJob, job_id)
+        kind, params = job.kind, job.params
+        path = os.path.join(self.root, str(job_id))
+        tmp_path = f"{path}.tmp"
+        try:
+            filename, mimetype, chunks = JOB_KINDS[kind].run(params)
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self.app.logger.exception("Report job %s (%s) failed", job_id, kind)
+            result = {'status': 'failed', 'error': str(e) or e.__class__.__name__}
+        else:
+            result = {'status': 'done', 'result_path': path, 'filename': filename, 'mimetype': mimetype}
+
+        db.session.rollback()
+        finished = db.session.execute(
+            update(table)
+            .where(table.c.id == job_id, table.c.status == 'running')
+            .values(finished_at=datetime.utcnow(), **result)
+        ).rowcount
+        db.session.commit()
+        if not finished:
+            self.app.logger.warning("Report job %s finished after it was marked interrupted", job_id)
+            if result['status'] == 'done' and os.path.exists(path):
+                os.remove(path)
+
+
+def init_report_jobs(app):
+    runner = ReportJobRunner(
+        app,
+        app.config.get('REPORT_JOB_DIR') or os.path.join(app.instance_path, 'report_jobs'),
+        app.config['REPORT_JOB_WORKERS'],
+        lease=app.config['REPORT_JOB_LEASE_SECONDS'],
+        retention=app.config['REPORT_JOB_RETENTION_SECONDS'],
+        sweep_seconds=app.config['REPORT_JOB_SWEEP_SECONDS']
+    )
+    with app.app_context():
+        runner.sweep()
+    app.extensions['report_jobs'] = runner
+    return runner
+
+
+def get_report_job_runner():
+    return current_app.extensions['report_jobs']
@@ -0,0 +1,229 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, inspect, select, update, delete
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import db
+from models import User, RefreshToken, RevokedToken
+
+_PENDING_KEY = 'revoked_tokens'
+_MIN_CAPACITY = 1024
+_ERROR_RATE = 0.01
+# Rows can commit well after their created_at (and ids out of order on PostgreSQL), so each
+# sync re-reads this much before the newest row already seen
+_SYNC_OVERLAP = timedelta(minutes=2)
+
+_table = RevokedToken.__table__
+
+
+def _epoch(value):
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+# 🌸 Fixed-size Bloom filter: "no" is certain, "yes" needs confirming against the exact sets
+class BloomFilter:
+    def __init__(self, capacity, error_rate=_ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+# 🚫 Per-process copy of the revoked_tokens table. token_required checks it on every
+# request without touching the database; new rows from other processes are pulled in
+# at most every sync_seconds, and rows are dropped once the tokens they cover expire.
+class RevocationList:
+    def __init__(self, engine, sync_seconds, logger=None):
+        self.engine = engine
+        self.sync_seconds = sync_seconds
+        self.logger = logger
+        self._jtis = {}   # jti -> expires (epoch)
+        self._users = {}  # user_id -> (issued_before, expires) (epoch)
+        self._bloom = BloomFilter(_MIN_CAPACITY)
+        self._seen = {}  # revoked_tokens.id -> expires (epoch), rows already loaded
+        self._synced_until = None  # newest created_at seen
+        self._next_sync = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def is_revoked(self, claims):
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+
+        jti = claims.get('jti')
+        if jti and f"jti:{jti}" in self._bloom and jti in self._jtis:
+            return True
+
+        user_id = claims.get('user_id')
+        if f"user:{user_id}" in self._bloom:
+            entry = self._users.get(user_id)
+            if entry and claims.get('iat', 0) < entry[0]:
+                return True
+        return False
+
+    def add(self, records):
+        with self._lock:
+            for jti, user_id, issued_before, expires_at in records:
+                expires = _epoch(expires_at)
+                if jti:
+                    self._jtis[jti] = expires
+                    self._bloom.add(f"jti:{jti}")
+                else:
+                    previous = self._users.get(user_id)
+                    issued = _epoch(issued_before)
+                    if previous:
+                        issued, expires = max(issued, previous[0]), max(expires, previous[1])
+                    self._users[user_id] = (issued, expires)
+                    self._bloom.add(f"user:{user_id}")
+            if len(self._jtis) + len(self._users) > self._bloom.capacity:
+                self._rebuild()
+
+    # 🔄 Load rows created since the last sync, minus an overlap window so late commits
+    # aren't skipped (all unexpired rows the first time); rows already loaded are skipped by id
+    def sync(self):
+        if not self._sync_lock.acquire(blocking=False):
+            return  # another thread is syncing; use what we have
+        try:
+            now = datetime.utcnow()
+            query = (
+                select(_table.c.id, _table.c.jti, _table.c.user_id, _table.c.issued_before, _table.c.expires_at,
+                       _table.c.created_at)
+                .where(_table.c.expires_at > now)
+            )
+            if self._synced_until is not None:
+                query = query.where(_table.c.created_at >= self._synced_until - _SYNC_OVERLAP)
+            with self.engine.connect() as connection:
+                rows = [row for row in connection.execute(query) if row.id not in self._seen]
+            if rows:
+                self.add([row[1:5] for row in rows])
+                for row in rows:
+                    self._seen[row.id] = _epoch(row.expires_at)
+                newest = max(row.created_at for row in rows)
+                self._synced_until = max(newest, self._synced_until or newest)
+            self._prune()
+        except SQLAlchemyError:
+            if self.logger:
+                self.logger.exception("Failed to sync revoked tokens")
+        finally:
+            self._next_sync = time.monotonic() + self.sync_seconds
+            self._sync_lock.release()
+
+    def _prune(self):
+        now = _epoch(datetime.utcnow())
+        with self._lock:
+            expired_jtis = [jti for jti, expires in self._jtis.items() if expires <= now]
+            expired_users = [user_id for user_id, (_, expires) in self._users.items() if expires <= now]
+            for jti in expired_jtis:
+                del self._jtis[jti]
+            for user_id in expired_users:
+                del self._users[user_id]
+            for row_id in [row_id for row_id, expires in self._seen.items() if expires <= now]:
+                del self._seen[row_id]
+            if expired_jtis or expired_users:
+                self._rebuild()
+
+    # Bloom filters can't forget, so expiry and growth mean starting a fresh one
+    def _rebuild(self):
+        entries = len(self._jtis) + len(self._users)
+        bloom = BloomFilter(max(_MIN_CAPACITY, 2 ** math.ceil(math.log2(entries * 2 or 1))))
+        for jti in self._jtis:
+            bloom.add(f"jti:{jti}")
+        for user_id in self._users:
+            bloom.add(f"user:{user_id}")
+        self._bloom = bloom
+
+
+_lists = []
+
+
+def init_token_revocation(app):
+    with app.app_context():
+        engine = db.engine
+    revocations = RevocationList(engine, app.config['REVOCATION_SYNC_SECONDS'], logger=app.logger)
+    app.extensions['token_revocation'] = revocations
+    _lists.append(revocations)
+    return revocations
+
+
+def get_revocation_list():
+    return current_app.extensions['token_revocation']
+
+
+def _track(session, token):
+    session.add(token)
+    session.info.setdefault(_PENDING_KEY, []).append(
+        (token.jti, token.user_id, token.issued_before, token.expires_at)
+    )
+
+
+# 🔒 Revoke one access token (logout); takes effect in this process on commit
+def revoke_access_token(session, claims):
+    _track(session, RevokedToken(
+        jti=claims['jti'],
+        user_id=claims['user_id'],
+        expires_at=datetime.utcfromtimestamp(claims['exp'])
+    ))
+
+
+# 🔒 Revoke every access and refresh token a user holds right now
+def revoke_user_tokens(session, user_id):
+    now = datetime.utcnow()
+    _track(session, RevokedToken(
+        user_id=user_id,
+        # 'iat' is whole seconds, so a token issued later in this same second must still pass
+        issued_before=now.replace(microsecond=0),
+        expires_at=now + timedelta(seconds=current_app.config['ACCESS_TOKEN_EXPIRES_SECONDS'])
+    ))
+    session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# 👤 Deleting a user or changing their role logs them out everywhere
+@event.listens_for(Session, 'before_flush')
+def _revoke_changed_users(session, flush_context, instances):
+    deleted = [obj.user_id for obj in session.deleted if isinstance(obj, User)]
+    changed = [
+        obj.user_id for obj in session.dirty
+        if isinstance(obj, User) and inspect(obj).attrs.role.history.has_changes()
+    ]
+    for user_id in (*deleted, *changed):
+        revoke_user_tokens(session, user_id)
+    if deleted:
+        session.execute(
+            delete(RefreshToken).where(RefreshToken.user_id.in_(deleted))
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_after_commit(session):
+    records = session.info.pop(_PENDING_KEY, None)
+    if records:
+        for revocations in _lists:
+            revocations.add(records)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,161 @@
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from flask import current_app, g, has_app_context
+from app import db
+
+_STOP = object()
+
+_queue = None
+
+
+# ⏳ Raised by run_write when a queued write hasn't committed within WRITE_QUEUE_TIMEOUT.
+# may_be_applied is False when the unit was withdrawn before it ran (nothing was written,
+# the client can simply retry) and True when it was already running and may still commit.
+class WriteQueueTimeout(Exception):
+    def __init__(self, may_be_applied):
+        self.may_be_applied = may_be_applied
+        if may_be_applied:
+            message = 'The server is busy and the change may still be saved; reload before retrying'
+        else:
+            message = 'The server is busy and the change was not saved; please try again'
+        super().__init__(message)
+
+
+class _WriteUnit:
+    __slots__ = ('fn', 'user_id', 'future')
+
+    def __init__(self, fn, user_id):
+        self.fn = fn
+        self.user_id = user_id
+        self.future = Future()
+
+
+# ✍️ Group commit for SQLite: one writer thread runs small write units back to back in a
+# single transaction and commits them together, so N concurrent requests pay for one
+# commit instead of queueing N times for the database lock. A group takes every unit
+# queued while the previous one committed (up to max_batch), lingering up to max_delay
+# for more. Each unit's future resolves after the commit that contains it; a unit that
+# raises is dropped and the rest of its group re-run.
+class WriteQueue:
+    def __init__(self, app, max_batch, max_delay, logger=None):
+        self.app = app
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.logger = logger
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+        self._thread.start()
+
+    # fn(session) does the writing without committing; its return value resolves the future
+    def submit(self, fn):
+        user_id = g.get('current_user_id') if has_app_context() else None
+        unit = _WriteUnit(fn, user_id)
+        self._queue.put(unit)
+        return unit.future
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                unit = self._queue.get()
+                if unit is _STOP:
+                    return
+                group = [unit]
+                deadline = time.monotonic() + self.max_delay
+                stop = False
+                while len(group) < self.max_batch:
+                    try:
+                        unit = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                    if unit is _STOP:
+                        stop = True
+                        break
+                    group.append(unit)
+
+                self._commit_group(group)
+                if stop:
+                    return
+
+    def _commit_group(self, group):
+        session = db.session
+        pending = [unit for unit in group if unit.future.set_running_or_notify_cancel()]
+        while pending:
+            results = []
+            failed = None
+            try:
+                for unit in pending:
+                    g.current_user_id = unit.user_id
+                    try:
+                        results.append(unit.fn(session))
+                        session.flush()  # surface constraint errors on the unit that caused them
+                    except Exception as exc:
+                        failed = (unit, exc)
+                        raise
+                session.commit()
+            except Exception as exc:
+                session.rollback()
+                if failed:
+                    unit, error = failed
+                    unit.future.set_exception(error)
+                    pending.remove(unit)
+                    continue
+                # The commit itself failed: nothing was written, so report it to the whole group
+                if self.logger:
+                    self.logger.exception("Group commit of %d writes failed", len(pending))
+                for unit in pending:
+                    unit.future.set_exception(exc)
+                return
+            finally:
+                g.pop('current_user_id', None)
+
+            for unit, result in zip(pending, results):
+                unit.future.set_result(result)
+            return
+
+    # 🛑 Commit whatever is already queued and stop the writer
+    def close(self, timeout=10):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+
+def init_write_queue(app):
+    global _queue
+    if not app.config['WRITE_QUEUE_ENABLED']:
+        return None
+    _queue = WriteQueue(
+        app,
+        max_batch=app.config['WRITE_QUEUE_MAX_BATCH'],
+        max_delay=app.config['WRITE_QUEUE_MAX_DELAY_MS'] / 1000,
+        logger=app.logger
+    )
+    atexit.register(_queue.close)
+    return _queue
+
+
+# 💾 Run a write unit and return its result once it is committed: through the write queue
+# when WRITE_QUEUE_ENABLED, otherwise inline on the request's session. Errors raised by fn
+# (or by its flush) reach the caller either way; a queued write that doesn't commit in
+# time raises WriteQueueTimeout.
+def run_write(fn):
+    if _queue is None:
+        try:
+            result = fn(db.session)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return result
+    future = _queue.submit(fn)
+    try:
+        return future.result(current_app.config['WRITE_QUEUE_TIMEOUT'])
+    except FutureTimeout:
+        if future.cancel():  # still queued: the writer will skip it
+            raise WriteQueueTimeout(may_be_applied=False)
+    try:
+        return future.result(0)  # it finished just now
+    except FutureTimeout:
+        raise WriteQueueTimeout(may_be_applied=True)